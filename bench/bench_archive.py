@@ -0,0 +1,99 @@
+"""
+زمان جستجو در آرشیو پست‌ها (FTS5) با تعداد زیادی پست و حافظه پروسه قبل و بعد از جستجوها.
+پست‌ها با همان normalize و جدول‌های Archive.add ولی دسته‌ای در تراکنش وارد می‌شوند. کلمات از هجاهای فارسی
+ساخته می‌شوند و تکرار آن‌ها مثل متن واقعی نامتوازن است (چند کلمه پرتکرار و تعداد زیادی کلمه کم‌تکرار).
+
+    python bench/bench_archive.py --posts 1000000
+"""
+import itertools
+import os
+import random
+import tempfile
+import time
+import timing
+from archive import Archive
+from autocomplete import normalize
+
+SYLLABLES = ["با", "را", "من", "کا", "تر", "سی", "نو", "دا", "پر", "زی", "شا", "مه", "گو", "لی", "فر", "بی", "خو",
+             "ته", "سا", "ری", "نا", "مو", "کی", "دو"]
+
+
+class Corpus:
+    """واژگان، درس‌ها و اساتید ساختگی؛ هر پست از روی شماره‌اش ساخته می‌شود"""
+
+    def __init__(self, words=20000, courses=2000, professors=3000, seed=7):
+        rng = random.Random(seed)
+        vocabulary = set()
+        while len(vocabulary) < words:
+            vocabulary.add("".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))))
+        self.words = sorted(vocabulary)
+        rng.shuffle(self.words)
+        self.courses = [" ".join(rng.sample(self.words[:1000], 2)) for _ in range(courses)]
+        self.professors = [" ".join(rng.sample(self.words[1000:4000], 2)) for _ in range(professors)]
+        # قانون زیف: تکرار کلمه رتبه r متناسب با 1/r
+        self.weights = list(itertools.accumulate(1 / rank for rank in range(1, words + 1)))
+
+    def post(self, i):
+        rng = random.Random(i)
+        question = rng.choices(self.words, cum_weights=self.weights, k=rng.randint(6, 20))
+        return rng.choice(self.courses), rng.choice(self.professors), " ".join(question)
+
+
+# حافظه پروسه (مگابایت): RssAnon حافظه خود پروسه و RssFile صفحه‌های فایل دیتابیس که memory-map شده‌اند
+def rss_mb(field):
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(field + ":"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def fill(archive, corpus, count, batch=50000):
+    db = archive._db
+    now = time.time()
+    for start in range(0, count, batch):
+        rows = [corpus.post(i) for i in range(start, min(count, start + batch))]
+        db.execute("BEGIN")
+        first = db.execute("SELECT COALESCE(MAX(id), 0) FROM posts").fetchone()[0] + 1
+        db.executemany("INSERT INTO posts (course, professors, question, published_at) VALUES (?, ?, ?, ?)",
+                       (row + (now,) for row in rows))
+        db.executemany("INSERT INTO posts_index (rowid, course, professors, question) VALUES (?, ?, ?, ?)",
+                       ((first + j, *map(normalize, row)) for j, row in enumerate(rows)))
+        db.execute("COMMIT")
+
+
+def run(count, lookups):
+    path = os.path.join(tempfile.mkdtemp(), "archive.db")
+    started = time.perf_counter()
+    corpus = Corpus()
+    fill(Archive(path), corpus, count)
+    print(f"archived {count} posts in {time.perf_counter() - started:.1f} s, "
+          f"file {os.path.getsize(path) / 1024 / 1024:.0f} MB")
+
+    archive = Archive(path)  # پروسه تازه: ایندکس از فایل خوانده می‌شود
+    rng = random.Random(7)
+    before = rss_mb("RssAnon")
+    posts = [corpus.post(rng.randrange(count)) for _ in range(lookups)]
+    queries = {
+        "course": [course for course, _, _ in posts],
+        "professor": [professor for _, professor, _ in posts],
+        "course + professor": [f"{course} {professor}" for course, professor, _ in posts],
+        "two question words": [" ".join(rng.sample(question.split(" "), 2)) for _, _, question in posts],
+        "3-letter prefix": [rng.choice(question.split(" "))[:3] for _, _, question in posts],
+        "page 3 of a course": [course for course, _, _ in posts],
+        "most common word": [corpus.words[0]] * max(1, lookups // 100),
+    }
+    for title, texts in queries.items():
+        offset = 10 if title.startswith("page") else 0
+        timings = timing.measure(lambda text: archive.search(text, offset=offset), texts)
+        print(f"{title}: {timing.percentiles(timings)}")
+    print(f"RssAnon before searches {before:.0f} MB, after {rss_mb('RssAnon'):.0f} MB; "
+          f"RssFile (mmap) after {rss_mb('RssFile'):.0f} MB")
+
+
+if __name__ == "__main__":
+    parser = timing.parser(__doc__)
+    parser.add_argument("--posts", type=int, default=1000000)
+    parser.add_argument("--lookups", type=int, default=2000)
+    args = parser.parse_args()
+    run(args.posts, args.lookups)
@@ -0,0 +1,55 @@
+"""
+زمان پیشنهاد خودکار (NameIndex.suggest) با تعداد زیادی نام، برای پیشوندهای با طول مختلف.
+نام‌ها از ترکیب کلمات فارسی ساخته می‌شوند و بخشی از جستجوها با نگارش عربی (ي/ك) و نیم‌فاصله است.
+آخرین بخش جستجوهای با یک حرف جا افتاده را اندازه می‌گیرد که به مقایسه فاصله ویرایشی با همه کلمه‌ها می‌رسند.
+
+    python bench/bench_autocomplete.py --entries 50000
+"""
+import random
+import time
+import timing
+from autocomplete import NameIndex
+
+WORDS = ["مبانی", "کامپیوتر", "ریاضی", "فیزیک", "شیمی", "آمار", "احتمال", "معادلات", "دیفرانسیل", "مدار",
+         "الکتریکی", "سیستم", "عامل", "شبکه", "پایگاه", "داده", "هوش", "مصنوعی", "یادگیری", "ماشین",
+         "برنامه‌سازی", "پیشرفته", "ساختمان", "طراحی", "الگوریتم", "زبان", "تخصصی", "کنترل", "خطی", "گسسته"]
+
+
+def names(count, rng):
+    result = set()
+    while len(result) < count:
+        words = rng.sample(WORDS, rng.randint(2, 4))
+        result.add(" ".join(words) + f" {rng.randint(1, 9)}")
+    return sorted(result)
+
+
+def run(entries, lookups):
+    rng = random.Random(7)
+    catalog = names(entries, rng)
+    index = NameIndex()
+    started = time.perf_counter()
+    for name in catalog:
+        index.add(name, rng.randint(1, 50))
+    print(f"indexed {len(index)} names in {time.perf_counter() - started:.1f} s")
+
+    for length in (1, 2, 3, 6):
+        prefixes = []
+        for _ in range(lookups):
+            word = rng.choice(rng.choice(catalog).split(" "))[:length]
+            prefixes.append(word.replace("ی", "ي").replace("ک", "ك") if rng.random() < 0.3 else word)
+        print(f"prefix of {length}: {timing.percentiles(timing.measure(index.suggest, prefixes))}")
+    typos = []
+    for _ in range(lookups // 10):
+        word = rng.choice(WORDS)
+        i = rng.randrange(1, len(word))
+        typos.append(word[:i] + word[i + 1:])
+    print(f"one missing letter: {timing.percentiles(timing.measure(index.suggest, typos))}")
+    print(f"empty prefix: {timing.percentiles(timing.measure(index.suggest, [''] * (lookups // 10)))}")
+
+
+if __name__ == "__main__":
+    parser = timing.parser(__doc__)
+    parser.add_argument("--entries", type=int, default=50000)
+    parser.add_argument("--lookups", type=int, default=10000)
+    args = parser.parse_args()
+    run(args.entries, args.lookups)
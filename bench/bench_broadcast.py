@@ -0,0 +1,79 @@
+"""
+ارسال همگانی به کاربران شبیه‌سازی شده با ساعت شبیه‌سازی شده (بدون انتظار واقعی): سقف توان عملیاتی
+با محدودیت نرخ، زمان واقعی پردازش، و ادامه ارسال بعد از قطع شدن در میانه گزارش می‌شود.
+
+    python bench/bench_broadcast.py --users 1000000 --rate 25
+"""
+import os
+import tempfile
+import time
+from telebot import apihelper
+import timing
+from users import Broadcaster, UserRegistry
+
+
+class Interrupted(BaseException):
+    """شبیه قطع شدن پروسه در میانه ارسال"""
+
+
+def run(count, rate, blocked_every, flood_every, stop_at):
+    users = UserRegistry(os.path.join(tempfile.mkdtemp(), "users.db"))
+    started = time.perf_counter()
+    with users._lock:
+        users._db.execute("BEGIN")
+        users._db.executemany("INSERT INTO users (chat_id, joined_at) VALUES (?, 0)",
+                              ((100000 + i,) for i in range(count)))
+        users._db.execute("COMMIT")
+    print(f"registered {count} users in {time.perf_counter() - started:.1f} s")
+
+    now = [0.0]
+    calls = [0]
+    deliveries = {}
+
+    def send(chat_id, text):
+        calls[0] += 1
+        if calls[0] == stop_at:
+            raise Interrupted()
+        if flood_every and calls[0] % flood_every == 0:
+            raise apihelper.ApiTelegramException("sendMessage", None, {
+                "ok": False, "error_code": 429, "description": "Too Many Requests: retry after 5",
+                "parameters": {"retry_after": 5}})
+        if blocked_every and chat_id % blocked_every == 0:
+            raise apihelper.ApiTelegramException("sendMessage", None, {
+                "ok": False, "error_code": 403, "description": "Forbidden: bot was blocked by the user"})
+        deliveries[chat_id] = deliveries.get(chat_id, 0) + 1
+
+    def sleep(seconds):
+        now[0] += seconds
+
+    def broadcaster():
+        return Broadcaster(users, send, rate=rate, workers=1, clock=lambda: now[0], sleep=sleep)
+
+    broadcast_id = users.create_broadcast("📣 اطلاعیه")
+    users.start_broadcast(broadcast_id)
+    started = time.perf_counter()
+    try:
+        broadcaster().run_once()
+    except Interrupted:
+        print(f"interrupted after {calls[0]} sends, resuming with a new broadcaster")
+        broadcaster().run_once()
+    elapsed = time.perf_counter() - started
+
+    broadcast = users.get_broadcast(broadcast_id)
+    repeated = sum(times - 1 for times in deliveries.values())
+    print(f"status {broadcast.status}: sent {broadcast.sent}, blocked {broadcast.blocked}, "
+          f"failed {broadcast.failed} of {broadcast.total}")
+    print(f"simulated time {now[0] / 3600:.2f} h ({broadcast.sent / now[0]:.1f} msg/s, ceiling {rate}/s), "
+          f"wall time {elapsed:.1f} s ({broadcast.sent / elapsed:.0f} msg/s processing)")
+    print(f"delivered twice after resume: {repeated}, active users left: {users.count()}")
+
+
+if __name__ == "__main__":
+    parser = timing.parser(__doc__)
+    parser.add_argument("--users", type=int, default=1000000)
+    parser.add_argument("--rate", type=float, default=25)
+    parser.add_argument("--blocked-every", type=int, default=20, help="every Nth user has blocked the bot")
+    parser.add_argument("--flood-every", type=int, default=100000, help="answer every Nth send with 429")
+    parser.add_argument("--stop-at", type=int, default=400000, help="interrupt after N sends (0 = never)")
+    args = parser.parse_args()
+    run(args.users, args.rate, args.blocked_every, args.flood_every, args.stop_at)
@@ -0,0 +1,36 @@
+"""
+زمان بررسی سوال تکراری در DuplicateIndex: ایندکس با سوال‌های ساختگی پر می‌شود و صدک زمان هر بررسی گزارش می‌شود.
+
+    python bench/bench_dedupe.py --questions 100000
+"""
+import random
+import time
+import timing
+from dedupe import DuplicateIndex
+
+WORDS = ["استاد", "امتحان", "نمره", "میانترم", "پایانترم", "تمرین", "کلاس", "حضور", "غیاب", "سخت", "آسان",
+         "منبع", "جزوه", "پروژه", "خوبه", "چطوره", "میده", "میگیره", "درس", "ترم", "سوال", "کوییز"]
+
+
+def run(count, checks):
+    rng = random.Random(7)
+
+    def question():
+        return " ".join(rng.choice(WORDS) for _ in range(rng.randint(6, 16))) + "؟"
+
+    index = DuplicateIndex(capacity=count)
+    started = time.perf_counter()
+    for i in range(count):
+        index.add(i, f"درس {i % 300}", question())
+    print(f"indexed {len(index)} questions in {time.perf_counter() - started:.1f} s")
+
+    timings = timing.measure(lambda i: index.find(f"درس {i % 300}", question()), range(checks))
+    print(f"check: {timing.percentiles(timings)}")
+
+
+if __name__ == "__main__":
+    parser = timing.parser(__doc__)
+    parser.add_argument("--questions", type=int, default=100000)
+    parser.add_argument("--checks", type=int, default=2000)
+    args = parser.parse_args()
+    run(args.questions, args.checks)
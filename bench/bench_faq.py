@@ -0,0 +1,51 @@
+"""
+زمان ساخت ایندکس سوالات متداول با سوال‌های ساختگی، بارگذاری از فایل cache
+و صدک زمان هر جستجو (تکی و دسته‌ای).
+
+    python bench/bench_faq.py --entries 10000 100000
+"""
+import os
+import random
+import tempfile
+import time
+import timing
+import faq_index
+from faq_index import FaqEntry, FaqIndex
+
+# واژه‌های ساختگی از هجاهای فارسی، به علاوه چند واژه پرتکرار که در بیشتر سوال‌ها هستند
+SYLLABLES = ["ام", "تح", "ان", "نم", "ره", "کل", "اس", "در", "سی", "پر", "وژ", "تم", "رین", "جز", "وه",
+             "کت", "اب", "تر", "مه", "حذ", "فی", "وا", "حد", "مع", "دل", "سا", "عت", "دف", "تر", "می"]
+COMMON = ["استاد", "درس", "امتحان", "نمره", "چطور", "است"]
+
+
+def run(sizes, queries):
+    rng = random.Random(3)
+    words = ["".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))) for _ in range(5000)]
+    print(f"numpy: {'yes' if faq_index.numpy is not None else 'no (pure python)'}")
+    for size in sizes:
+        entries = [FaqEntry(" ".join([rng.choice(COMMON)] + [rng.choice(words) for _ in range(rng.randint(3, 7))])
+                            + "؟", f"جواب {i}") for i in range(size)]
+        cache_path = os.path.join(tempfile.mkdtemp(), "faq.idx")
+        started = time.perf_counter()
+        index = FaqIndex(entries, cache_path=cache_path)
+        built = time.perf_counter() - started
+        started = time.perf_counter()
+        index = FaqIndex(entries, cache_path=cache_path)
+        loaded = time.perf_counter() - started
+        texts = [rng.choice(entries).question.replace("؟", "") for _ in range(queries)]
+        timings = timing.measure(index.search, texts)
+        started = time.perf_counter()
+        for i in range(0, len(texts), 32):
+            index.search_many(texts[i:i + 32])
+        batched = (time.perf_counter() - started) / len(texts)
+        print(f"{size} entries: build {built:.1f} s, load from cache {loaded * 1000:.0f} ms, "
+              f"{len(index.terms)} n-grams, {len(index.docs)} postings; query {timing.percentiles(timings, digits=2)}"
+              f"; batched (32) {batched * 1000:.2f} ms/query")
+
+
+if __name__ == "__main__":
+    parser = timing.parser(__doc__)
+    parser.add_argument("--entries", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--queries", type=int, default=500)
+    args = parser.parse_args()
+    run(args.entries, args.queries)
@@ -0,0 +1,75 @@
+"""
+حافظه و زمان جستجوی فرم‌ها با تعداد زیادی چت همزمان، برای هر دو پیاده‌سازی form_store.
+برای مقایسه حافظه، همان فرم‌ها به شکل قدیمی (دیکشنری user_data با یک دیکشنری برای هر چت) هم ساخته می‌شوند.
+
+    python bench/bench_form_store.py --chats 100000
+"""
+import os
+import random
+import tempfile
+import tracemalloc
+import timing
+from form_store import FormState, MemoryFormStore, SqliteFormStore
+
+FIRST_CHAT_ID = 100000
+
+
+def form(i):
+    return FormState(f"درس {i % 200}", f"استاد {i % 500}", f"سوال شماره {i} درباره امتحان پایان‌ترم")
+
+
+# حافظه (مگابایت) نگه داشتن چت‌ها با build(chats)
+def memory_mb(build, chats):
+    tracemalloc.start()
+    kept = build(chats)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    return size / 1024 / 1024
+
+
+# حجم دیتابیس همراه با فایل WAL (مگابایت)
+def file_mb(path):
+    return sum(os.path.getsize(name) for name in (path, path + "-wal") if os.path.exists(name)) / 1024 / 1024
+
+
+def fill_store(chats):
+    store = MemoryFormStore(max_entries=chats)
+    for i in range(chats):
+        store.save(FIRST_CHAT_ID + i, form(i))
+    return store
+
+
+def fill_dict(chats):
+    forms = {}
+    for i in range(chats):
+        state = form(i)
+        forms[FIRST_CHAT_ID + i] = {"course": state.course, "professor": state.professor,
+                                    "question": state.question, "final_message": None}
+    return forms
+
+
+def run(chats, lookups):
+    print(f"memory for {chats} chats: MemoryFormStore {memory_mb(fill_store, chats):.1f} MB, "
+          f"dict per chat {memory_mb(fill_dict, chats):.1f} MB")
+
+    path = os.path.join(tempfile.mkdtemp(), "forms.db")
+    stores = {"memory": fill_store(chats), "sqlite": SqliteFormStore(path)}
+    sqlite = stores["sqlite"]
+    chat_ids = [FIRST_CHAT_ID + i for i in range(chats)]
+    save = timing.measure(lambda chat_id: sqlite.save(chat_id, form(chat_id)), chat_ids)
+    print(f"sqlite save: {timing.percentiles(save, 'µs', 1e6, 1)}, "
+          f"file {file_mb(path):.1f} MB")
+
+    rng = random.Random(7)
+    keys = [rng.choice(chat_ids) for _ in range(lookups)]
+    for name, store in stores.items():
+        print(f"{name} get: {timing.percentiles(timing.measure(store.get, keys), 'µs', 1e6, 1)}")
+
+
+if __name__ == "__main__":
+    parser = timing.parser(__doc__)
+    parser.add_argument("--chats", type=int, default=100000)
+    parser.add_argument("--lookups", type=int, default=20000)
+    args = parser.parse_args()
+    run(args.chats, args.lookups)
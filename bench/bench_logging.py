@@ -0,0 +1,66 @@
+"""
+زمان اجرای یک هندلر (با metrics.instrument و یک لاگ INFO در خود هندلر) با لاگ خاموش، با لاگ‌گیری قدیمی
+(FileHandler و StreamHandler در همان ترد) و با setup_logging (صف و QueueListener، فایل JSON).
+خروجی کنسول به /dev/null فرستاده می‌شود تا فقط هزینه لاگ‌گیری اندازه‌گیری شود.
+
+    python bench/bench_logging.py --calls 50000
+"""
+import atexit
+import logging
+import os
+import tempfile
+import time
+import timing
+from types import SimpleNamespace
+import metrics
+from log_setup import setup_logging
+
+logger = logging.getLogger("bench")
+
+
+@metrics.instrument
+def handler(message):
+    logger.info("📩 پیام %s از %s", message.message_id, message.chat.id)
+
+
+def message(i):
+    return SimpleNamespace(message_id=i, chat=SimpleNamespace(id=100000 + i % 500))
+
+
+def sync_logging(path):
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s", force=True,
+        handlers=[logging.FileHandler(path, encoding="utf-8"), logging.StreamHandler(open(os.devnull, "w"))],
+    )
+
+
+def queue_logging(path):
+    listener = setup_logging(path=path, level="INFO")
+    listener.handlers[1].setStream(open(os.devnull, "w"))
+    return listener
+
+
+def run(calls):
+    directory = tempfile.mkdtemp()
+    messages = [message(i) for i in range(calls)]
+    logging.basicConfig(level=logging.WARNING, force=True)
+    configs = {"off (WARNING)": None, "sync FileHandler": sync_logging, "queue + JSON file": queue_logging}
+    for title, configure in configs.items():
+        path = os.path.join(directory, title.split(" ")[0] + ".log")
+        listener = configure(path) if configure else None
+        started = time.perf_counter()
+        timings = timing.measure(handler, messages)
+        if listener:
+            listener.stop()  # صبر تا نوشته شدن همه لاگ‌های صف
+            atexit.unregister(listener.stop)
+        total = time.perf_counter() - started
+        print(f"{title}: {timing.percentiles(timings, 'µs', 1e6, 1)}, "
+              f"{calls} calls written in {total:.2f} s")
+        logging.basicConfig(level=logging.WARNING, force=True)
+
+
+if __name__ == "__main__":
+    parser = timing.parser(__doc__)
+    parser.add_argument("--calls", type=int, default=50000)
+    args = parser.parse_args()
+    run(args.calls)
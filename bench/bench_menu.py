@@ -0,0 +1,86 @@
+"""
+هزینه پیدا کردن هندلر هر پیام با Menu در مقایسه با زنجیره if/elif قدیمی، و هزینه کیبورد منو.
+زمان هر عملیات میانگین یک حلقه طولانی است (بهترین تکرار از چند بار) چون هر فراخوانی کمتر از یک میکروثانیه است.
+آخرین بخش کل مسیر یک آپدیت در telebot (process_new_updates تا هندلر خالی) را اندازه می‌گیرد.
+
+    python bench/bench_menu.py --loops 200000
+"""
+import timeit
+import time
+import timing
+from telebot import TeleBot, types
+from telebot.types import KeyboardButton, ReplyKeyboardMarkup
+from menu import Menu
+
+LABELS = ["📚 درس‌ها", "👨‍🏫 اساتید", "❓ سوالات متداول", "🎮 بازی", "📞 پشتیبانی"]
+COMMANDS = ["start", "help", "courses", "search", "stats", "review", "broadcast"]
+
+
+def noop(message):
+    pass
+
+
+def build_menu():
+    menu = Menu()
+    for label in LABELS:
+        menu.button(label)(noop)
+    for command in COMMANDS:
+        menu.command(command, f"دستور {command}")(noop)
+    return menu
+
+
+# هندلر قدیمی handle_text: مقایسه پشت سر هم با متن دکمه‌ها
+def if_elif(text):
+    if text == LABELS[0]:
+        return noop
+    elif text == LABELS[1]:
+        return noop
+    elif text == LABELS[2]:
+        return noop
+    elif text == LABELS[3]:
+        return noop
+    elif text == LABELS[4]:
+        return noop
+    return None
+
+
+def build_markup():
+    markup = ReplyKeyboardMarkup(resize_keyboard=True)
+    markup.add(*[KeyboardButton(label) for label in LABELS])
+    return markup.to_json()
+
+
+def per_call(func, loops):
+    return min(timeit.repeat(func, number=loops, repeat=5)) / loops
+
+
+def update(update_id, text):
+    user = {"id": 100000, "is_bot": False, "first_name": "user"}
+    return types.Update.de_json({"update_id": update_id, "message": {
+        "message_id": update_id, "date": int(time.time()), "from": user,
+        "chat": {"id": 100000, "type": "private"}, "text": text}})
+
+
+def run(loops):
+    menu = build_menu()
+    cases = {"last label": LABELS[-1], "command": "/search@fake_bot ریاضی", "unknown text": "سلام"}
+    for title, text in cases.items():
+        print(f"{title}: Menu.resolve {per_call(lambda: menu.resolve(text), loops) * 1e9:.0f} ns, "
+              f"if/elif {per_call(lambda: if_elif(text), loops) * 1e9:.0f} ns")
+    print(f"menu keyboard: cached {per_call(menu.markup, loops) * 1e9:.0f} ns, "
+          f"rebuilt per call {per_call(build_markup, loops // 10) * 1e6:.1f} µs")
+
+    # مسیر کامل مثل app.py: یک هندلر متن برای همه پیام‌ها که menu.dispatch را صدا می‌زند
+    bot = TeleBot("1:fake", threaded=False)
+    bot.message_handler(func=lambda message: True)(menu.dispatch)
+    updates = [update(i, LABELS[i % len(LABELS)]) for i in range(loops // 10)]
+    timings = timing.measure(lambda item: bot.process_new_updates([item]), updates)
+    print(f"process_new_updates per update: {timing.percentiles(timings, 'µs', 1e6, 1)}, "
+          f"{len(updates) / sum(timings):.0f} updates/s")
+
+
+if __name__ == "__main__":
+    parser = timing.parser(__doc__)
+    parser.add_argument("--loops", type=int, default=200000)
+    args = parser.parse_args()
+    run(args.loops)
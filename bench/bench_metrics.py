@@ -0,0 +1,82 @@
+"""
+سربار متریک‌ها: هندلر خالی با و بدون metrics.instrument (لاگ INFO خاموش، مثل تنظیم عادی production با
+LOG_LEVEL=WARNING)، درخواست Bot API با و بدون instrument_api، همان هندلر از چند ترد همزمان،
+و زمان ساختن خروجی /metrics.
+
+    python bench/bench_metrics.py --loops 200000
+"""
+import logging
+import threading
+import time
+import timeit
+import timing
+from types import SimpleNamespace
+from telebot import apihelper
+import metrics
+
+UPDATE = SimpleNamespace(chat=SimpleNamespace(id=100000))
+
+
+def handler(message):
+    pass
+
+
+def make_request(token, method_name, method="get", params=None, files=None):
+    return True
+
+
+def per_call(func, loops):
+    return min(timeit.repeat(func, number=loops, repeat=5)) / loops
+
+
+# تعداد فراخوانی در ثانیه از threads ترد همزمان
+def threaded_rate(func, threads, loops):
+    barrier = threading.Barrier(threads + 1)
+
+    def work():
+        barrier.wait()
+        for _ in range(loops):
+            func(UPDATE)
+
+    workers = [threading.Thread(target=work) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for worker in workers:
+        worker.join()
+    return threads * loops / (time.perf_counter() - started)
+
+
+def run(loops):
+    logging.getLogger().setLevel(logging.WARNING)
+    instrumented = metrics.instrument(handler)
+    plain, timed = per_call(lambda: handler(UPDATE), loops), per_call(lambda: instrumented(UPDATE), loops)
+    print(f"handler: plain {plain * 1e9:.0f} ns, instrumented {timed * 1e9:.0f} ns "
+          f"(+{(timed - plain) * 1e6:.2f} µs per update)")
+
+    apihelper._make_request = make_request
+    plain = per_call(lambda: apihelper._make_request("1:fake", "sendMessage"), loops)
+    metrics.instrument_api()
+    timed = per_call(lambda: apihelper._make_request("1:fake", "sendMessage"), loops)
+    print(f"Bot API call: plain {plain * 1e9:.0f} ns, instrumented {timed * 1e9:.0f} ns "
+          f"(+{(timed - plain) * 1e6:.2f} µs per request)")
+
+    for threads in (1, 8):
+        print(f"{threads} threads: plain {threaded_rate(handler, threads, loops // threads):,.0f} calls/s, "
+              f"instrumented {threaded_rate(instrumented, threads, loops // threads):,.0f} calls/s")
+
+    # سری‌های یک بات واقعی: حدود 30 هندلر و 10 متد API
+    for i in range(30):
+        metrics.handler_duration.observe(f"handler_{i}", 0.003)
+    for i in range(10):
+        metrics.api_duration.observe(f"method_{i}", 0.05)
+    body = metrics.render()
+    print(f"/metrics render: {per_call(metrics.render, 1000) * 1e3:.2f} ms for {body.count(chr(10))} lines")
+
+
+if __name__ == "__main__":
+    parser = timing.parser(__doc__)
+    parser.add_argument("--loops", type=int, default=200000)
+    args = parser.parse_args()
+    run(args.loops)
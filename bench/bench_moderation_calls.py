@@ -0,0 +1,156 @@
+"""
+تعداد درخواست‌های Bot API برای هر فرم تأیید شده، از ارسال سوال تا انتشار در کانال، روی شبیه‌ساز Bot API.
+کاربران مثل load_test.py (ولی یکی پس از دیگری) فرم را پر می‌کنند و ادمین فرم‌ها را تأیید می‌کند: در صف بررسی با «تأیید همه»
+(یک بار برای هر صفحه) و در اسکریپت تک‌فایلی قدیمی با دکمه تأیید زیر پیام جداگانه هر فرم.
+درخواست‌ها بر اساس مقصد شمرده می‌شوند: ادمین، کانال، جواب callback، پیام تصمیم به کاربر و پیام‌های پر کردن فرم؛
+همه به جز پیام‌های پر کردن فرم هزینه بررسی و انتشار هستند. getUpdates شمرده نمی‌شود.
+صف ارسال پست‌های کانال را به 20 در دقیقه محدود می‌کند، پس اجرا با 50 کاربر حدود سه دقیقه طول می‌کشد.
+
+    python bench/bench_moderation_calls.py --users 50
+    python bench/bench_moderation_calls.py --users 50 --review-every 10 --env DIGEST_INTERVAL=30
+    git show <baseline>:src/upmain.py > /tmp/upmain.py
+    python bench/bench_moderation_calls.py --users 50 --baseline /tmp/upmain.py
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import timing
+from fake_api import FakeBotApi
+from load_test import ADMIN_CHAT_ID, CHANNEL_ID, Scenario
+
+# اسکریپت قدیمی آدرس Bot API را از تنظیمات نمی‌خواند؛ قبل از اجرای آن آدرس شبیه‌ساز تنظیم می‌شود
+BASELINE_LAUNCHER = (
+    "import os, runpy, sys; from telebot import apihelper; "
+    "apihelper.API_URL = os.environ['TELEGRAM_API_URL'] + '/bot{0}/{1}'; "
+    "runpy.run_path(sys.argv[1], run_name='__main__')"
+)
+THINK_TIME = 0.05  # فاصله رسیدن پیام بات تا جواب کاربر (ثانیه)
+
+
+class ReviewScenario(Scenario):
+    """
+    کاربران load_test.py به همراه ادمینی که هر صفحه یا هر فرم را فقط یک بار تأیید می‌کند.
+    کاربران یکی یکی فرم را پر می‌کنند: بات تک‌فایلی قدیمی وقتی چند پیام در یک دسته getUpdates برسند
+    بعضی از next step handlerها را جا می‌اندازد و فرم آن کاربران هیچ‌وقت ارسال نمی‌شود.
+    """
+
+    def __init__(self, api, users, review_every=0):
+        super().__init__(api, users, "admin")
+        self.review_every = review_every  # فاصله باز کردن /review توسط ادمین؛ 0 یعنی با هر اعلان فرم جدید
+        self.admin_seen = time.monotonic()
+        self.reviewing = False  # ادمین /review را باز کرده و صفحه‌ها را تا آخر تأیید می‌کند
+        self._waiting = iter(list(self.users))
+
+    def start(self):
+        self.api.push_message(next(self._waiting), "/start")
+
+    # کاربر کمی بعد از رسیدن پیام جواب می‌دهد؛ اسکریپت قدیمی مرحله بعد را بعد از ارسال سوال ثبت می‌کند
+    # و جوابی که زودتر برسد گم می‌شود
+    def _next_step(self, user_id, text, markup, message_id, now):
+        threading.Timer(THINK_TIME, self._reply, (user_id, text, markup, message_id)).start()
+
+    def _reply(self, user_id, text, markup, message_id):
+        with self._lock:
+            super()._next_step(user_id, text, markup, message_id, time.monotonic())
+        if text.startswith("فرم شما به ادمین"):
+            user_id = next(self._waiting, None)
+            if user_id is not None:
+                self.api.push_message(user_id, "/start")
+
+    def on_send(self, method, params, message):
+        super().on_send(method, params, message)
+        if message["chat"]["id"] != ADMIN_CHAT_ID:
+            return
+        self.admin_seen = time.monotonic()
+        markup = json.loads(params.get("reply_markup", "{}"))
+        buttons = [button["callback_data"] for row in markup.get("inline_keyboard", ()) for button in row]
+        approve = [data for data in buttons if data.startswith("approveall_")]
+        approve = approve or [data for data in buttons if data.startswith("confirm_")]
+        # با review_every اطلاعیه‌های فرم جدید (صفحه اول بررسی) تا نوبت بعدی بررسی کنار گذاشته می‌شوند
+        self.reviewing = bool(approve) and (self.reviewing or not self.review_every)
+        if self.reviewing:
+            self.api.push_callback(ADMIN_CHAT_ID, message["message_id"], approve[0])
+
+    # بررسی دوره‌ای، یا بدون review_every فرم‌های ارسال شده‌ای که بدون اعلان جدید (صفحه بررسی) در صف مانده‌اند
+    def admin_loop(self):
+        last_review = time.monotonic()
+        while not self.done.wait(0.2):
+            now = time.monotonic()
+            with self._lock:
+                waiting = sum(step == 2 for step in self.users.values()) > len(self.notices)
+            if (now - last_review > self.review_every) if self.review_every else (waiting and now - self.admin_seen > 2):
+                last_review = self.admin_seen = now
+                self.reviewing = True
+                self.api.push_message(ADMIN_CHAT_ID, "/review", first_name="admin")
+
+
+def destination(method, params, users):
+    if method == "answerCallbackQuery":
+        return "callback answer"
+    chat_id = str(params.get("chat_id"))
+    if chat_id == str(ADMIN_CHAT_ID):
+        return "admin"
+    if chat_id == str(CHANNEL_ID):
+        return "channel"
+    if not chat_id.lstrip("-").isdigit() or int(chat_id) not in users:
+        return "other"
+    return "user decision" if params.get("text", "").startswith(("✅", "❌")) else "user form"
+
+
+def run(users, baseline, env, timeout, review_every=0):
+    api = FakeBotApi()
+    scenario = ReviewScenario(api, users, review_every)
+    api.on_send = scenario.on_send
+    api.start()
+    if baseline:
+        bot = subprocess.Popen(
+            [sys.executable, "-c", BASELINE_LAUNCHER, os.path.abspath(baseline)], cwd=tempfile.mkdtemp(prefix="bench-"),
+            env=dict(os.environ, TOKEN="1:fake", CHANNEL_ID=str(CHANNEL_ID), ADMIN_CHAT_ID=str(ADMIN_CHAT_ID),
+                     TELEGRAM_API_URL=api.url),
+            start_new_session=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+    else:
+        bot = timing.start_bot(api, **env)
+    try:
+        scenario.start()
+        if not baseline:  # در اسکریپت قدیمی هر فرم جداگانه به ادمین می‌رسد و /review وجود ندارد
+            threading.Thread(target=scenario.admin_loop, daemon=True).start()
+        if not scenario.done.wait(timeout):
+            raise RuntimeError(f"only {len(scenario.published)} of {users} forms published in {timeout} s")
+        time.sleep(1)  # اعلان‌ها و جواب‌های باقی‌مانده
+    finally:
+        timing.stop_bot(bot)
+        api.stop()
+
+    counts = {}
+    for _, method, params in list(api.sent):
+        if method not in ("getUpdates", "getMe", "deleteWebhook"):
+            kind = destination(method, params, scenario.users)
+            counts[kind] = counts.get(kind, 0) + 1
+    total = sum(counts.values())
+    moderation = total - counts.get("user form", 0)
+    title = f"baseline {os.path.basename(baseline)}" if baseline else " ".join(["app.py"] + [
+        f"{key}={value}" for key, value in env.items()])
+    if review_every and not baseline:
+        title += f", /review every {review_every:g} s"
+    print(f"{title}: {users} forms, {total / users:.2f} calls per form, "
+          f"{moderation / users:.2f} for review and publishing")
+    print("  " + ", ".join(f"{kind} {count / users:.2f}" for kind, count in sorted(counts.items())))
+    print(f"  channel posts: {len(scenario.channel_posts)}, "
+          f"methods: {', '.join(f'{m} {n}' for m, n in sorted(api.calls.items()) if m != 'getUpdates')}")
+
+
+if __name__ == "__main__":
+    parser = timing.parser(__doc__)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--baseline", help="single-file bot script to run instead of app.py")
+    parser.add_argument("--env", action="append", default=[], help="extra KEY=VALUE for app.py")
+    parser.add_argument("--review-every", type=float, default=0,
+                        help="admin opens /review every N seconds instead of on each new form notice")
+    parser.add_argument("--timeout", type=float, default=600)
+    args = parser.parse_args()
+    run(args.users, args.baseline, dict(item.split("=", 1) for item in args.env), args.timeout, args.review_every)
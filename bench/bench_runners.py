@@ -0,0 +1,54 @@
+"""
+تعداد آپدیت در ثانیه در حالت‌های اجرای polling، async و sharded روی شبیه‌ساز Bot API.
+هر آپدیت یک دکمه اینلاین است که هندلر آن answerCallbackQuery را مستقیم (بدون صف ارسال) صدا می‌زند،
+پس با --latency هر آپدیت یک رفت و برگشت کند به تلگرام دارد و همزمانی اجرای هندلرها اندازه‌گیری می‌شود.
+زمان از تحویل اولین دسته تا رسیدن جواب آخرین دکمه به شبیه‌ساز است.
+
+    python bench/bench_runners.py --updates 2000 --latency 0.05
+    python bench/bench_runners.py --modes sharded --workers 1,2,4,8
+"""
+import time
+import timing
+from fake_api import FakeBotApi
+
+FIRST_CHAT_ID = 100000
+
+
+def run(mode, updates, chats, latency, workers=None):
+    api = FakeBotApi(latency=latency).start()
+    env = {"RUN_MODE": mode, "OFFSET_FILE": "none", "POLL_TIMEOUT": "1"}
+    if workers:
+        env["SHARD_WORKERS"] = str(workers)
+    bot = timing.start_bot(api, **env)
+    try:
+        # یک دکمه برای گرم شدن: تا جواب آن نرسد بات (و همه کارگرها) آماده نیستند
+        for chat_id in range(FIRST_CHAT_ID - (workers or 1), FIRST_CHAT_ID):
+            api.push_callback(chat_id, 1, "bench")
+        if not timing.wait_for(lambda: api.calls.get("answerCallbackQuery", 0) >= (workers or 1), 60):
+            raise RuntimeError(f"bot did not start in {mode} mode")
+        answered = api.calls["answerCallbackQuery"]
+        started = time.monotonic()
+        for i in range(updates):
+            api.push_callback(FIRST_CHAT_ID + i % chats, 1, "bench")
+        if not timing.wait_for(lambda: api.calls.get("answerCallbackQuery", 0) >= answered + updates, 600):
+            raise RuntimeError(f"only {api.calls['answerCallbackQuery'] - answered} of {updates} updates handled")
+        elapsed = time.monotonic() - started + latency  # جواب آخرین دکمه بعد از latency به بات می‌رسد
+    finally:
+        timing.stop_bot(bot)
+        api.stop()
+    return elapsed
+
+
+if __name__ == "__main__":
+    parser = timing.parser(__doc__)
+    parser.add_argument("--updates", type=int, default=2000)
+    parser.add_argument("--chats", type=int, default=500)
+    parser.add_argument("--latency", type=float, default=0.05, help="Bot API round-trip in seconds")
+    parser.add_argument("--modes", default="polling,async,sharded")
+    parser.add_argument("--workers", default="4", help="comma separated SHARD_WORKERS for sharded mode")
+    args = parser.parse_args()
+    for mode in args.modes.split(","):
+        for workers in ([int(n) for n in args.workers.split(",")] if mode == "sharded" else [None]):
+            elapsed = run(mode, args.updates, args.chats, args.latency, workers)
+            title = f"{mode} ({workers} workers)" if workers else mode
+            print(f"{title}: {args.updates} updates in {elapsed:.2f} s, {args.updates / elapsed:.0f} updates/s")
@@ -0,0 +1,46 @@
+"""
+توان عملیاتی صف ارسال و تعداد خطاهای 429 روی شبیه‌ساز Bot API که هر چندمین sendMessage را با 429 جواب می‌دهد.
+هر تأیید فرم مثل هندلر تأیید یک پیام به کاربر و یک اعلان به ادمین (ادغام شونده) در صف می‌گذارد.
+
+    python bench/bench_send_queue.py --approvals 1000 --flood-every 0,20
+"""
+import logging
+import time
+import timing
+from telebot import TeleBot, apihelper
+from fake_api import FakeBotApi
+from send_queue import SendQueue
+
+ADMIN_CHAT_ID = 999
+FIRST_CHAT_ID = 100000
+
+
+def run(approvals, flood_every, retry_after, latency):
+    api = FakeBotApi(flood_every=flood_every, retry_after=retry_after, latency=latency).start()
+    apihelper.API_URL = api.url + "/bot{0}/{1}"
+    outbox = SendQueue(TeleBot("1:fake", threaded=False), coalesce_chats=[ADMIN_CHAT_ID])
+    try:
+        started = time.monotonic()
+        for i in range(approvals):
+            outbox.send_message(FIRST_CHAT_ID + i, f"✅ فرم شماره {i} تأیید و در کانال منتشر شد.")
+            outbox.send_message(ADMIN_CHAT_ID, f"فرم شماره {i} تأیید شد.")
+        outbox.wait_replies()
+        elapsed = time.monotonic() - started
+    finally:
+        api.stop()
+    stats = outbox.stats
+    print(f"flood every {flood_every or '-'}: {stats['sent']} sent in {elapsed:.1f} s "
+          f"({stats['sent'] / elapsed:.1f} msg/s), 429s {stats['flood_errors']}, "
+          f"coalesced {stats['coalesced']}, failed {stats['failed']}")
+
+
+if __name__ == "__main__":
+    parser = timing.parser(__doc__)
+    parser.add_argument("--approvals", type=int, default=1000)
+    parser.add_argument("--flood-every", default="0,20", help="comma separated; 0 means no 429s")
+    parser.add_argument("--retry-after", type=int, default=1)
+    parser.add_argument("--latency", type=float, default=0.05, help="Bot API round-trip in seconds")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.ERROR)
+    for flood_every in args.flood_every.split(","):
+        run(args.approvals, int(flood_every), args.retry_after, args.latency)
@@ -0,0 +1,43 @@
+"""
+زمان پیدا کردن تیکت هر پاسخ ادمین (route): دیتابیس موقت با تیکت‌های باز ساخته می‌شود
+و صدک زمان جستجو از SQLite (بدون cache) و از حافظه گزارش می‌شود.
+
+    python bench/bench_tickets.py --tickets 100000
+"""
+import os
+import random
+import tempfile
+import time
+import timing
+from tickets import TicketStore
+
+
+def run(count, lookups):
+    path = os.path.join(tempfile.mkdtemp(), "tickets.db")
+    store = TicketStore(path)
+    started = time.perf_counter()
+    with store._lock:
+        store._db.execute("BEGIN")
+        now = time.time()
+        store._db.executemany("INSERT INTO tickets (chat_id, created_at, updated_at) VALUES (?, ?, ?)",
+                              ((100000 + i, now, now) for i in range(count)))
+        store._db.executemany("INSERT INTO routes (message_id, ticket_id) VALUES (?, ?)",
+                              ((i * 3 + 1, i + 1) for i in range(count)))
+        store._db.execute("COMMIT")
+    print(f"created {count} open tickets in {time.perf_counter() - started:.1f} s")
+
+    rng = random.Random(7)
+    for title, store in (("cold (sqlite)", TicketStore(path, cache_size=0)), ("warm (memory)", store)):
+        if title.startswith("warm"):
+            for i in range(count):
+                store.route(i * 3 + 1)
+        message_ids = [rng.randrange(count) * 3 + 1 for _ in range(lookups)]
+        print(f"{title}: {timing.percentiles(timing.measure(store.route, message_ids), 'µs', 1e6, 1)}")
+
+
+if __name__ == "__main__":
+    parser = timing.parser(__doc__)
+    parser.add_argument("--tickets", type=int, default=100000)
+    parser.add_argument("--lookups", type=int, default=20000)
+    args = parser.parse_args()
+    run(args.tickets, args.lookups)
@@ -0,0 +1,83 @@
+"""
+تأخیر از رسیدن آپدیت تا اولین sendMessage بات در حالت webhook در مقایسه با polling، روی شبیه‌ساز Bot API.
+هر آپدیت /start از یک چت جدید است و با نرخ --rate در ثانیه (کمتر از سقف صف ارسال) فرستاده می‌شود؛
+در حالت webhook آپدیت مستقیم به سرور وبهوک بات POST می‌شود و در polling در صف getUpdates شبیه‌ساز قرار می‌گیرد.
+
+    python bench/bench_webhook.py --updates 300 --rate 10
+"""
+import json
+import socket
+import time
+import urllib.request
+import timing
+from fake_api import FakeBotApi
+
+FIRST_CHAT_ID = 100000
+SECRET = "bench-secret"
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def post_update(port, update_id, chat_id):
+    user = {"id": chat_id, "is_bot": False, "first_name": "user"}
+    body = json.dumps({"update_id": update_id, "message": {
+        "message_id": update_id, "date": int(time.time()), "from": user,
+        "chat": {"id": chat_id, "type": "private"}, "text": "/start",
+    }}).encode("utf-8")
+    request = urllib.request.Request(f"http://127.0.0.1:{port}/webhook", body, method="POST", headers={
+        "Content-Type": "application/json", "X-Telegram-Bot-Api-Secret-Token": SECRET})
+    urllib.request.urlopen(request).close()
+
+
+def run(mode, updates, rate):
+    received, replied = {}, {}
+
+    def on_send(method, params, message):
+        replied.setdefault(message["chat"]["id"], time.monotonic())
+
+    api = FakeBotApi(on_send=on_send).start()
+    port = free_port()
+    env = {"RUN_MODE": mode, "OFFSET_FILE": "none"}
+    if mode == "webhook":
+        env.update(WEBHOOK_URL=f"http://127.0.0.1:{port}", WEBHOOK_SECRET=SECRET, WEBHOOK_PORT=str(port))
+    bot = timing.start_bot(api, **env)
+
+    def send(update_id, chat_id):
+        if mode == "webhook":
+            post_update(port, update_id, chat_id)
+        else:
+            api.push_message(chat_id, "/start")
+
+    try:
+        if mode == "webhook" and not timing.wait_for(lambda: api.webhook_url, 60):
+            raise RuntimeError("bot did not set its webhook")
+        # یک آپدیت برای گرم شدن (بارگذاری پلاگین‌ها و اولین اتصال‌ها)
+        warmup = FIRST_CHAT_ID - 1
+        send(1, warmup)
+        if not timing.wait_for(lambda: warmup in replied, 60):
+            raise RuntimeError(f"bot did not answer in {mode} mode")
+        for i in range(updates):
+            chat_id = FIRST_CHAT_ID + i
+            received[chat_id] = time.monotonic()
+            send(i + 2, chat_id)
+            time.sleep(max(0.0, received[FIRST_CHAT_ID] + (i + 1) / rate - time.monotonic()))
+        if not timing.wait_for(lambda: all(chat_id in replied for chat_id in received), 60):
+            raise RuntimeError(f"{sum(chat_id in replied for chat_id in received)} of {updates} updates answered")
+    finally:
+        timing.stop_bot(bot)
+        api.stop()
+    return [replied[chat_id] - started for chat_id, started in received.items()]
+
+
+if __name__ == "__main__":
+    parser = timing.parser(__doc__)
+    parser.add_argument("--updates", type=int, default=300)
+    parser.add_argument("--rate", type=float, default=10, help="updates per second")
+    parser.add_argument("--modes", default="webhook,polling")
+    args = parser.parse_args()
+    for mode in args.modes.split(","):
+        print(f"{mode}: {timing.percentiles(run(mode, args.updates, args.rate), points=(50, 99))}")
@@ -0,0 +1,70 @@
+"""
+ابزار مشترک بنچمارک‌های این پوشه: وارد کردن ماژول‌های بات از src، اجرای بات روی شبیه‌ساز Bot API
+و گزارش صدک زمان‌ها. هر بنچمارک مستقیم اجرا می‌شود، مثلاً:
+
+    python bench/bench_dedupe.py --questions 100000
+"""
+import argparse
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+
+# ماژول‌های بات مستقیم از پوشه src وارد می‌شوند (مثل tests/conftest.py)
+SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+if SRC not in sys.path:
+    sys.path.insert(0, SRC)
+
+
+# اجرای app.py در پروسه جدا روی شبیه‌ساز api (مثل load_test.py) با تنظیمات اضافه env
+def start_bot(api, **env):
+    env = dict(os.environ, TOKEN="1:fake", CHANNEL_ID="-1001", ADMIN_CHAT_ID="999", TELEGRAM_API_URL=api.url,
+               LOG_LEVEL="WARNING", **env)
+    return subprocess.Popen([sys.executable, os.path.join(SRC, "app.py")], cwd=tempfile.mkdtemp(prefix="bench-"),
+                            env=env, start_new_session=True)
+
+
+# توقف بات همراه با پروسه‌های فرزند آن (کارگرهای حالت sharded)
+def stop_bot(bot):
+    os.killpg(bot.pid, signal.SIGTERM)
+    bot.wait()
+
+
+# صبر تا برقرار شدن condition()؛ خروجی False بعد از timeout ثانیه
+def wait_for(condition, timeout, interval=0.01):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(interval)
+    return True
+
+
+def parser(doc):
+    return argparse.ArgumentParser(description=doc, formatter_class=argparse.RawDescriptionHelpFormatter)
+
+
+# زمان اجرای func برای هر ورودی (ثانیه)
+def measure(func, items):
+    timings = []
+    for item in items:
+        started = time.perf_counter()
+        func(item)
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+# صدک p (بدون درون‌یابی) از مقادیر
+def percentile(values, p):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, len(values) * p // 100)]
+
+
+# "p50 0.120 ms, p90 ..., p99 ..." با scale برای تبدیل ثانیه به unit
+def percentiles(timings, unit="ms", scale=1000, digits=3, points=(50, 90, 99)):
+    timings = sorted(timings)
+    return ", ".join(f"p{p} {percentile(timings, p) * scale:.{digits}f} {unit}" for p in points)
@@ -0,0 +1,212 @@
+import atexit
+import logging
+import os
+import re
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from collections import Counter, namedtuple
+
+try:
+    import numpy
+except ImportError:  # بدون NumPy تجمیع با array و Counter انجام می‌شود
+    numpy = None
+
+logger = logging.getLogger(__name__)
+
+# مراحل فرم، تصمیم ادمین و انتشار (answered: فرمی که با جواب سوالات متداول بسته شد)
+KINDS = ("started", "course", "professor", "submitted", "approved", "rejected", "published", "answered")
+# ستون‌های هر رویداد: (نام، نوع array، نوع NumPy)
+COLUMNS = (("ts", "d", "f8"), ("chat", "q", "i8"), ("course", "I", "u4"), ("professor", "I", "u4"),
+           ("value", "d", "f8"))
+
+Stats = namedtuple("Stats", "funnel users top_courses top_professors review_times")
+
+
+class EventLog:
+    """
+    لاگ رویدادها به صورت ستونی و فقط افزودنی: برای هر نوع رویداد و هر ستون یک فایل باینری جدا
+    (مثلاً submitted.course) و نام درس‌ها و اساتید به صورت کد عددی در strings.txt.
+    هر پروسه (اصلی یا کارگرهای sharded) در segment خودش می‌نویسد و آمار از همه segmentها خوانده می‌شود.
+    رویدادها در حافظه جمع و هر flush_interval ثانیه به انتهای فایل‌ها اضافه می‌شوند.
+    """
+
+    def __init__(self, directory="analytics", segment="main", flush_interval=2.0):
+        self.directory = directory
+        self.path = os.path.join(directory, segment)
+        self.flush_interval = flush_interval
+        os.makedirs(self.path, exist_ok=True)
+        self._lock = threading.Lock()
+        self._codes = {}  # رشته -> کد (0 یعنی خالی)
+        # کد هر رشته شماره سطر آن در strings.txt است، پس کد بعدی از تعداد سطرها گرفته می‌شود
+        strings_path = os.path.join(self.path, "strings.txt")
+        _drop_partial_line(strings_path)
+        strings = _read_strings(strings_path)
+        for code, text in enumerate(strings, 1):
+            self._codes.setdefault(text, code)
+        self._next_code = len(strings) + 1
+        self._new_strings = []
+        self._buffer = {kind: [array(typecode) for _, typecode, _ in COLUMNS] for kind in KINDS}
+        self._thread = None
+        atexit.register(self.flush)
+
+    def _code(self, text):
+        if not text:
+            return 0
+        code = self._codes.get(text)
+        if code is None:
+            code = self._codes[text] = self._next_code
+            self._next_code += 1
+            self._new_strings.append(text)
+        return code
+
+    def record(self, kind, chat_id, course=None, professor=None, value=0.0):
+        with self._lock:
+            columns = self._buffer[kind]
+            columns[0].append(time.time())
+            columns[1].append(chat_id)
+            columns[2].append(self._code(course))
+            columns[3].append(self._code(professor))
+            columns[4].append(value)
+
+    def flush(self):
+        with self._lock:
+            strings, self._new_strings = self._new_strings, []
+            buffer = self._buffer
+            self._buffer = {kind: [array(typecode) for _, typecode, _ in COLUMNS] for kind in KINDS}
+        # نام‌ها قبل از ستون‌ها نوشته می‌شوند تا هیچ کدی بدون نام روی دیسک نباشد
+        if strings:
+            with open(os.path.join(self.path, "strings.txt"), "a", encoding="utf-8", newline="") as file:
+                file.write("".join(_escape(text) + "\n" for text in strings))
+        for kind, columns in buffer.items():
+            if not columns[0]:
+                continue
+            for (name, _, _), column in zip(COLUMNS, columns):
+                with open(os.path.join(self.path, f"{kind}.{name}"), "ab") as file:
+                    column.tofile(file)
+
+    def start(self):
+        def loop():
+            while True:
+                time.sleep(self.flush_interval)
+                try:
+                    self.flush()
+                except Exception as e:
+                    logger.error("❌ خطا در ذخیره رویدادها: %s", e)
+
+        if self._thread is None:
+            self._thread = threading.Thread(target=loop, name="analytics-flush", daemon=True)
+            self._thread.start()
+
+    def segments(self):
+        return [os.path.join(self.directory, name) for name in sorted(os.listdir(self.directory))
+                if os.path.isdir(os.path.join(self.directory, name))]
+
+    # آمار رویدادهای بعد از زمان since از همه segmentها
+    def summary(self, since=0.0, top=5):
+        funnel = Counter()
+        users = set()
+        courses = Counter()
+        professors = Counter()
+        review_times = []
+        for path in self.segments():
+            names = [None] + _read_strings(os.path.join(path, "strings.txt"))
+            for kind in KINDS:
+                columns = _read_columns(path, kind, since)
+                if columns is None:
+                    continue
+                funnel[kind] += len(columns["ts"])
+                if kind == "started":
+                    users.update(_unique(columns["chat"]))
+                elif kind == "submitted":
+                    for code, count in _count(columns["course"]).items():
+                        courses[names[code]] += count
+                    for code, count in _count(columns["professor"]).items():
+                        professors[names[code]] += count
+                elif kind in ("approved", "rejected"):
+                    review_times.append(columns["value"])
+        if numpy is not None:
+            review_times = numpy.concatenate(review_times) if review_times else numpy.zeros(0)
+        else:
+            review_times = array("d", b"".join(column.tobytes() for column in review_times))
+        return Stats(funnel, len(users), courses.most_common(top), professors.most_common(top), review_times)
+
+
+# هر رشته در یک سطر strings.txt؛ خط جدید و بک‌اسلش داخل رشته escape می‌شوند
+def _escape(text):
+    return text.replace("\\", "\\\\").replace("\n", "\\n")
+
+
+def _unescape(line):
+    return re.sub(r"\\(.)", lambda match: "\n" if match.group(1) == "n" else match.group(1), line)
+
+
+# حذف سطر ناقص انتهای strings.txt تا رشته بعدی به آن نچسبد؛ ستون‌ها بعد از نام‌ها نوشته می‌شوند،
+# پس هیچ رویدادی به این سطر اشاره نمی‌کند
+def _drop_partial_line(path):
+    if not os.path.exists(path):
+        return
+    with open(path, "r+b") as file:
+        data = file.read()
+        if data and not data.endswith(b"\n"):
+            file.truncate(data.rfind(b"\n") + 1)
+
+
+# فقط \n جداکننده سطرهاست (نه \r یا جداکننده‌های یونیکد که splitlines می‌شناسد)؛
+# سطر ناقص انتهای فایل (قطع برنامه در حین نوشتن) نادیده گرفته می‌شود
+def _read_strings(path):
+    if not os.path.exists(path):
+        return []
+    with open(path, "r", encoding="utf-8", newline="") as file:
+        lines = file.read().split("\n")
+    return [_unescape(line) for line in lines[:-1]]
+
+
+# خواندن ستون‌های یک نوع رویداد؛ ردیف‌های ناقص انتهای فایل (قطع برنامه در حین نوشتن) نادیده گرفته می‌شوند
+def _read_columns(path, kind, since):
+    sizes = []
+    for name, typecode, _ in COLUMNS:
+        file_path = os.path.join(path, f"{kind}.{name}")
+        if not os.path.exists(file_path):
+            return None
+        sizes.append(os.path.getsize(file_path) // array(typecode).itemsize)
+    rows = min(sizes)
+    columns = {}
+    for name, typecode, dtype in COLUMNS:
+        file_path = os.path.join(path, f"{kind}.{name}")
+        if numpy is not None:
+            columns[name] = numpy.fromfile(file_path, dtype=dtype, count=rows)
+        else:
+            column = array(typecode)
+            with open(file_path, "rb") as file:
+                column.fromfile(file, rows)
+            columns[name] = column
+    # زمان رویدادها صعودی است، پس بازه زمانی با جستجوی دودویی جدا می‌شود
+    start = bisect_left(columns["ts"], since) if since else 0
+    return {name: column[start:] for name, column in columns.items()}
+
+
+def _count(column):
+    if numpy is not None:
+        counts = numpy.bincount(column)
+        return {int(code): int(counts[code]) for code in numpy.flatnonzero(counts) if code}
+    counts = Counter(column)
+    counts.pop(0, None)
+    return counts
+
+
+def _unique(column):
+    if numpy is not None:
+        return numpy.unique(column).tolist()
+    return set(column)
+
+
+# صدک p از مقادیر (بدون مرتب‌سازی کامل در حالت NumPy)
+def percentile(values, p):
+    if not len(values):
+        return 0.0
+    if numpy is not None:
+        return float(numpy.percentile(values, p))
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
@@ -0,0 +1,446 @@
+"""
+نقطه ورود واحد بات:
+
+    python app.py [--config config.txt] [--mode polling|async|webhook|sharded] [--plugins professors,review,...]
+    python app.py --check   # فقط ساخت بات و بارگذاری پلاگین‌ها و گزارش زمان شروع (برای بنچمارک)
+    python -X importtime app.py --check   # زمان import هر ماژول
+
+با TENANTS=eng,sci چند بات (هر کدام با ENG_TOKEN، ENG_CHANNEL_ID و ...) در یک پروسه اجرا می‌شوند.
+
+قابلیت‌ها (فرم اساتید، تأیید ادمین یا پیش‌نمایش، جستجو، آمار، بازی، پشتیبانی و ...) پلاگین‌هایی در
+پوشه plugins هستند که فقط در صورت فعال بودن در تنظیمات PLUGINS بارگذاری می‌شوند.
+"""
+import time
+
+STARTED = time.perf_counter()  # برای گزارش زمان شروع، شامل import کتابخانه‌ها
+
+import argparse
+import functools
+import importlib
+import logging
+import os
+import sys
+import telebot
+from telebot import apihelper, asyncio_helper
+from config import Config
+from log_setup import setup_logging
+import metrics
+from form_store import create_form_store
+from send_queue import SendQueue
+from idempotency import KeyedLocks, Ledger
+from transport import install_transport
+from menu import Menu
+
+DEFAULT_PLUGINS = "professors,faq,game,support,review,search,stats,broadcast"
+
+logger = logging.getLogger(__name__)
+
+
+# تنظیمات لاگ‌گیری (نوشتن در فایل و کنسول در ترد جداگانه، با چرخش و فشرده‌سازی فایل لاگ)
+def configure_logging(config, shard_index=None):
+    log_file = config.get("LOG_FILE", "bot.log")
+    if shard_index is not None:
+        # هر کارگر فایل لاگ جدا دارد تا چرخش فایل بین پروسه‌ها تداخل نداشته باشد
+        log_file = f"{os.path.splitext(log_file)[0]}.shard-{shard_index}.log"
+    setup_logging(
+        path=log_file,
+        level=config.get("LOG_LEVEL", "INFO"),
+        max_bytes=config.get_int("LOG_MAX_BYTES", 10 * 1024 * 1024),
+        backup_count=config.get_int("LOG_BACKUP_COUNT", 5),
+        rotate_when=config.get("LOG_ROTATE_WHEN"),  # مثلاً midnight برای چرخش روزانه؛ خالی یعنی بر اساس حجم
+    )
+
+
+class BotApp:
+    """
+    بات و سرویس‌های مشترک (تنظیمات، صف ارسال، فرم‌ها، منو) که پلاگین‌ها روی آن ثبت می‌شوند.
+    هر پلاگین یک ماژول در plugins با تابع setup(app) است و می‌تواند با REQUIRES پلاگین‌های
+    مورد نیاز خود را اعلام کند.
+    """
+
+    def __init__(self, config, shard_index=None, shard_count=1, tenant=None):
+        self.config = config
+        self.shard_index = shard_index  # شماره کارگر در حالت sharded؛ None یعنی پروسه اصلی
+        self.tenant = tenant  # نام بات در میزبانی چند بات (hosting)؛ None یعنی بات تنها در پروسه
+        self.run_mode = config.get("RUN_MODE", "polling")  # حالت اجرا: polling، async، webhook یا sharded
+
+        # در میزبانی چند بات، لاگ‌گیری یک بار برای کل پروسه تنظیم می‌شود
+        if tenant is None:
+            configure_logging(config, shard_index)
+
+        # پوشه فایل‌های داده (دیتابیس‌ها، offset و ...)؛ خالی یعنی پوشه جاری
+        self.data_dir = config.get("DATA_DIR", "")
+        if self.data_dir:
+            os.makedirs(self.data_dir, exist_ok=True)
+
+        self.token = config.get("TOKEN")  # توکن بات
+        self.channel_id = config.get("CHANNEL_ID")  # آیدی کانال
+        self.admin_chat_id = config.get("ADMIN_CHAT_ID")  # آیدی ادمین برای تایید فرم‌ها و پشتیبانی
+        if not self.token or not self.channel_id:
+            raise ValueError("توکن یا آیدی کانال در تنظیمات وارد نشده است.")
+
+        api_url = config.get("TELEGRAM_API_URL")  # آدرس سرور Bot API (برای سرور محلی یا شبیه‌ساز تست)
+        if api_url:
+            apihelper.API_URL = api_url.rstrip("/") + "/bot{0}/{1}"
+            asyncio_helper.API_URL = apihelper.API_URL
+            apihelper.FILE_URL = api_url.rstrip("/") + "/file/bot{0}/{1}"
+        # pool مشترک اتصال‌های keep-alive برای همه تردها (و همه بات‌های پروسه)
+        install_transport(config)
+
+        apihelper.ENABLE_MIDDLEWARE = True
+        # اجرای هندلرها را PollingEngine، AsyncRunner، کارگرهای sharded یا سرور وبهوک کنترل می‌کنند تا offset
+        # فقط بعد از پایان هندلرها ذخیره شود و آپدیت‌های هر چت به ترتیب اجرا شوند، پس بات خودش ترد نمی‌سازد
+        self.bot = telebot.TeleBot(self.token, threaded=False)
+        # رویداد update برای هر آپدیت دریافتی، قبل از هندلرها و مراحل (مثلاً برای ثبت کاربران)
+        self.bot.add_middleware_handler(lambda bot, update: self.emit("update", update))
+
+        # صف ارسال پیام‌ها با رعایت محدودیت‌های تلگرام (اعلان‌های ادمین با هم ادغام می‌شوند)
+        # در حالت sharded سقف ارسال سراسری بین کارگرها تقسیم می‌شود
+        self.outbox = SendQueue(self.bot, workers=config.get_int("SEND_WORKERS", 4),
+                                global_rate=30 / shard_count, coalesce_chats=[self.admin_chat_id] if self.admin_chat_id else [])
+
+        # فرم‌های در حال پر شدن؛ با STEP_STORE=sqlite فرم‌ها هم باید ماندگار باشند، وگرنه مرحله بازیابی شده
+        # بعد از ری‌استارت فرمی برای ادامه پیدا نمی‌کند
+        steps_persisted = config.get("STEP_STORE", "memory") == "sqlite"
+        form_backend = config.get("FORM_STORE", "sqlite" if steps_persisted else "memory")
+        if steps_persisted and form_backend != "sqlite":
+            raise ValueError("با STEP_STORE=sqlite باید FORM_STORE=sqlite باشد.")
+        self.forms = create_form_store(
+            form_backend, config.get("FORM_STORE_PATH", self.data_path("forms.db")),
+            ttl=config.get_int("FORM_TTL", 86400), max_entries=config.get_int("FORM_MAX_ENTRIES", 100000),
+        )
+
+        self.menu = Menu()
+        self.plugins = {}  # نام پلاگین -> ماژول
+        self.steps = []  # هندلرهای مراحل (برای ذخیره مرحله کاربران)
+        self.callbacks = {}  # action دکمه اینلاین -> هندلر
+        self.callback_keys = {}  # action -> تابع کلید منبعی که دکمه روی آن عمل می‌کند (مثلاً فرم)
+        # callbackهای پردازش شده و (دکمه، کلید)های انجام شده، برای نادیده گرفتن دوبار زدن دکمه و آپدیت تکراری
+        self.handled_callbacks = Ledger(ttl=config.get_float("CALLBACK_TTL", 600),
+                                        capacity=config.get_int("CALLBACK_LEDGER_SIZE", 100000))
+        self.callback_locks = KeyedLocks()
+        self.listeners = {}  # نام رویداد -> توابع
+        self.jobs = []  # کارهای پس‌زمینه
+        self.reply_handlers = []  # هندلرهای پاسخ به پیام‌های بات
+        self.submit_form = None  # ارسال فرم کامل شده (توسط پلاگین review یا preview تعیین می‌شود)
+        self.faq = None  # موتور جواب سوالات متداول (توسط پلاگین faq تعیین می‌شود)
+
+        self._register_core()
+
+    # ---- ثبت هندلرها توسط پلاگین‌ها ----
+
+    def step(self, func):
+        """ثبت هندلر مرحله تا در حالت STEP_STORE=sqlite بعد از ری‌استارت قابل بازیابی باشد"""
+        self.steps.append(func)
+        return func
+
+    def callback(self, *actions, key=None):
+        """
+        ثبت هندلر دکمه‌های اینلاین بر اساس بخش اول callback_data (قبل از اولین _).
+        key(call, parts) منبعی که دکمه روی آن عمل می‌کند (مثلاً فرم) را برمی‌گرداند؛ هر دکمه (callback_data)
+        روی هر منبع فقط یک بار اجرا می‌شود و دو دکمه همزمان روی یک منبع با هم اجرا نمی‌شوند. None یعنی بدون محدودیت.
+        """
+        def decorator(func):
+            for action in actions:
+                if action in self.callbacks:
+                    raise ValueError(f"دکمه {action} قبلاً توسط {self.callbacks[action].__module__} ثبت شده است.")
+                self.callbacks[action] = func
+                self.callback_keys[action] = key
+            return func
+
+        return decorator
+
+    def on(self, event, func):
+        self.listeners.setdefault(event, []).append(func)
+
+    def emit(self, event, *args):
+        for func in self.listeners.get(event, ()):
+            func(*args)
+
+    def reply(self, func):
+        """ثبت هندلر پیام‌هایی که در جواب (reply) یک پیام بات هستند؛ خروجی True یعنی پیام مدیریت شد"""
+        self.reply_handlers.append(func)
+        return func
+
+    def job(self, func):
+        """ثبت کار پس‌زمینه که هنگام اجرای بات شروع می‌شود"""
+        self.jobs.append(func)
+        return func
+
+    # ---- سرویس‌های مشترک ----
+
+    def send_message(self, chat_id, text, on_sent=None, **kwargs):
+        return self.outbox.send_message(chat_id, text, on_sent, **kwargs)
+
+    # جواب فوری به callback تا دکمه در برنامه کاربر از حالت انتظار خارج شود
+    def answer_callback(self, call):
+        try:
+            self.bot.answer_callback_query(call.id)
+        except Exception as e:
+            logger.warning("⚠️ جواب callback %s ارسال نشد: %s", call.id, e)  # مثلاً callback قدیمی بعد از ری‌استارت
+
+    # ماندگار کردن نتیجه آپدیت‌های پردازش شده قبل از ذخیره offset: اول ارسال جواب‌ها و سوال‌های مراحل
+    # به کاربران، بعد نوشتن مرحله کاربران؛ با ری‌استارت قبل از آن، آپدیت دوباره با همان مرحله پردازش می‌شود
+    def settle(self, timeout):
+        if not self.outbox.wait_replies(timeout):
+            return False
+        flush = getattr(self.bot.next_step_backend, "flush", None)
+        if flush:
+            flush()
+        return True
+
+    def data_path(self, name):
+        return os.path.join(self.data_dir, name)
+
+    def require_admin(self, plugin):
+        if not self.admin_chat_id:
+            raise ValueError(f"پلاگین {plugin} به ADMIN_CHAT_ID نیاز دارد.")
+
+    def is_admin(self, chat_id):
+        return str(chat_id) == str(self.admin_chat_id)
+
+    # تابع عمومی مدیریت خطا؛ handler نام هندلری است که خطا در آن رخ داده (برچسب متریک خطاها)
+    def handle_error(self, exception, message=None, handler="unknown"):
+        logger.error("⚠️ خطا رخ داد در %s: %s", handler, exception)
+        metrics.handler_errors.inc(handler)
+        if message:
+            try:
+                self.send_message(message.chat.id, "⛔ مشکلی پیش آمده است. لطفاً دوباره تلاش کنید.")
+            except Exception as e:
+                logger.error("❌ خطای اضافی در ارسال پیام خطا: %s", e)
+
+    # ساخت منوی اصلی
+    def main_menu(self, chat_id):
+        try:
+            self.send_message(chat_id, "لطفاً یکی از گزینه‌های زیر را انتخاب کنید:", reply_markup=self.menu.markup())
+        except Exception as e:
+            self.handle_error(e, handler="main_menu")
+
+    # ---- هسته بات ----
+
+    def _register_core(self):
+        app = self
+
+        @app.menu.command("start", "شروع کار با بات")
+        def start(message):
+            app.main_menu(message.chat.id)
+
+        @app.menu.command("help", "نمایش راهنما")
+        def show_help(message):
+            app.send_message(message.chat.id, app.menu.help_text())
+
+        courses_button = app.config.get("COURSES_BUTTON", "📚 درس‌ها")  # متن دکمه درس‌ها در منو
+
+        @app.menu.button(courses_button)
+        @app.menu.command("courses", "لیست درس‌ها")
+        def show_courses(message):
+            app.send_message(message.chat.id, f"شما گزینه '{courses_button.split(' ', 1)[-1]}' را انتخاب کردید.")
+
+        # مدیریت پیام‌های متنی و دستورات از طریق منو
+        @app.bot.message_handler(func=lambda message: True)
+        @metrics.instrument
+        def handle_text(message):
+            try:
+                if message.reply_to_message and any(handler(message) for handler in app.reply_handlers):
+                    return
+                app.menu.dispatch(message)
+            except Exception as e:
+                app.handle_error(e, message, handler="handle_text")
+
+        # همه دکمه‌های اینلاین از یک هندلر عبور می‌کنند و بر اساس action به پلاگین مربوط می‌رسند
+        @app.bot.callback_query_handler(func=lambda call: True)
+        @metrics.instrument
+        def handle_callback_query(call):
+            try:
+                # آپدیتی که دوباره تحویل شده (همان آیدی callback) دوباره اجرا نمی‌شود
+                if not app.handled_callbacks.add(call.id):
+                    metrics.callbacks_skipped.inc("redelivered")
+                    return
+                app.answer_callback(call)
+                parts = call.data.split("_")  # جدا کردن action و پارامترها از callback_data
+                handler = app.callbacks.get(parts[0])
+                if handler is None:
+                    return
+                key = app.callback_keys[parts[0]]
+                key = key(call, parts) if key else None
+                if key is None:
+                    handler(call, parts)
+                    return
+                done = (call.data, key)
+                with app.callback_locks.hold(key) as acquired:
+                    if not acquired:
+                        metrics.callbacks_skipped.inc("busy")
+                    elif done in app.handled_callbacks:
+                        metrics.callbacks_skipped.inc("repeated")
+                    else:
+                        handler(call, parts)
+                        app.handled_callbacks.add(done)
+            except Exception as e:
+                app.handle_error(e, call.message, handler="handle_callback_query")
+
+    def load_plugins(self, names):
+        for name in names:
+            self.load_plugin(name)
+        if self.submit_form is None and "professors" in self.plugins:
+            raise ValueError("پلاگین professors به یکی از پلاگین‌های review یا preview نیاز دارد.")
+
+        # ذخیره مرحله فعلی کاربران تا بعد از ری‌استارت از همان‌جا ادامه دهند
+        if self.config.get("STEP_STORE", "memory") == "sqlite":
+            from step_store import SqliteStepBackend
+            # در حالت polling، async و sharded با فایل offset، مراحل قبل از ذخیره offset هر دسته نوشته می‌شوند
+            # (settle)، نه با تایمر، تا مرحله‌ای که سوالش هنوز به کاربر نرسیده زودتر از offset ذخیره نشود
+            settled = self.run_mode in ("polling", "async", "sharded") and self.polling_options()["checkpoint"] is not None
+            self.bot.next_step_backend = SqliteStepBackend(
+                self.config.get("STEP_STORE_PATH", self.data_path("steps.db")),
+                steps=self.steps,
+                flush_interval=0 if settled else self.config.get_float("STEP_FLUSH_INTERVAL", 1),
+            )
+
+    # پلاگین فقط وقتی فعال باشد import می‌شود تا شروع بات سریع بماند
+    def load_plugin(self, name):
+        if name in self.plugins:
+            return self.plugins[name]
+        module = importlib.import_module(f"plugins.{name}")
+        self.plugins[name] = module  # قبل از setup، برای جلوگیری از بارگذاری دوباره در وابستگی‌های حلقوی
+        for required in getattr(module, "REQUIRES", ()):
+            self.load_plugin(required)
+        module.setup(self)
+        logger.debug("پلاگین %s بارگذاری شد", name)
+        return module
+
+    # ---- اجرا ----
+
+    # کارهای پس‌زمینه: متریک‌ها روی /metrics و کارهای ثبت شده پلاگین‌ها
+    def start_background_jobs(self, metrics_port=None):
+        if metrics_port is None:
+            metrics_port = self.config.get_int("METRICS_PORT", 0)  # پورت /metrics برای Prometheus؛ 0 یعنی غیرفعال
+            if metrics_port and self.shard_index is not None:
+                # هر کارگر /metrics را روی پورت جدا ارائه می‌دهد
+                metrics_port += self.shard_index + 1
+        if metrics_port:
+            metrics.instrument_api()
+            metrics.add_gauge("bot_form_store_size", "Forms in progress", lambda: len(self.forms))
+            metrics.add_gauge("bot_send_queue_chats", "Chats with queued outgoing messages",
+                              lambda: len(self.outbox.pending))
+            metrics.start_metrics_server(metrics_port)
+        for job in self.jobs:
+            job()
+
+    # تنظیمات دریافت آپدیت‌ها: long polling، backoff، circuit breaker و فایل offset
+    def polling_options(self):
+        from polling import OffsetCheckpoint
+        config = self.config
+        offset_file = config.get("OFFSET_FILE", self.data_path("offset.txt"))  # فایل آخرین offset پردازش شده؛ none یعنی غیرفعال
+        return {
+            "poll_timeout": config.get_int("POLL_TIMEOUT", 25),  # مدت long polling هر درخواست (ثانیه)
+            "checkpoint": OffsetCheckpoint(offset_file) if offset_file != "none" else None,
+        }
+
+    def run_polling(self):
+        from polling import Backoff, CircuitBreaker, PollingEngine, bot_handler
+        config = self.config
+        engine = PollingEngine(
+            self.token, bot_handler(self.bot, workers=config.get_int("HANDLER_WORKERS", 4)),  # ترد اجرای هندلرها
+            backoff=Backoff(maximum=config.get_float("BACKOFF_MAX", 60)),  # حداکثر تأخیر بین تلاش‌ها (ثانیه)
+            breaker=CircuitBreaker(
+                threshold=config.get_int("BREAKER_THRESHOLD", 5),  # تعداد خطای پشت سر هم تا باز شدن مدار
+                cooldown=config.get_float("BREAKER_COOLDOWN", 30),  # مدت توقف درخواست‌ها بعد از باز شدن مدار
+            ),
+            settle=self.settle,
+            **self.polling_options(),
+        )
+        logger.info("🤖 Bot is running...")
+        engine.run()
+
+    def describe(self):
+        return ", ".join(self.plugins)
+
+    def run(self):
+        self.start_background_jobs()
+        if self.run_mode == "async":
+            from async_runner import run_async_bot
+            run_async_bot(self.bot, self.token, workers=self.config.get_int("ASYNC_WORKERS", 16),
+                          settle=self.settle, **self.polling_options())
+        elif self.run_mode == "webhook":
+            from webhook_server import WebhookServer
+            url, secret = self.config.get("WEBHOOK_URL"), self.config.get("WEBHOOK_SECRET")
+            if not url or not secret:
+                raise ValueError("برای حالت webhook باید WEBHOOK_URL و WEBHOOK_SECRET تنظیم شوند.")
+            WebhookServer(self.bot, url, secret, port=self.config.get_int("WEBHOOK_PORT", 8443),
+                          workers=self.config.get_int("HANDLER_WORKERS", 4)).run()
+        elif self.run_mode == "sharded":
+            from sharding import Supervisor
+            # هر کارگر با همان آرگومان‌ها بات خود را می‌سازد
+            target = functools.partial(run_shard, self.argv, self.defaults)
+            Supervisor(self.token, target, workers=self.config.get_int("SHARD_WORKERS", 4),
+                       **self.polling_options()).run()
+        else:
+            self.run_polling()
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Telegram bot for course and professor questions")
+    parser.add_argument("--config", help="KEY=VALUE settings file (environment variables take precedence)")
+    parser.add_argument("--mode", choices=["polling", "async", "webhook", "sharded"], help="overrides RUN_MODE")
+    parser.add_argument("--plugins", help=f"comma separated plugins (default: {DEFAULT_PLUGINS})")
+    parser.add_argument("--check", action="store_true", help="build the bot, report startup time and exit")
+    return parser.parse_args(argv)
+
+
+def load_config(args, defaults=None):
+    config = Config(args.config, defaults)
+    # آرگومان‌های خط فرمان بر متغیرهای محیطی اولویت دارند
+    if args.mode:
+        config.values["RUN_MODE"] = args.mode
+    if args.plugins:
+        config.values["PLUGINS"] = args.plugins
+    return config
+
+
+def build_app(config, shard_index=None, shard_count=1, tenant=None):
+    app = BotApp(config, shard_index=shard_index, shard_count=shard_count, tenant=tenant)
+    app.load_plugins(config.get_list("PLUGINS", DEFAULT_PLUGINS))
+    return app
+
+
+def create_app(argv=(), defaults=None, shard_index=None, shard_count=1):
+    args = parse_args(list(argv))
+    app = build_app(load_config(args, defaults), shard_index=shard_index, shard_count=shard_count)
+    app.argv, app.defaults = list(argv), defaults
+    return app, args
+
+
+# اجرای یک کارگر در حالت sharded (در پروسه جدید بات و پلاگین‌ها دوباره ساخته می‌شوند)
+def run_shard(argv, defaults, index, workers, updates, acks):
+    from sharding import process_updates
+    app, _ = create_app(argv, defaults, shard_index=index, shard_count=workers)
+    app.start_background_jobs()
+    process_updates(app.bot, updates, acks, settle=app.settle)
+
+
+def main(argv=None, defaults=None):
+    argv = sys.argv[1:] if argv is None else argv
+    try:
+        args = parse_args(argv)
+        config = load_config(args, defaults)
+        if config.get_list("TENANTS"):
+            # چند بات در یک پروسه (TENANTS=eng,sci و تنظیمات ENG_TOKEN، SCI_TOKEN و ...)
+            from hosting import Host
+            configure_logging(config)
+            runner = Host(config, build_app)
+        else:
+            runner = build_app(config)
+            runner.argv, runner.defaults = list(argv), defaults
+    except (ValueError, OSError) as e:
+        logger.error("❌ %s", e)
+        sys.exit(1)
+    elapsed_ms = (time.perf_counter() - STARTED) * 1000
+    logger.info("🚀 شروع بات در %.1f میلی‌ثانیه (پلاگین‌ها: %s)", elapsed_ms, runner.describe())
+    if args.check:
+        print(f"startup {elapsed_ms:.1f} ms, plugins: {runner.describe()}")
+        return
+    runner.run()
+
+
+if __name__ == "__main__":
+    main()
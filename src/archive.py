@@ -0,0 +1,77 @@
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+from autocomplete import normalize
+
+ArchivedPost = namedtuple("ArchivedPost", "id course professors question published_at")
+
+
+# تبدیل متن جستجو به عبارت FTS5: همه کلمات (به صورت پیشوندی) باید در پست باشند
+def build_query(text):
+    tokens = [token.replace('"', "") for token in normalize(text).split(" ")]
+    return " ".join(f'"{token}"*' for token in tokens if token)
+
+
+class Archive:
+    """
+    آرشیو پست‌های منتشر شده در کانال با ایندکس متنی (SQLite FTS5).
+    متن درس، استاد و سوال قبل از ایندکس normalize می‌شود تا تفاوت ی/ک عربی و فارسی و نیم‌فاصله
+    در جستجو اثری نداشته باشد. ایندکس با هر پست جدید به‌روز می‌شود و فایل دیتابیس به جای
+    بارگذاری کامل در حافظه، memory-map می‌شود.
+    نتایج بر اساس میزان ارتباط (bm25) مرتب می‌شوند؛ محاسبه آن برای هر نتیجه لازم است، پس اگر تعداد نتایج
+    از rank_limit بیشتر باشد (مثلاً جستجوی یک کلمه پرتکرار) جدیدترین پست‌ها اول نمایش داده می‌شوند.
+    بنچمارک: bench/bench_archive.py
+    """
+
+    def __init__(self, path="archive.db", mmap_size=256 * 1024 * 1024, rank_limit=20000):
+        self.rank_limit = rank_limit
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(f"PRAGMA mmap_size={int(mmap_size)}")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS posts ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, course TEXT NOT NULL, professors TEXT NOT NULL, "
+            "question TEXT NOT NULL, published_at REAL NOT NULL)"
+        )
+        # ایندکس بدون محتوا: فقط کلمات ایندکس می‌شوند و متن اصلی در جدول posts می‌ماند
+        self._db.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS posts_index USING fts5("
+            "course, professors, question, content='', tokenize='unicode61 remove_diacritics 2')"
+        )
+
+    def add(self, course, professors, question):
+        with self._lock:
+            self._db.execute("BEGIN")
+            cursor = self._db.execute(
+                "INSERT INTO posts (course, professors, question, published_at) VALUES (?, ?, ?, ?)",
+                (course, professors, question, time.time()),
+            )
+            self._db.execute(
+                "INSERT INTO posts_index (rowid, course, professors, question) VALUES (?, ?, ?, ?)",
+                (cursor.lastrowid, normalize(course), normalize(professors), normalize(question)),
+            )
+            self._db.execute("COMMIT")
+            return cursor.lastrowid
+
+    # جستجو؛ خروجی: (تعداد کل نتایج، نتایج این صفحه)
+    def search(self, text, offset=0, limit=5):
+        query = build_query(text)
+        if not query:
+            return 0, []
+        with self._lock:
+            total = self._db.execute(
+                "SELECT COUNT(*) FROM posts_index WHERE posts_index MATCH ?", (query,)
+            ).fetchone()[0]
+            # FTS5 نتایج را به ترتیب rowid می‌خواند و با LIMIT زود متوقف می‌شود، ولی rank همه نتایج را حساب می‌کند
+            position, order = ("rank", "rank") if total <= self.rank_limit else ("-rowid", "rowid DESC")
+            rows = self._db.execute(
+                "SELECT p.id, p.course, p.professors, p.question, p.published_at FROM "
+                f"(SELECT rowid, {position} AS position FROM posts_index WHERE posts_index MATCH ? "
+                f"ORDER BY {order} LIMIT ? OFFSET ?) AS r "
+                "JOIN posts AS p ON p.id = r.rowid ORDER BY r.position",
+                (query, limit, offset),
+            ).fetchall()
+        return total, [ArchivedPost(*row) for row in rows]
@@ -0,0 +1,146 @@
+"""
+اجرای بات با AsyncTeleBot (RUN_MODE=async): هندلرهای چت‌های مختلف همزمان اجرا می‌شوند.
+بنچمارک: bench/bench_runners.py
+"""
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from telebot.async_telebot import AsyncTeleBot
+from polling import Backoff
+
+logger = logging.getLogger(__name__)
+
+
+# پیدا کردن آیدی چت مربوط به هر آپدیت (برای حفظ ترتیب پیام‌های هر چت)
+def update_chat_id(update):
+    if update.message:
+        return update.message.chat.id
+    if update.edited_message:
+        return update.edited_message.chat.id
+    if update.callback_query:
+        if update.callback_query.message:
+            return update.callback_query.message.chat.id
+        return update.callback_query.from_user.id
+    return None
+
+
+class AsyncRunner:
+    """
+    دریافت آپدیت‌ها با AsyncTeleBot و اجرای هندلرهای موجود به صورت همزمان.
+    آپدیت‌های چت‌های مختلف موازی اجرا می‌شوند ولی آپدیت‌های یک چت به ترتیب.
+    دریافت آپدیت‌ها منتظر تمام شدن دسته قبل نمی‌ماند (تا max_pending آپدیت در حال پردازش) و offset ذخیره شده
+    اولین آپدیتی است که هنوز تمام نشده، پس یک هندلر کند فقط آپدیت‌های بعد از خودش را دوباره پردازش‌پذیر نگه می‌دارد.
+    """
+
+    def __init__(self, bot, token, workers=16, poll_timeout=25, checkpoint=None, settle=None, settle_timeout=10.0,
+                 max_pending=1000):
+        self.bot = bot  # بات اصلی که هندلرها روی آن ثبت شده‌اند
+        self.async_bot = AsyncTeleBot(token)
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="handler")
+        self.poll_timeout = poll_timeout
+        self.checkpoint = checkpoint  # ذخیره offset بعد از پردازش هر دسته
+        self.settle = settle  # settle(timeout) قبل از ذخیره offset (مثل PollingEngine)
+        self.settle_timeout = settle_timeout
+        self.backoff = Backoff()
+        self.queues = {}  # صف آپدیت‌های هر چت
+        self.max_pending = max_pending
+        self.pending = {}  # آیدی آپدیت‌های در حال پردازش به ترتیب دریافت
+        self.next_offset = None  # offset بعد از آخرین آپدیت دریافت شده
+        self._progress = None  # asyncio.Event برای ذخیره offset، با تمام شدن هر آپدیت set می‌شود
+        self._room = None  # asyncio.Event برای دریافت آپدیت‌های بیشتر وقتی max_pending پر شده
+
+    # قرار دادن آپدیت در صف چت؛ خروجی future که بعد از پایان هندلرهای آپدیت کامل می‌شود
+    def dispatch(self, update):
+        chat_id = update_chat_id(update)
+        queue = self.queues.get(chat_id)
+        if queue is None:
+            queue = asyncio.Queue()
+            self.queues[chat_id] = queue
+            asyncio.get_running_loop().create_task(self._chat_worker(chat_id, queue))
+        done = asyncio.get_running_loop().create_future()
+        queue.put_nowait((update, done))
+        return done
+
+    async def _chat_worker(self, chat_id, queue):
+        loop = asyncio.get_running_loop()
+        while True:
+            update, done = await queue.get()
+            try:
+                await loop.run_in_executor(self.executor, self.bot.process_new_updates, [update])
+            except Exception as e:
+                logger.error("❌ خطا در پردازش آپدیت %s: %s", update.update_id, e)
+            done.set_result(None)
+            # وقتی صف خالی شد، صف این چت حذف می‌شود تا حافظه آزاد شود
+            if queue.empty():
+                self.queues.pop(chat_id, None)
+                return
+
+    def _finished(self, update_id):
+        self.pending.pop(update_id, None)
+        self._progress.set()
+        self._room.set()
+
+    # ذخیره offset تا جایی که همه آپدیت‌های قبلش تمام شده‌اند (بعد از settle)
+    async def _save_progress(self):
+        loop = asyncio.get_running_loop()
+        saved = self.next_offset
+        while True:
+            await self._progress.wait()
+            self._progress.clear()
+            offset = next(iter(self.pending), self.next_offset)
+            if offset is None or (saved is not None and offset <= saved):
+                continue
+            if self.settle and not await loop.run_in_executor(None, self.settle, self.settle_timeout):
+                logger.warning("⚠️ نتیجه آپدیت‌ها تا %s ثانیه ماندگار نشد، offset بعداً ذخیره می‌شود",
+                               self.settle_timeout)
+                self._progress.set()
+                continue
+            self.checkpoint.save(offset)
+            saved = offset
+
+    async def poll(self):
+        self.next_offset = self.checkpoint.load() if self.checkpoint else None
+        self._progress, self._room = asyncio.Event(), asyncio.Event()
+        saver = asyncio.ensure_future(self._save_progress()) if self.checkpoint else None
+        try:
+            await self._poll()
+        finally:
+            if saver:
+                saver.cancel()
+
+    async def _poll(self):
+        while True:
+            while len(self.pending) >= self.max_pending:
+                self._room.clear()
+                await self._room.wait()
+            try:
+                updates = await self.async_bot.get_updates(offset=self.next_offset, timeout=self.poll_timeout)
+            except Exception as e:
+                # telebot لغو شدن task در حین خواندن جواب را به ApiException تبدیل می‌کند؛ لغو نباید گم شود
+                cancelling = getattr(asyncio.current_task(), "cancelling", None)
+                if cancelling and cancelling():
+                    raise asyncio.CancelledError() from e
+                delay = self.backoff.next_delay()
+                logger.error("❌ خطا در دریافت آپدیت‌ها: %s (تلاش دوباره بعد از %.1f ثانیه)", e, delay)
+                await asyncio.sleep(delay)
+                continue
+            self.backoff.reset()
+            if not updates:
+                continue
+            for update in updates:
+                self.pending[update.update_id] = True
+                self.dispatch(update).add_done_callback(lambda _, update_id=update.update_id: self._finished(update_id))
+            self.next_offset = updates[-1].update_id + 1
+
+    async def run(self):
+        logger.info("🤖 Bot is running (async)...")
+        try:
+            await self.poll()
+        finally:
+            await self.async_bot.close_session()
+            self.executor.shutdown(wait=False)
+
+
+def run_async_bot(bot, token, workers=16, poll_timeout=25, checkpoint=None, settle=None):
+    asyncio.run(AsyncRunner(bot, token, workers=workers, poll_timeout=poll_timeout, checkpoint=checkpoint,
+                            settle=settle).run())
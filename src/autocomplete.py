@@ -0,0 +1,172 @@
+"""
+پیشنهاد خودکار نام درس‌ها و اساتید از پست‌های تأیید شده.
+بنچمارک: bench/bench_autocomplete.py
+"""
+import re
+import threading
+from bisect import bisect_left, insort
+from collections import Counter
+
+# یکسان‌سازی حروف عربی و فارسی و ارقام
+_TRANSLATE = str.maketrans({
+    "ي": "ی", "ى": "ی", "ئ": "ی", "ك": "ک", "ة": "ه", "أ": "ا", "إ": "ا", "آ": "ا", "ؤ": "و",
+    "۰": "0", "۱": "1", "۲": "2", "۳": "3", "۴": "4", "۵": "5", "۶": "6", "۷": "7", "۸": "8", "۹": "9",
+    "٠": "0", "١": "1", "٢": "2", "٣": "3", "٤": "4", "٥": "5", "٦": "6", "٧": "7", "٨": "8", "٩": "9",
+    "_": " ", "\u200c": "", "\u200f": "", "\u200e": "", "\u0640": "",
+})
+_DIACRITICS = re.compile("[\u064b-\u065f\u0670]")  # اعراب (فتحه، کسره، تنوین، تشدید و ...)
+_SPACES = re.compile(r"\s+")
+FUZZY_MIN_LENGTH = 3  # کلمه‌های کوتاه‌تر با غلط تایپی مقایسه نمی‌شوند (تقریباً با همه چیز یکی می‌شوند)
+
+
+# ساخت کلید جستجو: حذف اعراب و نیم‌فاصله، یکسان‌سازی ی/ک و فاصله‌ها
+def normalize(text):
+    text = _DIACRITICS.sub("", text.translate(_TRANSLATE))
+    return _SPACES.sub(" ", text).strip().lower()
+
+
+# کمترین فاصله ویرایشی (Levenshtein) بین text و یکی از پیشوندهای word؛ اگر بیشتر از limit باشد limit + 1
+def prefix_distance(text, word, limit):
+    row = list(range(len(word) + 1))
+    for i, char in enumerate(text, 1):
+        previous, row[0] = row[0], i
+        for j in range(1, len(word) + 1):
+            previous, row[j] = row[j], min(row[j] + 1, row[j - 1] + 1, previous + (char != word[j - 1]))
+        if min(row) > limit:
+            return limit + 1
+    return min(row)
+
+
+def typo_limit(text):
+    return 1 if len(text) <= 5 else 2
+
+
+class NameIndex:
+    """
+    فهرست نام‌ها (درس یا استاد) برای پیشنهاد خودکار.
+    نام‌هایی که بعد از normalize یکسان هستند یک مورد حساب می‌شوند و پرتکرارترین نگارش آن‌ها نمایش داده می‌شود.
+    جستجوی پیشوندی روی آرایه مرتب کلمات با bisect انجام می‌شود. اگر پیشوند کامل نتیجه‌ای نداشته باشد، هر کلمه
+    جستجو جدا با پیشوند کلمه‌های نام‌ها مقایسه می‌شود (ترتیب کلمات مهم نیست) و کلمه‌ای که پیشوندی ندارد
+    با فاصله ویرایشی محدود (۱ یا ۲ حرف) با همه کلمه‌ها سنجیده می‌شود تا غلط تایپی هم پیشنهاد داشته باشد.
+    پرتکرارترین نام‌ها (پیشنهاد بدون پیشوند) با هر add به‌روز می‌شوند تا هر بار کل فهرست مرتب نشود.
+    """
+
+    TOP_SIZE = 32  # تعداد پرتکرارترین نام‌هایی که نگه داشته می‌شوند
+
+    def __init__(self):
+        self._spellings = {}  # کلید -> شمارش نگارش‌های مختلف
+        self._counts = Counter()  # کلید -> تعداد استفاده
+        self._tokens = []  # آرایه مرتب (کلمه، کلید) برای جستجوی پیشوندی
+        self._words = {}  # کلمه -> حروف آن، برای مقایسه غلط تایپی (هر کلمه یک بار)
+        self._top = []  # کلیدهای پرتکرار به ترتیب تعداد استفاده
+        self._lock = threading.Lock()
+
+    def add(self, name, count=1):
+        key = normalize(name)
+        if not key:
+            return
+        with self._lock:
+            spellings = self._spellings.get(key)
+            if spellings is None:
+                spellings = self._spellings[key] = Counter()
+                for token in {key, *key.split(" ")}:
+                    insort(self._tokens, (token, key))
+                for word in key.split(" "):
+                    self._words.setdefault(word, frozenset(word))
+            spellings[_SPACES.sub(" ", name.replace("_", " ")).strip()] += count
+            self._counts[key] += count
+            # شمارش‌ها فقط زیاد می‌شوند، پس کلیدی که از آخرین عضو top بیشتر نشده بیرون می‌ماند
+            if key in self._top or len(self._top) < self.TOP_SIZE or self._counts[key] > self._counts[self._top[-1]]:
+                if key not in self._top:
+                    self._top.append(key)
+                self._top.sort(key=lambda k: -self._counts[k])
+                del self._top[self.TOP_SIZE:]
+
+    def _display(self, key):
+        return self._spellings[key].most_common(1)[0][0]
+
+    # نگارش رایج یک نام (اگر قبلاً دیده نشده باشد خود نام برگردانده می‌شود)
+    def canonical(self, name):
+        key = normalize(name)
+        with self._lock:
+            if key in self._spellings:
+                return self._display(key)
+        return name.strip()
+
+    def suggest(self, prefix, limit=8, scan=200):
+        prefix = normalize(prefix)
+        with self._lock:
+            if not prefix:
+                top = self._top if limit <= self.TOP_SIZE else [key for key, _ in self._counts.most_common(limit)]
+                return [self._display(key) for key in top[:limit]]
+            keys = self._prefix_keys(prefix, scan)
+            if not keys:
+                keys = self._word_keys(prefix.split(" "), scan)
+            best = sorted(keys, key=lambda k: -self._counts[k])[:limit]
+            return [self._display(key) for key in best]
+
+    # کلیدهایی که یکی از کلمه‌هایشان (یا خود کلید) با prefix شروع می‌شود
+    def _prefix_keys(self, prefix, scan):
+        keys = set()
+        i = bisect_left(self._tokens, (prefix,))
+        while i < len(self._tokens) and len(keys) < scan:
+            token, key = self._tokens[i]
+            if not token.startswith(prefix):
+                break
+            keys.add(key)
+            i += 1
+        return keys
+
+    # کلیدهایی که برای هر کلمه جستجو کلمه‌ای با همان پیشوند یا با غلط تایپی کم دارند
+    def _word_keys(self, words, scan):
+        result = None
+        for word in words:
+            keys = self._prefix_keys(word, scan) or self._fuzzy_keys(word, scan)
+            result = keys if result is None else result & keys
+            if not result:
+                return set()
+        return result
+
+    def _fuzzy_keys(self, word, scan):
+        if len(word) < FUZZY_MIN_LENGTH:
+            return set()
+        limit = typo_limit(word)
+        keys, chars = set(), frozenset(word)
+        for token, token_chars in self._words.items():
+            # هر حرف جستجو که در کلمه نیست حداقل یک ویرایش لازم دارد؛ این شرط ارزان بیشتر کلمه‌ها را کنار می‌گذارد
+            if len(chars - token_chars) > limit or len(token) < len(word) - limit:
+                continue
+            if prefix_distance(word, token[:len(word) + limit], limit) > limit:
+                continue
+            i = bisect_left(self._tokens, (token,))
+            while i < len(self._tokens) and self._tokens[i][0] == token and len(keys) < scan:
+                keys.add(self._tokens[i][1])
+                i += 1
+        return keys
+
+    def __len__(self):
+        return len(self._spellings)
+
+
+class CatalogIndex:
+    """فهرست درس‌ها و اساتید ساخته شده از پست‌های تأیید شده"""
+
+    def __init__(self):
+        self.courses = NameIndex()
+        self.professors = NameIndex()
+        self._course_professors = {}  # کلید درس -> شمارش اساتید آن درس
+
+    def add_post(self, course, professors):
+        self.courses.add(course)
+        counter = self._course_professors.setdefault(normalize(course), Counter())
+        for professor in professors.split("\n"):
+            if professor.strip():
+                self.professors.add(professor)
+                counter[self.professors.canonical(professor)] += 1
+
+    # اساتید پرتکرار یک درس (یا اساتید پرتکرار کلی اگر درس ناشناخته باشد)
+    def professors_for(self, course, limit=8):
+        counter = self._course_professors.get(normalize(course))
+        if not counter:
+            return self.professors.suggest("", limit)
+        return [name for name, _ in counter.most_common(limit)]
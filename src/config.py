@@ -0,0 +1,54 @@
+import os
+from dotenv import load_dotenv
+
+
+def read_config_file(path):
+    """خواندن فایل تنظیمات با قالب KEY=VALUE (خطوط خالی و # نادیده گرفته می‌شوند)"""
+    values = {}
+    with open(path, "r", encoding="utf-8") as file:
+        for line in file:
+            line = line.strip()
+            if not line or line.startswith("#") or "=" not in line:
+                continue
+            # تقسیم خط بر اساس اولین '='
+            key, value = line.split("=", 1)
+            values[key.strip()] = value.strip()
+    return values
+
+
+class Config:
+    """
+    تنظیمات بات که فقط یک بار هنگام شروع خوانده می‌شوند.
+    اولویت: متغیرهای محیطی (و فایل .env)، بعد فایل تنظیمات (مثل config.txt)، بعد مقادیر پیش‌فرض.
+    """
+
+    def __init__(self, path=None, defaults=None):
+        load_dotenv()
+        self.path = path
+        self.values = dict(defaults or {})
+        if path:
+            self.values.update(read_config_file(path))
+        self.values.update(os.environ)
+
+    def get(self, key, default=None):
+        value = self.values.get(key)
+        return default if value in (None, "") else value
+
+    def get_int(self, key, default=0):
+        return int(self.get(key, default))
+
+    def get_float(self, key, default=0.0):
+        return float(self.get(key, default))
+
+    def get_list(self, key, default=""):
+        return [item.strip() for item in self.get(key, default).split(",") if item.strip()]
+
+    def scoped(self, name):
+        """تنظیمات یک بات در میزبانی چند بات: کلید NAME_KEY (مثلاً ENG_TOKEN) بر کلید مشترک KEY اولویت دارد"""
+        prefix = name.upper() + "_"
+        config = Config.__new__(Config)
+        config.path = self.path
+        config.values = dict(self.values)
+        config.values.update({key[len(prefix):]: value for key, value in self.values.items()
+                              if key.startswith(prefix) and len(key) > len(prefix)})
+        return config
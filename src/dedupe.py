@@ -0,0 +1,147 @@
+"""
+تشخیص سوال‌های تکراری و محدودیت تعداد فرم هر کاربر، قبل از رسیدن فرم به ادمین.
+بنچمارک: bench/bench_dedupe.py
+"""
+import re
+import threading
+import time
+from array import array
+from collections import deque
+from autocomplete import normalize
+
+SHINGLE_SIZE = 4  # طول تکه‌های حرفی متن
+BANDS = 8  # تعداد باندهای LSH
+ROWS = 4  # تعداد مقدار امضا در هر باند
+_SIGNATURE_SIZE = BANDS * ROWS
+_EMPTY = 1 << 64
+_PUNCTUATION = re.compile(r"[^\w\s]")
+
+
+# متن یکسان‌سازی شده بدون علائم نگارشی (؟ ! . و ایموجی‌ها) و بدون فاصله،
+# تا «نمره دهی» و «نمره‌دهی» یکسان باشند
+def fingerprint_text(text):
+    return "".join(_PUNCTUATION.sub(" ", normalize(text)).split())
+
+
+def shingles(text):
+    if len(text) <= SHINGLE_SIZE:
+        return {text}
+    return {text[i:i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1)}
+
+
+# امضای MinHash با یک تابع هش (one permutation hashing): هش هر تکه در یکی از خانه‌های امضا
+# می‌افتد و کمینه هر خانه نگه داشته می‌شود؛ خانه‌های خالی از خانه پر بعدی مقدار می‌گیرند.
+# نسبت خانه‌های برابر دو امضا تخمین شباهت Jaccard تکه‌های دو متن است.
+def minhash(text):
+    bins = [_EMPTY] * _SIGNATURE_SIZE
+    for shingle in shingles(text):
+        value = hash(shingle) & (_EMPTY - 1)
+        index = value % _SIGNATURE_SIZE
+        if value < bins[index]:
+            bins[index] = value
+    filled = [i for i, value in enumerate(bins) if value != _EMPTY]
+    if len(filled) < _SIGNATURE_SIZE:
+        for i in range(_SIGNATURE_SIZE):
+            if bins[i] == _EMPTY:
+                # نزدیک‌ترین خانه پر بعدی به صورت چرخشی، با فاصله آن تا این خانه
+                source = next((j for j in filled if j > i), filled[0])
+                bins[i] = (bins[source] + (source - i) % _SIGNATURE_SIZE) & (_EMPTY - 1)
+    return array("Q", bins)
+
+
+def similarity(first, second):
+    return sum(x == y for x, y in zip(first, second)) / len(first)
+
+
+class DuplicateIndex:
+    """
+    ایندکس چرخشی آخرین capacity سوال برای پیدا کردن سوال‌های تقریباً یکسان (MinHash + LSH).
+    سوال‌ها فقط با سوال‌های همان scope (درس و استاد) مقایسه می‌شوند. هر بررسی فقط BANDS بار
+    در دیکشنری جستجو می‌کند و زمان آن به تعداد سوال‌های ایندکس بستگی ندارد.
+    """
+
+    def __init__(self, capacity=100000, threshold=0.7):
+        self.capacity = capacity
+        self.threshold = threshold  # حداقل شباهت برای تکراری حساب شدن
+        self._buckets = {}  # کلید باند -> لیست آیدی‌ها
+        self._signatures = {}  # آیدی -> امضا
+        self._order = deque()  # (آیدی، کلیدهای باند) به ترتیب اضافه شدن
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _band_keys(scope, signature):
+        return [hash((scope, band, tuple(signature[band * ROWS:(band + 1) * ROWS]))) for band in range(BANDS)]
+
+    # شبیه‌ترین سوال ایندکس شده: (آیدی، شباهت) یا None
+    def find(self, scope, question):
+        text = fingerprint_text(question)
+        if not text:  # فرم‌های فقط عکس/فایل مقایسه نمی‌شوند
+            return None
+        signature = minhash(text)
+        best = None
+        with self._lock:
+            candidates = {item for key in self._band_keys(scope, signature) for item in self._buckets.get(key, ())}
+            for item in candidates:
+                score = similarity(signature, self._signatures[item])
+                if score >= self.threshold and (best is None or score > best[1]):
+                    best = (item, score)
+        return best
+
+    def add(self, item, scope, question):
+        text = fingerprint_text(question)
+        if not text:
+            return
+        signature = minhash(text)
+        keys = self._band_keys(scope, signature)
+        with self._lock:
+            self._signatures[item] = signature
+            for key in keys:
+                self._buckets.setdefault(key, []).append(item)
+            self._order.append((item, keys))
+            while len(self._order) > self.capacity:
+                self._evict()
+
+    def _evict(self):
+        item, keys = self._order.popleft()
+        del self._signatures[item]
+        for key in keys:
+            bucket = self._buckets[key]
+            bucket.remove(item)
+            if not bucket:
+                del self._buckets[key]
+
+    def __len__(self):
+        return len(self._order)
+
+
+class RateLimiter:
+    """حداکثر limit فرم برای هر کاربر در هر window ثانیه (پنجره لغزان)"""
+
+    def __init__(self, limit=3, window=600):
+        self.limit = limit
+        self.window = window
+        self._history = {}  # آیدی کاربر -> زمان فرم‌های اخیر
+        self._lock = threading.Lock()
+
+    # زمان باقی‌مانده تا فرم بعدی (0 یعنی کاربر آزاد است)
+    def retry_after(self, chat_id, now=None):
+        if not self.limit:
+            return 0.0
+        now = time.time() if now is None else now
+        with self._lock:
+            history = self._history.get(chat_id)
+            if not history:
+                return 0.0
+            while history and history[0] <= now - self.window:
+                history.popleft()
+            if not history:
+                del self._history[chat_id]
+                return 0.0
+            if len(history) < self.limit:
+                return 0.0
+            return history[0] + self.window - now
+
+    def record(self, chat_id, now=None):
+        with self._lock:
+            self._history.setdefault(chat_id, deque()).append(time.time() if now is None else now)
+
@@ -0,0 +1,258 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+BOT_USER = {"id": 1, "is_bot": True, "first_name": "FakeBot", "username": "fake_bot"}
+
+
+class FakeBotApi:
+    """
+    شبیه‌ساز محلی Bot API تلگرام برای تست و بنچمارک بات بدون اتصال به تلگرام.
+    آپدیت‌ها با push_message، push_photo و push_callback ساخته می‌شوند و بات آن‌ها را با getUpdates می‌گیرد.
+    همه درخواست‌های بات در sent ذخیره می‌شوند و on_send برای هر پیام ارسالی صدا زده می‌شود.
+    با flood_every هر چندمین sendMessage با خطای 429 جواب داده می‌شود و با partition(seconds)
+    سرور برای مدتی همه اتصال‌ها را بدون جواب می‌بندد (شبیه قطع شبکه).
+    برای چند بات در یک سرور، chat_tokens مشخص می‌کند آپدیت‌های هر کاربر به کدام توکن تحویل شوند.
+    latency تأخیر جواب هر متد به جز getUpdates است (شبیه رفت و برگشت شبکه تا تلگرام).
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, on_send=None, flood_every=0, retry_after=1, latency=0.0):
+        self.on_send = on_send
+        self.flood_every = flood_every
+        self.retry_after = retry_after
+        self.latency = latency
+        self.updates = {}  # توکن -> آپدیت‌هایی که هنوز تأیید نشده‌اند (None برای بقیه توکن‌ها)
+        self.chat_tokens = {}  # آیدی چت -> توکن باتی که آپدیت‌های آن چت را می‌گیرد
+        self.sent = []  # (زمان، متد، پارامترها)
+        self.calls = {}  # تعداد فراخوانی هر متد
+        self.flood_errors = 0
+        self.deliveries = {}  # update_id -> تعداد دفعات تحویل به بات
+        self.down_until = 0.0
+        self.recovery_time = None  # فاصله پایان قطعی تا اولین getUpdates موفق
+        self.webhook_url = None
+        self._next_update_id = 1
+        self._next_message_id = 1
+        self._send_count = 0
+        self._cond = threading.Condition()
+        self.httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self.httpd.daemon_threads = True
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        threading.Thread(target=self.httpd.serve_forever, name="fake-api", daemon=True).start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def partition(self, seconds):
+        self.down_until = time.monotonic() + seconds
+        self.recovery_time = None
+
+    def is_down(self):
+        return time.monotonic() < self.down_until
+
+    def record_delivery(self, updates):
+        with self._cond:
+            for update in updates:
+                self.deliveries[update["update_id"]] = self.deliveries.get(update["update_id"], 0) + 1
+
+    @property
+    def redelivered(self):
+        return sum(count - 1 for count in self.deliveries.values())
+
+    def _push(self, update):
+        with self._cond:
+            update["update_id"] = self._next_update_id
+            self._next_update_id += 1
+            message = update.get("message") or update["callback_query"]
+            self.updates.setdefault(self.chat_tokens.get(message["from"]["id"]), []).append(update)
+            self._cond.notify_all()
+            return update["update_id"]
+
+    def _new_message_id(self):
+        with self._cond:
+            self._next_message_id += 1
+            return self._next_message_id
+
+    def push_message(self, chat_id, text, first_name="user"):
+        user = {"id": chat_id, "is_bot": False, "first_name": first_name}
+        return self._push({"message": {
+            "message_id": self._new_message_id(), "date": int(time.time()), "from": user,
+            "chat": {"id": chat_id, "type": "private"}, "text": text,
+        }})
+
+    def push_photo(self, chat_id, file_id, caption=None, media_group_id=None):
+        user = {"id": chat_id, "is_bot": False, "first_name": "user"}
+        message = {
+            "message_id": self._new_message_id(), "date": int(time.time()), "from": user,
+            "chat": {"id": chat_id, "type": "private"},
+            "photo": [{"file_id": file_id, "file_unique_id": file_id, "width": 800, "height": 600}],
+        }
+        if caption:
+            message["caption"] = caption
+        if media_group_id:
+            message["media_group_id"] = media_group_id
+        return self._push({"message": message})
+
+    # callback_id تکراری یعنی همان آپدیت دوباره تحویل شده است
+    def push_callback(self, chat_id, message_id, data, message_text="", callback_id=None):
+        user = {"id": chat_id, "is_bot": False, "first_name": "admin"}
+        return self._push({"callback_query": {
+            "id": callback_id or str(self._new_message_id()), "from": user, "chat_instance": str(chat_id), "data": data,
+            "message": {"message_id": message_id, "date": int(time.time()), "from": BOT_USER,
+                        "chat": {"id": chat_id, "type": "private"}, "text": message_text},
+        }})
+
+    def get_updates(self, offset=0, limit=100, timeout=0, token=None):
+        deadline = time.monotonic() + timeout
+        if token not in self.chat_tokens.values():
+            token = None
+        with self._cond:
+            # آپدیت‌های قبل از offset تأیید شده‌اند و حذف می‌شوند
+            updates = self.updates[token] = [
+                update for update in self.updates.get(token, ()) if update["update_id"] >= offset
+            ]
+            while not updates and time.monotonic() < deadline:
+                self._cond.wait(deadline - time.monotonic())
+                updates = self.updates.get(token, ())
+            return updates[:limit]
+
+    def _message(self, params):
+        chat_id = params.get("chat_id", "0")
+        chat_id = int(chat_id) if chat_id.lstrip("-").isdigit() else chat_id
+        message = {
+            "message_id": self._new_message_id(), "date": int(time.time()), "from": BOT_USER,
+            "chat": {"id": chat_id if isinstance(chat_id, int) else -1, "type": "private"},
+        }
+        if "text" in params:
+            message["text"] = params["text"]
+        if "caption" in params:
+            message["caption"] = params["caption"]
+        markup = json.loads(params.get("reply_markup", "{}"))
+        if "inline_keyboard" in markup:  # تلگرام فقط کیبورد شیشه‌ای را در پیام برمی‌گرداند
+            message["reply_markup"] = markup
+        return message
+
+    def handle(self, method, params, token=None):
+        """جواب یک متد Bot API؛ خروجی (کد HTTP، بدنه JSON)"""
+        self.calls[method] = self.calls.get(method, 0) + 1
+        self.sent.append((time.monotonic(), method, params))
+        if method == "getMe":
+            return 200, {"ok": True, "result": BOT_USER}
+        if method == "getUpdates":
+            if self.down_until and self.recovery_time is None:
+                self.recovery_time = time.monotonic() - self.down_until
+            updates = self.get_updates(int(params.get("offset", 0)), int(params.get("limit", 100)),
+                                       float(params.get("timeout", 0)), token)
+            return 200, {"ok": True, "result": updates}
+        if self.latency:
+            time.sleep(self.latency)
+        if method == "setWebhook":
+            self.webhook_url = params.get("url")
+            return 200, {"ok": True, "result": True}
+        if method == "deleteWebhook":
+            self.webhook_url = None
+            return 200, {"ok": True, "result": True}
+        if method == "sendMediaGroup":
+            media = json.loads(params.get("media", "[]"))
+            messages = []
+            for item in media:
+                message = self._message(dict(params, **({"caption": item["caption"]} if "caption" in item else {})))
+                if self.on_send:
+                    self.on_send(method, params, message)
+                messages.append(message)
+            return 200, {"ok": True, "result": messages}
+        if method == "getFile":
+            file_id = params.get("file_id", "")
+            return 200, {"ok": True, "result": {"file_id": file_id, "file_unique_id": file_id,
+                                                "file_path": f"photos/{file_id}.jpg"}}
+        if method in ("sendMessage", "editMessageText", "sendPhoto", "sendDocument"):
+            if method == "sendMessage" and self.flood_every:
+                with self._cond:
+                    self._send_count += 1
+                    flood = self._send_count % self.flood_every == 0
+                if flood:
+                    self.flood_errors += 1
+                    return 429, {"ok": False, "error_code": 429,
+                                 "description": f"Too Many Requests: retry after {self.retry_after}",
+                                 "parameters": {"retry_after": self.retry_after}}
+            message = self._message(params)
+            if self.on_send:
+                self.on_send(method, params, message)
+            return 200, {"ok": True, "result": message}
+        # answerCallbackQuery، answerInlineQuery و بقیه متدها
+        return 200, {"ok": True, "result": True}
+
+    def _make_handler(self):
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True  # سرآیند و بدنه جدا نوشته می‌شوند؛ بدون این هر جواب ~40ms منتظر ACK می‌ماند
+
+            def _reply(self):
+                if api.is_down():
+                    self.close_connection = True
+                    return
+                url = urlparse(self.path)
+                token, method = url.path.rsplit("/", 2)[-2:]
+                token = token[3:] if token.startswith("bot") else None
+                params = {key: values[0] for key, values in parse_qs(url.query).items()}
+                length = int(self.headers.get("Content-Length", 0))
+                if length:
+                    body = self.rfile.read(length).decode("utf-8")
+                    if self.headers.get("Content-Type", "").startswith("application/json"):
+                        params.update({key: value if isinstance(value, str) else json.dumps(value)
+                                       for key, value in json.loads(body).items()})
+                    else:
+                        params.update({key: values[0] for key, values in parse_qs(body).items()})
+                status, result = api.handle(method, params, token)
+                if method == "getUpdates" and api.is_down():
+                    # قطعی در حین long polling: آپدیت‌ها تحویل نمی‌شوند
+                    self.close_connection = True
+                    return
+                data = json.dumps(result).encode("utf-8")
+                try:
+                    self.send_response(status)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(data)))
+                    self.end_headers()
+                    self.wfile.write(data)
+                    if method == "getUpdates":
+                        api.record_delivery(result["result"])
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # بات قبل از جواب متوقف شده است
+
+            do_GET = _reply
+            do_POST = _reply
+
+            def handle(self):
+                try:
+                    super().handle()
+                except ConnectionResetError:
+                    pass  # بات در میانه درخواست متوقف شده است
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Local fake Telegram Bot API server")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--flood-every", type=int, default=0)
+    args = parser.parse_args()
+    api = FakeBotApi(port=args.port, flood_every=args.flood_every)
+    print(f"Fake Bot API on {api.url} (set TELEGRAM_API_URL={api.url})")
+    api.httpd.serve_forever()
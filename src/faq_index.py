@@ -0,0 +1,179 @@
+"""
+موتور پاسخ سوالات متداول: پیدا کردن شبیه‌ترین سوال از فهرست سوال و جواب‌ها (TF-IDF تکه‌های حرفی و شباهت کسینوسی).
+بنچمارک: bench/bench_faq.py
+"""
+import hashlib
+import json
+import logging
+import math
+import os
+import re
+import time
+from array import array
+from collections import Counter, namedtuple
+from autocomplete import normalize
+
+try:
+    import numpy
+except ImportError:  # بدون NumPy امتیازها با دیکشنری جمع زده می‌شوند
+    numpy = None
+
+logger = logging.getLogger(__name__)
+
+FaqEntry = namedtuple("FaqEntry", "question answer")
+FaqMatch = namedtuple("FaqMatch", "entry score")
+
+NGRAM = 3  # طول تکه‌های حرفی
+MAX_DF = 0.5  # تکه‌هایی که در بیش از این نسبت از سوال‌ها هستند ارزشی برای مقایسه ندارند
+_VERSION = 1
+_PUNCTUATION = re.compile(r"[^\w\s]")
+
+
+# تکه‌های حرفی متن یکسان‌سازی شده (با فاصله در ابتدا و انتهای کلمات، تا مرز کلمه‌ها هم مقایسه شود)
+def ngrams(text):
+    text = " " + " ".join(_PUNCTUATION.sub(" ", normalize(text)).split()) + " "
+    return Counter(text[i:i + NGRAM] for i in range(len(text) - NGRAM + 1))
+
+
+def load_entries(path):
+    with open(path, encoding="utf-8") as f:
+        return [FaqEntry(item["question"], item["answer"]) for item in json.load(f)]
+
+
+class FaqIndex:
+    """
+    ماتریس TF-IDF سوال‌ها به صورت ستونی فشرده (CSR روی تکه‌ها): برای هر تکه، سوال‌هایی که آن را دارند و وزن آن.
+    بردارهای سوال‌ها نرمال هستند، پس امتیاز هر سوال با جمع وزن تکه‌های مشترک همان شباهت کسینوسی است
+    و فقط سوال‌هایی بررسی می‌شوند که حداقل یک تکه مشترک با متن دارند.
+    با NumPy امتیاز همه سوال‌ها برای هر متن با یک bincount روی تکه‌های آن متن حساب می‌شود.
+    ایندکس در cache_path ذخیره و تا وقتی فهرست سوال‌ها تغییر نکرده از همان فایل بارگذاری می‌شود.
+    """
+
+    def __init__(self, entries, min_score=0.4, cache_path=None):
+        self.entries = list(entries)
+        self.min_score = min_score  # حداقل شباهت برای پیشنهاد جواب
+        digest = hashlib.sha1(json.dumps(self.entries, ensure_ascii=False).encode("utf-8")).hexdigest()
+        if not (cache_path and self._load(cache_path, digest)):
+            self._build()
+            if cache_path:
+                self._save(cache_path, digest)
+        self._terms = {term: i for i, term in enumerate(self.terms)}
+        if numpy is not None:
+            self._docs = numpy.frombuffer(self.docs, dtype=numpy.int32)
+            self._weights = numpy.frombuffer(self.weights, dtype=numpy.float32)
+
+    @classmethod
+    def from_file(cls, path, min_score=0.4, cache_path=None):
+        return cls(load_entries(path), min_score, cache_path)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _build(self):
+        started = time.perf_counter()
+        postings = {}  # تکه -> [(سوال، وزن)]
+        for doc, entry in enumerate(self.entries):
+            for term, count in ngrams(entry.question).items():
+                postings.setdefault(term, []).append((doc, 1 + math.log(count)))
+        documents = len(self.entries)
+        self.terms = sorted(term for term, items in postings.items() if len(items) <= max(1, MAX_DF * documents))
+        self.idf = array("f", (math.log((1 + documents) / (1 + len(postings[term]))) + 1 for term in self.terms))
+        norms = [0.0] * documents
+        for term, idf in zip(self.terms, self.idf):
+            for doc, tf in postings[term]:
+                norms[doc] += (tf * idf) ** 2
+        norms = [math.sqrt(norm) or 1.0 for norm in norms]
+        self.offsets, self.docs, self.weights = array("q", [0]), array("i"), array("f")
+        for term, idf in zip(self.terms, self.idf):
+            for doc, tf in postings[term]:
+                self.docs.append(doc)
+                self.weights.append(tf * idf / norms[doc])
+            self.offsets.append(len(self.docs))
+        logger.info("ایندکس سوالات متداول: %s سوال، %s تکه در %.1f ثانیه", documents, len(self.terms),
+                    time.perf_counter() - started)
+
+    # فایل cache: یک خط JSON (نسخه، هش فهرست سوال‌ها و تکه‌ها) و بعد آرایه‌های باینری
+    def _save(self, path, digest):
+        header = {"version": _VERSION, "digest": digest, "entries": len(self.entries), "terms": self.terms,
+                  "postings": len(self.docs)}
+        temp_path = path + ".tmp"
+        with open(temp_path, "wb") as f:
+            f.write(json.dumps(header, ensure_ascii=False).encode("utf-8") + b"\n")
+            for values in (self.offsets, self.idf, self.docs, self.weights):
+                values.tofile(f)
+        os.replace(temp_path, path)
+
+    def _load(self, path, digest):
+        if not os.path.exists(path):
+            return False
+        try:
+            with open(path, "rb") as f:
+                header = json.loads(f.readline())
+                if header["version"] != _VERSION or header["digest"] != digest:
+                    return False
+                self.terms = header["terms"]
+                self.offsets, self.idf, self.docs, self.weights = array("q"), array("f"), array("i"), array("f")
+                self.offsets.fromfile(f, len(self.terms) + 1)
+                self.idf.fromfile(f, len(self.terms))
+                self.docs.fromfile(f, header["postings"])
+                self.weights.fromfile(f, header["postings"])
+            return True
+        except (OSError, ValueError, KeyError, EOFError) as e:
+            logger.warning("⚠️ فایل ایندکس سوالات متداول خوانده نشد و دوباره ساخته می‌شود: %s", e)
+            return False
+
+    # بردار نرمال متن جستجو: [(شماره تکه، وزن)]
+    def _query(self, text):
+        vector = []
+        for term, count in ngrams(text).items():
+            term_id = self._terms.get(term)
+            if term_id is not None:
+                vector.append((term_id, (1 + math.log(count)) * self.idf[term_id]))
+        norm = math.sqrt(sum(weight * weight for _, weight in vector)) or 1.0
+        return [(term_id, weight / norm) for term_id, weight in vector]
+
+    def _matches(self, scores, limit):
+        matches = sorted(((score, doc) for doc, score in scores.items() if score >= self.min_score), reverse=True)
+        return [FaqMatch(self.entries[doc], round(score, 3)) for score, doc in matches[:limit]]
+
+    # شبیه‌ترین سوال‌ها به هر متن (امتیاز حداقل min_score)؛ خروجی یک لیست FaqMatch برای هر متن
+    def search_many(self, texts, limit=1):
+        if not self.entries:
+            return [[] for _ in texts]
+        queries = [self._query(text) for text in texts]
+        if numpy is None:
+            results = []
+            for vector in queries:
+                scores = Counter()
+                for term_id, weight in vector:
+                    start, end = self.offsets[term_id], self.offsets[term_id + 1]
+                    for doc, doc_weight in zip(self.docs[start:end], self.weights[start:end]):
+                        scores[doc] += weight * doc_weight
+                results.append(self._matches(scores, limit))
+            return results
+        results = []
+        for vector in queries:
+            if not vector:
+                results.append([])
+                continue
+            ranges = [(self.offsets[term_id], self.offsets[term_id + 1], weight) for term_id, weight in vector]
+            scores = numpy.bincount(numpy.concatenate([self._docs[start:end] for start, end, _ in ranges]),
+                                    numpy.concatenate([self._weights[start:end] * weight
+                                                       for start, end, weight in ranges]),
+                                    minlength=len(self.entries))
+            if limit == 1:
+                top = [scores.argmax()]
+            elif limit < len(self.entries):
+                top = numpy.argpartition(-scores, limit)[:limit]
+            else:
+                top = range(len(self.entries))
+            results.append(self._matches({int(doc): float(scores[doc]) for doc in top}, limit))
+        return results
+
+    def search(self, text, limit=1):
+        return self.search_many([text], limit)[0]
+
+    def best(self, text):
+        matches = self.search(text)
+        return matches[0] if matches else None
+
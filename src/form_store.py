@@ -0,0 +1,179 @@
+"""
+ذخیره فرم‌های در حال پر شدن کاربران در حافظه یا SQLite.
+بنچمارک: bench/bench_form_store.py
+"""
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from media import dump_attachments, load_attachments
+
+
+class FormState:
+    """اطلاعات فرم یک کاربر (درس، استاد، سوال، پیوست‌ها و متن نهایی)"""
+
+    __slots__ = ("course", "professor", "question", "final_message", "media", "updated_at")
+
+    def __init__(self, course=None, professor=None, question=None, final_message=None, media=None, updated_at=0.0):
+        self.course = course
+        self.professor = professor
+        self.question = question
+        self.final_message = final_message
+        self.media = media or []  # لیست Attachment (عکس و فایل‌های سوال)
+        self.updated_at = updated_at
+
+
+class FormStore(ABC):
+    """
+    کلاس پایه برای ذخیره فرم‌ها؛ فرم‌های رها شده بعد از ttl ثانیه حذف می‌شوند.
+    هندلر مرحله کاربری که فرمش حذف شده همچنان ثبت است، پس هندلرها باید نبودن فرم (None) را در نظر بگیرند.
+    """
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._expiry_thread = None
+
+    @abstractmethod
+    def get(self, chat_id):
+        """فرم چت یا None اگر وجود ندارد یا منقضی شده است"""
+
+    @abstractmethod
+    def save(self, chat_id, form):
+        """ذخیره فرم و به‌روز کردن زمان آخرین تغییر آن"""
+
+    @abstractmethod
+    def pop(self, chat_id):
+        """حذف فرم چت؛ خروجی فرم حذف شده یا None"""
+
+    @abstractmethod
+    def expire(self):
+        """حذف فرم‌هایی که بیشتر از ttl ثانیه تغییر نکرده‌اند"""
+
+    @abstractmethod
+    def __len__(self):
+        pass
+
+    def __contains__(self, chat_id):
+        return self.get(chat_id) is not None
+
+    # حذف دوره‌ای فرم‌های قدیمی در یک ترد پس‌زمینه
+    def start_expiry(self, interval=60):
+        def loop():
+            while True:
+                time.sleep(interval)
+                self.expire()
+
+        if self._expiry_thread is None:
+            self._expiry_thread = threading.Thread(target=loop, name="form-expiry", daemon=True)
+            self._expiry_thread.start()
+
+
+class MemoryFormStore(FormStore):
+    """ذخیره فرم‌ها در حافظه با سقف تعداد (LRU) و زمان انقضا (TTL)"""
+
+    def __init__(self, ttl=3600, max_entries=10000):
+        super().__init__(ttl)
+        self.max_entries = max_entries
+        self._forms = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, chat_id):
+        with self._lock:
+            form = self._forms.get(chat_id)
+            if form is None:
+                return None
+            if time.time() - form.updated_at > self.ttl:
+                del self._forms[chat_id]
+                return None
+            self._forms.move_to_end(chat_id)
+            return form
+
+    def save(self, chat_id, form):
+        form.updated_at = time.time()
+        with self._lock:
+            self._forms[chat_id] = form
+            self._forms.move_to_end(chat_id)
+            while len(self._forms) > self.max_entries:
+                self._forms.popitem(last=False)
+
+    def pop(self, chat_id):
+        with self._lock:
+            return self._forms.pop(chat_id, None)
+
+    def expire(self):
+        deadline = time.time() - self.ttl
+        with self._lock:
+            # فرم‌ها به ترتیب آخرین تغییر مرتب هستند، پس از ابتدا حذف می‌کنیم
+            while self._forms:
+                chat_id, form = next(iter(self._forms.items()))
+                if form.updated_at > deadline:
+                    break
+                del self._forms[chat_id]
+
+    def __len__(self):
+        return len(self._forms)
+
+
+class SqliteFormStore(FormStore):
+    """ذخیره فرم‌ها در SQLite (حالت WAL) تا فرم‌های در انتظار تأیید بعد از ری‌استارت از بین نروند"""
+
+    def __init__(self, path="forms.db", ttl=86400):
+        super().__init__(ttl)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS forms ("
+            "chat_id INTEGER PRIMARY KEY, course TEXT, professor TEXT, "
+            "question TEXT, final_message TEXT, updated_at REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS forms_updated_at ON forms (updated_at)")
+        if "media" not in [row[1] for row in self._db.execute("PRAGMA table_info(forms)")]:
+            self._db.execute("ALTER TABLE forms ADD COLUMN media TEXT")
+
+    def get(self, chat_id):
+        with self._lock:
+            row = self._db.execute(
+                "SELECT course, professor, question, final_message, media, updated_at FROM forms WHERE chat_id = ?",
+                (chat_id,),
+            ).fetchone()
+        if row is None or time.time() - row[5] > self.ttl:
+            return None
+        course, professor, question, final_message, media, updated_at = row
+        return FormState(course, professor, question, final_message, load_attachments(media), updated_at)
+
+    def save(self, chat_id, form):
+        form.updated_at = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO forms (chat_id, course, professor, question, final_message, media, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (chat_id, form.course, form.professor, form.question, form.final_message,
+                 dump_attachments(form.media), form.updated_at),
+            )
+
+    def pop(self, chat_id):
+        form = self.get(chat_id)
+        with self._lock:
+            self._db.execute("DELETE FROM forms WHERE chat_id = ?", (chat_id,))
+        return form
+
+    def expire(self):
+        with self._lock:
+            self._db.execute("DELETE FROM forms WHERE updated_at < ?", (time.time() - self.ttl,))
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM forms").fetchone()[0]
+
+
+# ساخت محل ذخیره فرم‌ها بر اساس تنظیمات
+def create_form_store(backend="memory", path="forms.db", ttl=3600, max_entries=10000):
+    if backend == "sqlite":
+        store = SqliteFormStore(path, ttl=ttl)
+    else:
+        store = MemoryFormStore(ttl=ttl, max_entries=max_entries)
+    store.start_expiry(interval=max(1, min(60, ttl)))
+    return store
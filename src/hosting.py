@@ -0,0 +1,47 @@
+import logging
+import threading
+import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class Host:
+    """
+    اجرای چند بات (مثلاً برای دانشکده‌ها یا کانال‌های مختلف) در یک پروسه.
+    با TENANTS=eng,sci هر بات تنظیمات خودش را از کلیدهای ENG_TOKEN، ENG_CHANNEL_ID، ENG_ADMIN_CHAT_ID و ...
+    می‌گیرد و بقیه تنظیمات بین بات‌ها مشترک است. هر بات هندلرها، صف ارسال، فرم‌ها و پوشه داده خودش را دارد
+    (DATA_DIR، پیش‌فرض نام بات) و همه از transport مشترک HTTP و همان pool اتصال‌ها استفاده می‌کنند.
+    """
+
+    def __init__(self, config, build_app):
+        self.config = config
+        self.apps = []
+        for name in config.get_list("TENANTS"):
+            tenant_config = config.scoped(name)
+            if not tenant_config.get("DATA_DIR"):
+                tenant_config.values["DATA_DIR"] = name
+            if tenant_config.get("RUN_MODE", "polling") != "polling":
+                raise ValueError(f"بات {name}: در میزبانی چند بات فقط حالت polling پشتیبانی می‌شود.")
+            try:
+                self.apps.append(build_app(tenant_config, tenant=name))
+            except ValueError as e:
+                raise ValueError(f"بات {name}: {e}") from e
+
+    def describe(self):
+        return "; ".join(f"{app.tenant}: {app.describe()}" for app in self.apps)
+
+    def run(self):
+        metrics_port = self.config.get_int("METRICS_PORT", 0)
+        if metrics_port:
+            # یک سرور /metrics برای کل پروسه؛ gaugeهای هم‌نام بات‌ها با هم جمع می‌شوند
+            metrics.instrument_api()
+            metrics.start_metrics_server(metrics_port)
+        threads = []
+        for app in self.apps:
+            app.start_background_jobs(metrics_port=0)
+            thread = threading.Thread(target=app.run_polling, name=f"polling-{app.tenant}", daemon=True)
+            thread.start()
+            threads.append(thread)
+        logger.info("🏠 %s بات در یک پروسه اجرا شدند", len(threads))
+        for thread in threads:
+            thread.join()
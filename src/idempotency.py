@@ -0,0 +1,73 @@
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+
+class Ledger:
+    """
+    دفتر کلیدهای پردازش شده (مثلاً آیدی callback یا (action، فرم)) با حداکثر capacity کلید.
+    هر کلید بعد از ttl ثانیه فراموش می‌شود؛ قدیمی‌ترین کلیدها هنگام افزودن کلید جدید حذف می‌شوند.
+    """
+
+    def __init__(self, ttl=600.0, capacity=100000, clock=time.monotonic):
+        self.ttl = ttl
+        self.capacity = capacity
+        self.clock = clock
+        self._keys = OrderedDict()  # کلید -> زمان انقضا، به ترتیب ثبت
+        self._lock = threading.Lock()
+
+    def _evict(self, now):
+        while self._keys:
+            key, expires_at = next(iter(self._keys.items()))
+            if expires_at > now and len(self._keys) <= self.capacity:
+                break
+            del self._keys[key]
+
+    def __contains__(self, key):
+        with self._lock:
+            expires_at = self._keys.get(key)
+            return expires_at is not None and expires_at > self.clock()
+
+    # ثبت کلید؛ خروجی False اگر کلید قبلاً ثبت شده و هنوز منقضی نشده بود
+    def add(self, key):
+        now = self.clock()
+        with self._lock:
+            expires_at = self._keys.get(key)
+            if expires_at is not None and expires_at > now:
+                return False
+            self._keys.pop(key, None)
+            self._keys[key] = now + self.ttl
+            self._evict(now)
+            return True
+
+    def __len__(self):
+        return len(self._keys)
+
+
+class KeyedLocks:
+    """قفل جدا برای هر کلید (مثلاً هر فرم)؛ قفل کلیدهایی که کسی منتظرشان نیست حذف می‌شوند"""
+
+    def __init__(self):
+        self._locks = {}  # کلید -> [قفل، تعداد استفاده‌کننده‌ها]
+        self._lock = threading.Lock()
+
+    # گرفتن قفل بدون انتظار؛ اگر کلید در حال پردازش باشد acquired برابر False است
+    @contextmanager
+    def hold(self, key):
+        with self._lock:
+            entry = self._locks.setdefault(key, [threading.Lock(), 0])
+            entry[1] += 1
+        acquired = entry[0].acquire(blocking=False)
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                entry[0].release()
+            with self._lock:
+                entry[1] -= 1
+                if not entry[1]:
+                    del self._locks[key]
+
+    def __len__(self):
+        return len(self._locks)
@@ -0,0 +1,270 @@
+"""
+شبیه‌سازی هزاران کاربر که فرم سوال درباره اساتید را پر می‌کنند، روی شبیه‌ساز محلی Bot API.
+
+    python load_test.py --script app.py --users 500
+    python load_test.py --script mfinal.py --flow preview --users 200
+    python load_test.py --users 1000 --env DIGEST_INTERVAL=5 --env RUN_MODE=async
+    python load_test.py --users 50 --partition 20 --env BACKOFF_MAX=8
+    python load_test.py --users 50 --restart --env FORM_STORE=sqlite --env STEP_STORE=sqlite
+    python load_test.py --flow preview --users 400 --tenants 8            # 8 بات در یک پروسه
+    python load_test.py --flow preview --users 400 --tenants 8 --separate # 8 بات در 8 پروسه
+    python load_test.py --script mfinal.py --flow preview --users 100 --repeat-callbacks 4
+
+بات به صورت یک پروسه جدا با TELEGRAM_API_URL اجرا می‌شود. مسیر هر کاربر:
+/start -> اساتید -> درس -> استاد -> سوال -> تأیید (ادمین در flow=admin، خود کاربر در flow=preview).
+در پایان توان عملیاتی، صدک‌های تأخیر و فرم‌های گم‌شده یا جابه‌جا شده گزارش می‌شود،
+و در صورت قطع شبکه یا ری‌استارت، زمان بازیابی و تعداد آپدیت‌هایی که دوباره تحویل بات شده‌اند.
+بات پست‌های کانال را به 20 پست در دقیقه محدود می‌کند، پس برای تعداد زیاد کاربر حالت DIGEST_INTERVAL را فعال کنید.
+با --tenants کاربران بین چند بات (توکن جدا) تقسیم می‌شوند و حافظه (RSS) و درخواست‌های API در ثانیه گزارش می‌شود.
+با --repeat-callbacks هر دکمه تأیید چند بار همزمان زده می‌شود (نیمی با آیدی callback جدید مثل دوبار زدن دکمه،
+نیمی با همان آیدی مثل آپدیت تکراری) و هر فرم باید دقیقاً یک بار منتشر شود.
+"""
+import argparse
+import itertools
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from fake_api import FakeBotApi
+
+ADMIN_CHAT_ID = 999
+CHANNEL_ID = -1001
+FIRST_USER_ID = 100000
+COURSES = 20
+
+
+# حافظه فیزیکی فعلی پروسه (مگابایت)
+def rss_mb(pid):
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def percentile(values, p):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+
+class Scenario:
+    """وضعیت هر کاربر شبیه‌سازی شده؛ با هر پیام بات قدم بعدی کاربر ارسال می‌شود"""
+
+    def __init__(self, api, users, flow, repeat=1):
+        self.api = api
+        self.flow = flow
+        self.repeat = repeat  # تعداد دفعات زدن هر دکمه تأیید
+        self._presses = itertools.count()
+        self.users = {FIRST_USER_ID + i: 0 for i in range(users)}  # آیدی کاربر -> شماره مرحله
+        self.submitted_at = {}  # زمان ارسال سوال
+        self.submit_latency = []  # ارسال سوال تا دریافت پاسخ بات
+        self.approved_at = {}  # زمان تأیید فرم
+        self.publish_latency = []  # تأیید تا انتشار در کانال
+        self.channel_posts = []
+        self.published = set()
+        self.notices = {}  # تعداد اعلان تأیید هر کاربر
+        self.review_message = None  # آخرین صفحه بررسی ادمین (message_id، markup)
+        self.done = threading.Event()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def course(user_id):
+        return f"درس {user_id % COURSES}"
+
+    @staticmethod
+    def question(user_id):
+        return f"سوال شماره {user_id} درباره امتحان"
+
+    def start(self):
+        for user_id in self.users:
+            self.api.push_message(user_id, "/start")
+
+    def on_send(self, method, params, message):
+        now = time.monotonic()
+        chat_id = message["chat"]["id"]
+        text = params.get("text", "")
+        markup = json.loads(params["reply_markup"]) if "reply_markup" in params else None
+        with self._lock:
+            if str(params.get("chat_id")) == str(CHANNEL_ID):
+                self.channel_posts.append(text)
+                for user_id in self.users:
+                    if self.question(user_id) in text:
+                        self.published.add(user_id)
+                        if user_id in self.approved_at:
+                            self.publish_latency.append(now - self.approved_at.pop(user_id))
+                if len(self.published) >= len(self.users):
+                    self.done.set()
+            elif chat_id == ADMIN_CHAT_ID:
+                if markup and "inline_keyboard" in markup:
+                    self.review_message = (message["message_id"] if method == "sendMessage"
+                                           else int(params["message_id"]), markup)
+            elif chat_id in self.users:
+                self._next_step(chat_id, text, markup, message["message_id"], now)
+
+    def _next_step(self, user_id, text, markup, message_id, now):
+        if text.startswith("لطفاً یکی از گزینه"):
+            if self.users[user_id] == 0:
+                self.users[user_id] = 1
+                self.api.push_message(user_id, "👨‍🏫 اساتید")
+        elif text.startswith("لطفاً نام درس"):
+            self.api.push_message(user_id, self.course(user_id))
+        elif text.startswith("اسم استاد"):
+            self.api.push_message(user_id, f"استاد {user_id % 50}")
+        elif text.startswith("سوال خود را"):
+            self.submitted_at[user_id] = now
+            self.api.push_message(user_id, self.question(user_id))
+        elif text.startswith("فرم شما به ادمین") or text.startswith("پیام شما به این شکل"):
+            self.submit_latency.append(now - self.submitted_at.pop(user_id, now))
+            self.users[user_id] = 2
+            if self.flow == "preview" and markup:
+                self.approved_at[user_id] = now
+                self.press(user_id, message_id, "confirm")
+        elif text.startswith("✅"):
+            self.notices[user_id] = self.notices.get(user_id, 0) + 1
+
+    # زدن دکمه repeat بار پشت سر هم: هر دو بار با یک آیدی callback (آپدیت تکراری)، و هر جفت با آیدی جدید (دوبار زدن)
+    def press(self, chat_id, message_id, data):
+        callback_id = None
+        for i in range(self.repeat):
+            if i % 2 == 0:
+                callback_id = f"press-{next(self._presses)}"
+            self.api.push_callback(chat_id, message_id, data, callback_id=callback_id)
+
+    # ادمین صفحه بررسی را باز می‌کند و همه فرم‌های صفحه را تأیید می‌کند
+    def admin_loop(self):
+        while not self.done.is_set():
+            with self._lock:
+                review = self.review_message
+                self.review_message = None
+            if review is None:
+                self.api.push_message(ADMIN_CHAT_ID, "/review", first_name="admin")
+                time.sleep(3)
+                continue
+            message_id, markup = review
+            buttons = [button["callback_data"] for row in markup["inline_keyboard"] for button in row]
+            approve = next((data for data in buttons if data.startswith("approveall_")), None)
+            if approve is None:
+                time.sleep(0.5)
+                continue
+            now = time.monotonic()
+            with self._lock:
+                # فرم‌های این صفحه متعلق به کاربرانی هستند که سوالشان ارسال شده ولی هنوز تأیید نشده
+                for user_id, step in self.users.items():
+                    if step == 2 and user_id not in self.approved_at and user_id not in self.published:
+                        self.approved_at.setdefault(user_id, now)
+            self.press(ADMIN_CHAT_ID, message_id, approve)
+            time.sleep(0.2)
+
+    def report(self, elapsed):
+        published = {}
+        misrouted = 0
+        for post in self.channel_posts:
+            for user_id in self.users:
+                if self.question(user_id) in post:
+                    published[user_id] = published.get(user_id, 0) + 1
+                    if f"#{self.course(user_id).replace(' ', '_')}" not in post:
+                        misrouted += 1
+        lost = [user_id for user_id in self.users if user_id not in published]
+        duplicates = sum(count - 1 for count in published.values())
+        return {
+            "users": len(self.users),
+            "published": len(published),
+            "lost": len(lost),
+            "duplicated": duplicates,
+            "misrouted": misrouted,
+            "elapsed_s": round(elapsed, 2),
+            "forms_per_s": round(len(published) / elapsed, 2) if elapsed else 0,
+            "submit_latency_ms": {p: round(percentile(self.submit_latency, p) * 1000, 1) for p in (50, 90, 99)},
+            "publish_latency_ms": {p: round(percentile(self.publish_latency, p) * 1000, 1) for p in (50, 90, 99)},
+            "api_calls": dict(self.api.calls),
+            "flood_errors": self.api.flood_errors,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline load test for the professor form flow")
+    parser.add_argument("--script", default="app.py", help="bot script to run")
+    parser.add_argument("--flow", choices=["admin", "preview"], default="admin")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--timeout", type=float, default=600)
+    parser.add_argument("--flood-every", type=int, default=0, help="answer every Nth sendMessage with 429")
+    parser.add_argument("--env", action="append", default=[], help="extra KEY=VALUE for the bot process")
+    parser.add_argument("--partition", type=float, default=0, help="drop all API connections for N seconds")
+    parser.add_argument("--restart", action="store_true", help="kill and restart the bot process")
+    parser.add_argument("--fault-at", type=float, default=5, help="seconds after start to inject the fault")
+    parser.add_argument("--tenants", type=int, default=1, help="split users between N bots (flow=preview)")
+    parser.add_argument("--separate", action="store_true", help="run each tenant bot in its own process")
+    parser.add_argument("--repeat-callbacks", type=int, default=1, help="press every approve button N times at once")
+    args = parser.parse_args()
+    if args.tenants > 1 and args.flow != "preview":
+        parser.error("--tenants needs --flow preview")
+
+    api = FakeBotApi(flood_every=args.flood_every)
+    scenario = Scenario(api, args.users, args.flow, args.repeat_callbacks)
+    api.on_send = scenario.on_send
+    api.start()
+
+    workdir = tempfile.mkdtemp(prefix="load-test-")
+    env = dict(os.environ, TOKEN="1:fake", CHANNEL_ID=str(CHANNEL_ID), ADMIN_CHAT_ID=str(ADMIN_CHAT_ID),
+               TELEGRAM_API_URL=api.url, LOG_LEVEL="WARNING")
+    env.update(item.split("=", 1) for item in args.env)
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), args.script)
+    tenants = [f"t{i}" for i in range(args.tenants)] if args.tenants > 1 else []
+    for i, user_id in enumerate(scenario.users):
+        if tenants:
+            api.chat_tokens[user_id] = f"{i % len(tenants) + 1}:fake"
+    if args.separate and tenants:
+        envs = [dict(env, TOKEN=f"{i + 1}:fake", DATA_DIR=name) for i, name in enumerate(tenants)]
+    elif tenants:
+        envs = [dict(env, TENANTS=",".join(tenants), **{f"{name.upper()}_TOKEN": f"{i + 1}:fake"
+                                                      for i, name in enumerate(tenants)})]
+    else:
+        envs = [env]
+    processes = [subprocess.Popen([sys.executable, script], cwd=workdir, env=bot_env) for bot_env in envs]
+
+    # قطع شبکه یا کشتن و اجرای دوباره بات در میانه آزمون
+    def inject_fault():
+        if scenario.done.wait(args.fault_at):
+            return
+        if args.partition:
+            api.partition(args.partition)
+        if args.restart:
+            processes[-1].kill()
+            processes[-1].wait()
+            processes.append(subprocess.Popen([sys.executable, script], cwd=workdir, env=env))
+
+    try:
+        started = time.monotonic()
+        scenario.start()
+        if args.flow == "admin":
+            threading.Thread(target=scenario.admin_loop, daemon=True).start()
+        if args.partition or args.restart:
+            threading.Thread(target=inject_fault, daemon=True).start()
+        scenario.done.wait(args.timeout)
+        elapsed = time.monotonic() - started
+        memory = sum(rss_mb(bot.pid) for bot in processes if bot.poll() is None)
+        time.sleep(1)  # فرصت برای پست‌های تکراری احتمالی
+    finally:
+        for bot in processes:
+            bot.terminate()
+            bot.wait()
+        api.stop()
+    report = scenario.report(elapsed)
+    report["redelivered_updates"] = api.redelivered
+    if tenants:
+        report["processes"] = len(envs)
+        report["rss_mb"] = round(memory, 1)
+        report["rss_mb_per_tenant"] = round(memory / len(tenants), 1)
+        report["api_requests_per_s"] = round(len(api.sent) / elapsed, 1) if elapsed else 0
+    if args.partition:
+        report["recovery_s"] = round(api.recovery_time, 2) if api.recovery_time is not None else None
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+import atexit
+import gzip
+import json
+import logging
+import os
+import queue
+import shutil
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler, TimedRotatingFileHandler
+
+handler_logger = logging.getLogger("handlers")
+
+_EXTRA_FIELDS = ("chat_id", "handler", "latency_ms")
+
+
+class JsonFormatter(logging.Formatter):
+    """هر رکورد لاگ به صورت یک خط JSON (همراه با chat_id، نام هندلر و زمان اجرا در صورت وجود)"""
+
+    def format(self, record):
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for field in _EXTRA_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                entry[field] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class _QueueHandler(QueueHandler):
+    # رکورد بدون فرمت شدن در صف قرار می‌گیرد؛ فرمت کردن در ترد QueueListener انجام می‌شود
+    def prepare(self, record):
+        return record
+
+
+# فشرده کردن فایل‌های لاگ قدیمی بعد از چرخش
+def _gzip_namer(name):
+    return name + ".gz"
+
+
+def _gzip_rotator(source, dest):
+    with open(source, "rb") as src, gzip.open(dest, "wb") as dst:
+        shutil.copyfileobj(src, dst)
+    os.remove(source)
+
+
+def setup_logging(path="bot.log", level="INFO", max_bytes=10 * 1024 * 1024, backup_count=5, rotate_when=None):
+    """
+    تنظیم لاگ‌گیری بدون بلاک کردن ترد هندلرها: لاگ‌ها در صف قرار می‌گیرند و یک ترد جداگانه
+    آن‌ها را در فایل (JSON، با چرخش بر اساس حجم یا زمان و فشرده‌سازی) و کنسول می‌نویسد.
+    بنچمارک: bench/bench_logging.py
+    """
+    if rotate_when:
+        file_handler = TimedRotatingFileHandler(path, when=rotate_when, backupCount=backup_count, encoding="utf-8")
+    else:
+        file_handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8")
+    file_handler.namer = _gzip_namer
+    file_handler.rotator = _gzip_rotator
+    file_handler.setFormatter(JsonFormatter())
+
+    console_handler = logging.StreamHandler()
+    console_handler.setFormatter(logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s"))
+    # زمان اجرای هندلرها فقط در فایل نوشته می‌شود تا کنسول شلوغ نشود
+    console_handler.addFilter(lambda record: not hasattr(record, "latency_ms"))
+
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, file_handler, console_handler)
+    listener.start()
+    atexit.register(listener.stop)
+
+    root = logging.getLogger()
+    root.setLevel(level)
+    root.handlers = [_QueueHandler(log_queue)]
+    return listener
+
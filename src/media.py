@@ -0,0 +1,194 @@
+import json
+import logging
+import os
+import queue
+import sqlite3
+import tempfile
+import threading
+from collections import namedtuple
+import requests
+from telebot import apihelper
+from telebot.types import InputMediaDocument, InputMediaPhoto
+
+logger = logging.getLogger(__name__)
+
+# پیوست فرم؛ kind یکی از photo یا document است
+Attachment = namedtuple("Attachment", "kind file_id unique_id")
+
+MAX_CAPTION_LENGTH = 1024  # حداکثر طول کپشن عکس و فایل در تلگرام
+MAX_GROUP_SIZE = 10  # حداکثر تعداد فایل در یک آلبوم
+CHUNK_SIZE = 64 * 1024
+
+
+def extract_attachment(message):
+    if message.content_type == "photo":
+        photo = message.photo[-1]  # بزرگ‌ترین اندازه عکس
+        return Attachment("photo", photo.file_id, photo.file_unique_id)
+    if message.content_type == "document":
+        return Attachment("document", message.document.file_id, message.document.file_unique_id)
+    return None
+
+
+def dump_attachments(attachments):
+    return json.dumps([list(item) for item in attachments]) if attachments else None
+
+
+def load_attachments(data):
+    return [Attachment(*item) for item in json.loads(data)] if data else []
+
+
+# ارسال پست همراه با پیوست‌ها با استفاده دوباره از file_id (بدون دانلود و آپلود دوباره)
+# text=None یعنی فقط پیوست‌ها بدون کپشن ارسال شوند؛ on_sent بعد از ارسال موفق آخرین پیام پست صدا زده می‌شود
+def send_post(outbox, chat_id, text, attachments=(), parse_mode=None, on_sent=None, on_failed=None):
+    sends = []  # (متد، payload، آرگومان‌ها)
+    if not attachments and text is not None:
+        sends.append(("send_message", text, {"parse_mode": parse_mode}))
+    else:
+        # عکس و فایل در یک آلبوم قرار نمی‌گیرند؛ هر نوع جدا و حداکثر 10 تایی ارسال می‌شود
+        groups = []
+        for kind in ("photo", "document"):
+            items = [item for item in attachments if item.kind == kind]
+            groups += [items[i:i + MAX_GROUP_SIZE] for i in range(0, len(items), MAX_GROUP_SIZE)]
+        caption = text if text is not None and len(text) <= MAX_CAPTION_LENGTH else None
+        for index, group in enumerate(groups):
+            group_caption = caption if index == 0 else None
+            if len(group) == 1:
+                item = group[0]
+                method = "send_photo" if item.kind == "photo" else "send_document"
+                sends.append((method, item.file_id, {"caption": group_caption, "parse_mode": parse_mode}))
+            else:
+                media_type = InputMediaPhoto if group[0].kind == "photo" else InputMediaDocument
+                media = [media_type(item.file_id) for item in group]
+                if group_caption:
+                    media[0].caption = group_caption
+                    media[0].parse_mode = parse_mode
+                sends.append(("send_media_group", media, {}))
+        if caption is None and text is not None:
+            sends.append(("send_message", text, {"parse_mode": parse_mode}))
+    # پیام‌های یک چت به ترتیب ارسال می‌شوند، پس ارسال آخرین پیام یعنی کل پست رسیده است؛
+    # on_failed با رها شدن هر بخش پست صدا زده می‌شود
+    for index, (method, payload, kwargs) in enumerate(sends):
+        outbox.send(method, chat_id, payload, on_sent if index == len(sends) - 1 else None, on_failed, **kwargs)
+
+
+class AlbumCollector:
+    """
+    جمع کردن پیام‌های یک آلبوم (پیام‌هایی با media_group_id یکسان که جدا جدا می‌رسند).
+    وقتی delay ثانیه پیام جدیدی برای آلبوم نرسد، on_complete(messages) با همه پیام‌ها صدا زده می‌شود.
+    پیام‌هایی که زودتر از شروع آلبوم (start) برسند نگه داشته می‌شوند و اگر آلبوم شروع نشود دور ریخته می‌شوند.
+    """
+
+    def __init__(self, on_complete, delay=1.0):
+        self.on_complete = on_complete
+        self.delay = delay
+        self.albums = {}  # media_group_id -> [پیام‌ها، تایمر، شروع شده]
+        self._lock = threading.Lock()
+
+    # اولین پیام آلبوم که مرحله فرم آن را دریافت کرده است
+    def start(self, message):
+        self._add(message, started=True)
+
+    # بقیه پیام‌های آلبوم
+    def add(self, message):
+        self._add(message, started=False)
+
+    def _add(self, message, started):
+        group_id = message.media_group_id
+        with self._lock:
+            album = self.albums.get(group_id)
+            if album is None:
+                album = self.albums[group_id] = [[], None, False]
+            else:
+                album[1].cancel()
+            album[0].append(message)
+            album[2] = album[2] or started
+            album[1] = threading.Timer(self.delay, self._complete, args=(group_id,))
+            album[1].daemon = True
+            album[1].start()
+
+    def _complete(self, group_id):
+        with self._lock:
+            messages, _, started = self.albums.pop(group_id)
+        if started:
+            self.on_complete(sorted(messages, key=lambda message: message.message_id))
+
+
+class FileCache:
+    """
+    فهرست فایل‌های دریافت شده (file_unique_id -> file_id و مسیر محلی) در SQLite.
+    پیوست‌ها هنگام ارسال در کانال یا برای ادمین با resolve به آخرین file_id همان فایل تبدیل می‌شوند.
+    با directory، هر فایل فقط یک بار و به صورت تکه‌تکه (بدون نگه داشتن کل فایل در حافظه)
+    در یک ترد پس‌زمینه روی دیسک ذخیره می‌شود.
+    """
+
+    def __init__(self, path="media.db", token=None, directory=None):
+        self.token = token
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS files ("
+            "unique_id TEXT PRIMARY KEY, kind TEXT NOT NULL, file_id TEXT NOT NULL, path TEXT)"
+        )
+        self._downloads = queue.Queue()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            threading.Thread(target=self._download_loop, name="media-download", daemon=True).start()
+
+    def get(self, unique_id):
+        with self._lock:
+            row = self._db.execute("SELECT kind, file_id, path FROM files WHERE unique_id = ?", (unique_id,)).fetchone()
+        return row
+
+    # پیوست‌ها با آخرین file_id دریافت شده برای همان فایل، برای ارسال دوباره (file_id یک فایل ممکن است عوض شود)
+    def resolve(self, attachments):
+        resolved = []
+        for item in attachments:
+            row = self.get(item.unique_id)
+            resolved.append(item._replace(file_id=row[1]) if row else item)
+        return resolved
+
+    def remember(self, attachments):
+        new = []
+        with self._lock:
+            for item in attachments:
+                row = self._db.execute("SELECT path FROM files WHERE unique_id = ?", (item.unique_id,)).fetchone()
+                # file_id جدید جایگزین قبلی می‌شود ولی مسیر فایل ذخیره شده حفظ می‌شود
+                self._db.execute(
+                    "INSERT INTO files (unique_id, kind, file_id) VALUES (?, ?, ?) "
+                    "ON CONFLICT(unique_id) DO UPDATE SET file_id = excluded.file_id",
+                    (item.unique_id, item.kind, item.file_id),
+                )
+                if row is None or row[0] is None:
+                    new.append(item)
+        if self.directory:
+            for item in new:
+                self._downloads.put(item)
+
+    def _download_loop(self):
+        while True:
+            item = self._downloads.get()
+            try:
+                path = self.download(item)
+                with self._lock:
+                    self._db.execute("UPDATE files SET path = ? WHERE unique_id = ?", (path, item.unique_id))
+            except Exception as e:
+                logger.error("❌ خطا در ذخیره فایل %s: %s", item.unique_id, e)
+
+    def download(self, item):
+        file_path = apihelper.get_file(self.token, item.file_id)["file_path"]
+        url = (apihelper.FILE_URL or "https://api.telegram.org/file/bot{0}/{1}").format(self.token, file_path)
+        target = os.path.join(self.directory, item.unique_id + os.path.splitext(file_path)[1])
+        fd, tmp_path = tempfile.mkstemp(prefix=".download-", dir=self.directory)
+        try:
+            with os.fdopen(fd, "wb") as file, requests.get(url, stream=True, timeout=(15, 60)) as response:
+                response.raise_for_status()
+                for chunk in response.iter_content(CHUNK_SIZE):
+                    file.write(chunk)
+            os.replace(tmp_path, target)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        return target
@@ -0,0 +1,69 @@
+from telebot.types import ReplyKeyboardMarkup, KeyboardButton
+
+
+class Menu:
+    """
+    ثبت دکمه‌های منو و دستورات بات در یک جا.
+    پیدا کردن هندلر هر پیام با یک جستجو در دیکشنری انجام می‌شود و کیبورد منو و متن راهنما
+    فقط یک بار ساخته می‌شوند.
+    بنچمارک: bench/bench_menu.py
+    """
+
+    def __init__(self, help_title="🤖 راهنمای بات:"):
+        self.help_title = help_title
+        self.labels = {}  # متن دکمه -> هندلر
+        self.commands = {}  # نام دستور -> هندلر
+        self.buttons = []  # ترتیب دکمه‌های منو
+        self.descriptions = []  # (دستور، توضیح) برای متن راهنما
+        self._markup = None
+        self._help_text = None
+
+    def button(self, label):
+        def decorator(func):
+            self.labels[label] = func
+            self.buttons.append(label)
+            self._markup = None
+            return func
+
+        return decorator
+
+    # description=None یعنی دستور در راهنما نمایش داده نمی‌شود
+    def command(self, name, description=None):
+        def decorator(func):
+            self.commands[name] = func
+            if description:
+                self.descriptions.append((name, description))
+                self._help_text = None
+            return func
+
+        return decorator
+
+    # کیبورد منو به صورت JSON آماده (یک بار ساخته می‌شود و دوباره استفاده می‌شود)
+    def markup(self):
+        if self._markup is None:
+            markup = ReplyKeyboardMarkup(resize_keyboard=True)
+            markup.add(*[KeyboardButton(label) for label in self.buttons])
+            self._markup = markup.to_json()
+        return self._markup
+
+    def help_text(self):
+        if self._help_text is None:
+            lines = [self.help_title]
+            lines += [f"/{name} - {description}" for name, description in self.descriptions]
+            self._help_text = "\n".join(lines)
+        return self._help_text
+
+    def resolve(self, text):
+        handler = self.labels.get(text)
+        if handler is None and text.startswith("/"):
+            # "/search@bot_name متن" -> "search"
+            parts = text[1:].split(maxsplit=1)
+            handler = self.commands.get(parts[0].split("@")[0] if parts else "")
+        return handler
+
+    def dispatch(self, message):
+        handler = self.resolve(message.text or "")
+        if handler is None:
+            return False
+        handler(message)
+        return True
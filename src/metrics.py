@@ -0,0 +1,186 @@
+"""
+متریک‌های Prometheus (زمان اجرای هندلرها و درخواست‌های Bot API، خطاها) و سرور /metrics.
+بنچمارک سربار: bench/bench_metrics.py
+"""
+import functools
+import logging
+import threading
+import time
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from telebot import apihelper
+from log_setup import handler_logger
+
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Counter:
+    def __init__(self, name, help_text, label):
+        self.name = name
+        self.help_text = help_text
+        self.label = label
+        self.values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, label_value, amount=1):
+        with self._lock:
+            self.values[label_value] = self.values.get(label_value, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for label_value, value in self.values.items():
+                lines.append(f'{self.name}{{{self.label}="{_escape(label_value)}"}} {value}')
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, help_text, label, buckets=BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label = label
+        self.buckets = buckets
+        self.series = {}  # مقدار برچسب -> [شمارش هر بازه..., مجموع، تعداد]
+        self._lock = threading.Lock()
+
+    def observe(self, label_value, value):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self.series.get(label_value)
+            if series is None:
+                series = self.series[label_value] = [0] * (len(self.buckets) + 3)
+            series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for label_value, series in self.series.items():
+                label = f'{self.label}="{_escape(label_value)}"'
+                cumulative = 0
+                for bound, count in zip(self.buckets, series):
+                    cumulative += count
+                    lines.append(f'{self.name}_bucket{{{label},le="{bound}"}} {cumulative}')
+                lines.append(f'{self.name}_bucket{{{label},le="+Inf"}} {series[-1]}')
+                lines.append(f"{self.name}_sum{{{label}}} {series[-2]}")
+                lines.append(f"{self.name}_count{{{label}}} {series[-1]}")
+        return lines
+
+
+class Gauge:
+    """مقدار لحظه‌ای که هنگام خواندن /metrics از تابع value گرفته می‌شود"""
+
+    def __init__(self, name, help_text, value):
+        self.name = name
+        self.help_text = help_text
+        self.value = value
+
+    def render(self):
+        return [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} gauge", f"{self.name} {self.value()}"]
+
+
+handler_duration = Histogram("bot_handler_duration_seconds", "Handler execution time", "handler")
+handler_errors = Counter("bot_handler_errors_total", "Errors raised or reported by handlers", "handler")
+api_duration = Histogram("bot_api_request_duration_seconds", "Bot API call time", "method")
+api_errors = Counter("bot_api_errors_total", "Failed Bot API calls", "method")
+forms_filtered = Counter("bot_forms_filtered_total", "Forms rate limited, merged or flagged before review", "reason")
+callbacks_skipped = Counter("bot_callbacks_skipped_total", "Redelivered, repeated or concurrent button presses",
+                            "reason")
+registry = [handler_duration, handler_errors, api_duration, api_errors, forms_filtered, callbacks_skipped]
+
+
+# در میزبانی چند بات هر بات gauge خودش را ثبت می‌کند و مقدار آن‌ها با هم جمع می‌شود
+def add_gauge(name, help_text, value):
+    for metric in registry:
+        if isinstance(metric, Gauge) and metric.name == name:
+            previous = metric.value
+            metric.value = lambda: previous() + value()
+            return
+    registry.append(Gauge(name, help_text, value))
+
+
+def render():
+    lines = []
+    for metric in registry:
+        lines += metric.render()
+    return "\n".join(lines) + "\n"
+
+
+def _chat_id(update):
+    chat = getattr(update, "chat", None)
+    if chat is None and getattr(update, "message", None) is not None:
+        chat = update.message.chat
+    if chat is not None:
+        return chat.id
+    user = getattr(update, "from_user", None)
+    return user.id if user is not None else None
+
+
+# ثبت زمان اجرا و خطاهای هر هندلر در متریک‌ها و لاگ (همراه با chat_id و نام هندلر)
+def instrument(func):
+    name = func.__name__
+
+    @functools.wraps(func)
+    def wrapper(update, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return func(update, *args, **kwargs)
+        except Exception:
+            handler_errors.inc(name)
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            handler_duration.observe(name, elapsed)
+            if handler_logger.isEnabledFor(logging.INFO):
+                latency_ms = round(elapsed * 1000, 3)
+                handler_logger.info(
+                    "%s handled in %s ms", name, latency_ms,
+                    extra={"chat_id": _chat_id(update), "handler": name, "latency_ms": latency_ms},
+                )
+
+    return wrapper
+
+
+# اندازه‌گیری همه درخواست‌های Bot API (به تفکیک متد)
+def instrument_api():
+    make_request = apihelper._make_request
+
+    @functools.wraps(make_request)
+    def timed_request(token, method_name, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return make_request(token, method_name, *args, **kwargs)
+        except Exception:
+            api_errors.inc(method_name)
+            raise
+        finally:
+            api_duration.observe(method_name, time.perf_counter() - start)
+
+    apihelper._make_request = timed_request
+
+
+def start_metrics_server(port, host="127.0.0.1"):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path != "/metrics":
+                self.send_response(404)
+                self.end_headers()
+                return
+            body = render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass  # جلوگیری از چاپ هر درخواست در کنسول
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+    return server
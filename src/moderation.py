@@ -0,0 +1,209 @@
+import logging
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+from media import dump_attachments, load_attachments
+
+logger = logging.getLogger(__name__)
+
+PendingForm = namedtuple("PendingForm", "id chat_id course professors question final_message duplicate_of created_at media")
+
+_COLUMNS = "id, chat_id, course, professors, question, final_message, duplicate_of, created_at, media"
+
+
+def _form(row):
+    return PendingForm(*row[:-1], load_attachments(row[-1]))
+
+
+class ModerationQueue:
+    """
+    صف فرم‌های در انتظار بررسی ادمین (در SQLite) با امکان مرور صفحه‌به‌صفحه،
+    تأیید/رد گروهی و انتشار خلاصه فرم‌های تأیید شده هر درس در یک پست.
+    وضعیت فرم‌ها: pending، approved یا rejected؛ posted برای فرم تأیید شده: 0 منتشر نشده، 2 در حال ارسال
+    (claim شده) و 1 ارسال آن در کانال تأیید شده است. decided_seq ترتیب تصمیم‌های ادمین است
+    تا زمان‌بند انتشار فقط فرم‌های تازه تأیید شده را بخواند.
+    """
+
+    def __init__(self, path="moderation.db"):
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS forms ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, chat_id INTEGER NOT NULL, course TEXT NOT NULL, "
+            "professors TEXT NOT NULL, question TEXT NOT NULL, final_message TEXT NOT NULL, "
+            "status TEXT NOT NULL DEFAULT 'pending', posted INTEGER NOT NULL DEFAULT 0, "
+            "created_at REAL NOT NULL, decided_at REAL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS forms_status ON forms (status, posted, id)")
+        columns = [row[1] for row in self._db.execute("PRAGMA table_info(forms)")]
+        if "media" not in columns:
+            self._db.execute("ALTER TABLE forms ADD COLUMN media TEXT")
+        if "duplicate_of" not in columns:
+            self._db.execute("ALTER TABLE forms ADD COLUMN duplicate_of INTEGER")
+        if "posted_at" not in columns:
+            self._db.execute("ALTER TABLE forms ADD COLUMN posted_at REAL")
+        if "decided_seq" not in columns:
+            self._db.execute("ALTER TABLE forms ADD COLUMN decided_seq INTEGER")
+        self._db.execute("CREATE INDEX IF NOT EXISTS forms_decided ON forms (decided_seq)")
+        self._digest_thread = None
+
+    # duplicate_of: آیدی فرم مشابه قبلی (برای نمایش به ادمین)
+    def add(self, chat_id, course, professors, question, final_message, media=(), duplicate_of=None):
+        with self._lock:
+            cursor = self._db.execute(
+                "INSERT INTO forms (chat_id, course, professors, question, final_message, media, duplicate_of, "
+                "created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (chat_id, course, professors, question, final_message, dump_attachments(media), duplicate_of,
+                 time.time()),
+            )
+            return cursor.lastrowid
+
+    # آخرین فرم‌ها (همه وضعیت‌ها) از قدیمی به جدید، برای ساخت ایندکس سوال‌های تکراری
+    def recent(self, limit):
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT id, course, professors, question FROM forms ORDER BY id DESC LIMIT ?", (limit,)
+            ).fetchall()
+        return rows[::-1]
+
+    # فرم‌های اضافه شده بعد از فرم form_id (شاید توسط پروسه‌های دیگر در حالت sharded)
+    def added_after(self, form_id):
+        with self._lock:
+            return self._db.execute(
+                "SELECT id, course, professors, question FROM forms WHERE id > ? ORDER BY id", (form_id,)
+            ).fetchall()
+
+    # (آیدی کاربر، زمان ارسال) فرم‌هایی که بعد از since ارسال شده‌اند
+    def submitted_since(self, since):
+        with self._lock:
+            return self._db.execute(
+                "SELECT chat_id, created_at FROM forms WHERE created_at > ? ORDER BY created_at", (since,)
+            ).fetchall()
+
+    def status(self, form_id):
+        with self._lock:
+            row = self._db.execute("SELECT status FROM forms WHERE id = ?", (form_id,)).fetchone()
+        return row[0] if row else None
+
+    def count_pending(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM forms WHERE status = 'pending'").fetchone()[0]
+
+    def page(self, offset, size):
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT {_COLUMNS} FROM forms WHERE status = 'pending' ORDER BY id LIMIT ? OFFSET ?",
+                (size, offset),
+            ).fetchall()
+        return [_form(row) for row in rows]
+
+    # تغییر وضعیت فرم‌های در انتظار؛ فقط فرم‌هایی که واقعاً تغییر کردند برگردانده می‌شوند
+    def decide(self, first_id, last_id, status):
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            rows = self._db.execute(
+                f"SELECT {_COLUMNS} FROM forms WHERE status = 'pending' AND id BETWEEN ? AND ? ORDER BY id",
+                (first_id, last_id),
+            ).fetchall()
+            # شماره تصمیم داخل همان تراکنش نوشتن گرفته می‌شود، پس به ترتیب commit صعودی است
+            seq = self._db.execute("SELECT COALESCE(MAX(decided_seq), 0) + 1 FROM forms").fetchone()[0]
+            self._db.execute(
+                "UPDATE forms SET status = ?, decided_at = ?, decided_seq = ? "
+                "WHERE status = 'pending' AND id BETWEEN ? AND ?",
+                (status, time.time(), seq, first_id, last_id),
+            )
+            self._db.execute("COMMIT")
+        return [_form(row) for row in rows]
+
+    def unposted(self):
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT {_COLUMNS} FROM forms WHERE status = 'approved' AND posted = 0 ORDER BY id"
+            ).fetchall()
+        return [_form(row) for row in rows]
+
+    # فرم‌های تأیید شده و منتشر نشده‌ای که بعد از تصمیم شماره since تأیید شده‌اند (since=None یعنی همه)؛
+    # خروجی (فرم‌ها، شماره آخرین تصمیم دیده شده) که since دفعه بعد است
+    def approved_since(self, since=None):
+        with self._lock:
+            if since is None:
+                # اول شماره تصمیم و بعد فرم‌ها، تا فرمی که بین دو پرس‌وجو تأیید شود دفعه بعد هم خوانده شود
+                since = self._db.execute("SELECT COALESCE(MAX(decided_seq), 0) FROM forms").fetchone()[0]
+                rows = self._db.execute(
+                    f"SELECT {_COLUMNS} FROM forms WHERE status = 'approved' AND posted = 0 ORDER BY id"
+                ).fetchall()
+                return [_form(row) for row in rows], since
+            rows = self._db.execute(
+                f"SELECT decided_seq, status, posted, {_COLUMNS} FROM forms WHERE decided_seq > ? ORDER BY decided_seq",
+                (since,),
+            ).fetchall()
+        forms = [_form(row[3:]) for row in rows if row[1] == "approved" and row[2] == 0]
+        return forms, max((row[0] for row in rows), default=since)
+
+    # درس و اساتید همه فرم‌های تأیید شده (برای ساخت فهرست پیشنهادها)
+    def approved_posts(self):
+        with self._lock:
+            return self._db.execute("SELECT course, professors FROM forms WHERE status = 'approved'").fetchall()
+
+    # ثبت ارسال موفق فرم‌ها در کانال
+    def mark_posted(self, form_ids, now=None):
+        now = time.time() if now is None else now
+        with self._lock:
+            self._db.executemany("UPDATE forms SET posted = 1, posted_at = ? WHERE id = ?",
+                                 [(now, form_id) for form_id in form_ids])
+
+    # علامت‌گذاری فرم به عنوان در حال ارسال؛ False یعنی فرم قبلاً (شاید توسط پروسه دیگری) برداشته شده است.
+    # فرم فقط بعد از ارسال موفق با mark_posted منتشر شده حساب می‌شود
+    def claim(self, form_id):
+        with self._lock:
+            cursor = self._db.execute(
+                "UPDATE forms SET posted = 2 WHERE id = ? AND status = 'approved' AND posted = 0", (form_id,)
+            )
+            return cursor.rowcount == 1
+
+    # برگرداندن فرمی که ارسالش ناموفق بود به صف انتشار؛ شماره تصمیم تازه می‌گیرد تا زمان‌بندها
+    # (approved_since) دوباره آن را بخوانند
+    def release(self, form_id):
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            seq = self._db.execute("SELECT COALESCE(MAX(decided_seq), 0) + 1 FROM forms").fetchone()[0]
+            released = self._db.execute(
+                "UPDATE forms SET posted = 0, decided_seq = ? WHERE id = ? AND posted = 2", (seq, form_id)
+            ).rowcount
+            self._db.execute("COMMIT")
+            return released == 1
+
+    # فرم‌هایی که ارسالشان قبل از توقف قبلی بات تأیید نشد دوباره به صف انتشار برمی‌گردند
+    def release_unsent(self):
+        with self._lock:
+            return self._db.execute("UPDATE forms SET posted = 0 WHERE posted = 2").rowcount
+
+    # زمان آخرین پست هر درس
+    def last_posted(self):
+        with self._lock:
+            return self._db.execute(
+                "SELECT course, MAX(posted_at) FROM forms WHERE posted_at IS NOT NULL GROUP BY course"
+            ).fetchall()
+
+    # انتشار دوره‌ای فرم‌های تأیید شده؛ post(course, forms, on_sent) برای هر درس یک بار صدا زده می‌شود
+    # و on_sent(form_ids) را بعد از ارسال موفق هر پست برای فرم‌های همان پست صدا می‌زند
+    def start_digest(self, interval, post):
+        def loop():
+            while True:
+                time.sleep(interval)
+                try:
+                    by_course = {}
+                    for form in self.unposted():
+                        if self.claim(form.id):
+                            by_course.setdefault(form.course, []).append(form)
+                    for course, forms in by_course.items():
+                        post(course, forms, self.mark_posted)
+                except Exception as e:
+                    logger.error("❌ خطا در انتشار خلاصه فرم‌ها: %s", e)
+
+        if self._digest_thread is None:
+            self._digest_thread = threading.Thread(target=loop, name="digest", daemon=True)
+            self._digest_thread.start()
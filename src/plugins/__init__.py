@@ -0,0 +1,5 @@
+"""
+پلاگین‌های بات. هر ماژول یک تابع setup(app) دارد که هندلرهای خود را روی BotApp ثبت می‌کند
+و در صورت نیاز REQUIRES (نام پلاگین‌هایی که باید قبل از آن بارگذاری شوند).
+پلاگین‌ها فقط وقتی در تنظیمات PLUGINS فعال باشند import می‌شوند.
+"""
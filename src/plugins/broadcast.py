@@ -0,0 +1,114 @@
+"""ثبت کاربران بات و دستور /broadcast ادمین برای ارسال پیام به همه کاربران"""
+from telebot import apihelper, util
+from telebot.types import InlineKeyboardMarkup, InlineKeyboardButton
+import metrics
+from users import Broadcaster, UserRegistry
+
+STATUS_TITLES = {"draft": "پیش‌نویس", "running": "در حال ارسال", "done": "پایان یافت", "cancelled": "متوقف شد"}
+
+
+def broadcast_markup(broadcast):
+    markup = InlineKeyboardMarkup()
+    if broadcast.status == "draft":
+        markup.row(
+            InlineKeyboardButton("📣 ارسال", callback_data=f"broadcast_send_{broadcast.id}"),
+            InlineKeyboardButton("❌ لغو", callback_data=f"broadcast_stop_{broadcast.id}")
+        )
+    elif broadcast.status == "running":
+        markup.add(InlineKeyboardButton("⏹ توقف", callback_data=f"broadcast_stop_{broadcast.id}"))
+    return markup
+
+
+def format_broadcast(broadcast):
+    lines = [f"📣 پیام همگانی #{broadcast.id} - {STATUS_TITLES[broadcast.status]}"]
+    if broadcast.status == "draft":
+        lines.append(f"👥 گیرندگان: {broadcast.total}")
+    else:
+        done = broadcast.sent + broadcast.blocked + broadcast.failed
+        lines.append(f"✅ ارسال شده: {broadcast.sent} از {broadcast.total} "
+                     f"({done * 100 // (broadcast.total or 1)}٪ انجام شده)")
+        lines.append(f"🚫 بات را بلاک کرده‌اند: {broadcast.blocked}   ❌ خطا: {broadcast.failed}")
+    lines += ["", broadcast.text]
+    return "\n".join(lines)[:4096]
+
+
+def setup(app):
+    app.require_admin("broadcast")
+    bot = app.bot
+
+    users = app.users = UserRegistry(app.config.get("USERS_DB_PATH", app.data_path("users.db")))
+    metrics.add_gauge("bot_users", "Users who have not blocked the bot", users.count)
+
+    # ثبت هر چت خصوصی که پیامی فرستاده یا دکمه‌ای را زده است
+    def remember(update):
+        message = update.message or (update.callback_query and update.callback_query.message)
+        if message and message.chat.type == "private":
+            try:
+                users.touch(message.chat.id)
+            except Exception as e:
+                app.handle_error(e, handler="remember")
+
+    app.on("update", remember)
+
+    # به‌روزرسانی پیام پیشرفت در چت ادمین
+    def report(broadcast):
+        if broadcast.message_id is None:
+            return
+        try:
+            bot.edit_message_text(format_broadcast(broadcast), app.admin_chat_id, broadcast.message_id,
+                                  reply_markup=broadcast_markup(broadcast))
+        except apihelper.ApiTelegramException as e:
+            if "message is not modified" not in e.description:
+                app.handle_error(e, handler="report")
+
+    broadcaster = Broadcaster(
+        users, lambda chat_id, text: bot.send_message(chat_id, text),
+        rate=app.config.get_float("BROADCAST_RATE", 25),  # حداکثر پیام همگانی در ثانیه (سقف تلگرام حدود 30)
+        workers=app.config.get_int("BROADCAST_WORKERS", 8),
+        batch_size=app.config.get_int("BROADCAST_BATCH", 200),  # تعداد کاربران بین دو ذخیره پیشرفت
+        limiter=app.outbox.global_bucket.try_acquire,  # سهم مشترک با بقیه پیام‌های بات از سقف سراسری
+        on_progress=report,
+        progress_interval=app.config.get_float("BROADCAST_PROGRESS_INTERVAL", 30),
+    )
+
+    # ارسال فقط در پروسه اصلی؛ پیام‌های نیمه‌کاره قبل از ری‌استارت از همان‌جا ادامه پیدا می‌کنند
+    @app.job
+    def start_broadcaster():
+        if app.shard_index is None:
+            broadcaster.start()
+
+    # دستور مخصوص ادمین: /broadcast متن پیام
+    @app.menu.command("broadcast")
+    def create_broadcast(message):
+        if not app.is_admin(message.chat.id):
+            return
+        try:
+            text = util.extract_arguments(message.text).strip()
+            if not text:
+                running = users.running()
+                lines = ["برای ارسال پیام به همه کاربران بنویسید:\n/broadcast متن پیام",
+                         f"👥 کاربران: {users.count()}"]
+                lines += [f"📣 #{broadcast.id}: {broadcast.sent} از {broadcast.total}" for broadcast in running]
+                app.send_message(message.chat.id, "\n".join(lines))
+                return
+            broadcast = users.get_broadcast(users.create_broadcast(text))._replace(total=users.count())
+            app.send_message(
+                message.chat.id, format_broadcast(broadcast), reply_markup=broadcast_markup(broadcast),
+                on_sent=lambda sent: users.set_message_id(broadcast.id, sent.message_id), parse_mode=None,
+            )
+        except Exception as e:
+            app.handle_error(e, message, handler="create_broadcast")
+
+    @app.callback("broadcast", key=lambda call, parts: ("broadcast", int(parts[2])))
+    def handle_broadcast_callback(call, parts):
+        if not app.is_admin(call.message.chat.id):
+            return
+        action, broadcast_id = parts[1], int(parts[2])
+        if action == "send":
+            if not users.start_broadcast(broadcast_id):
+                return  # قبلاً شروع یا لغو شده است
+            users.set_message_id(broadcast_id, call.message.message_id)
+            broadcaster.notify()
+        else:
+            users.set_status(broadcast_id, "cancelled", ("draft", "running"))
+        report(users.get_broadcast(broadcast_id))
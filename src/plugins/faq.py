@@ -0,0 +1,52 @@
+"""دکمه سوالات متداول: جواب خودکار سوال کاربر از فهرست سوال و جواب‌ها (FAQ_PATH)"""
+import logging
+import os
+import metrics
+from faq_index import FaqIndex
+
+logger = logging.getLogger(__name__)
+
+
+def format_answer(match):
+    return f"❔ {match.entry.question}\n\n💬 {match.entry.answer}"
+
+
+def setup(app):
+    bot = app.bot
+
+    # فایل JSON به شکل [{"question": "...", "answer": "..."}]؛ ایندکس در FAQ_INDEX_PATH ذخیره می‌شود
+    path = app.config.get("FAQ_PATH", app.data_path("faq.json"))
+    if os.path.exists(path):
+        app.faq = FaqIndex.from_file(path, min_score=app.config.get_float("FAQ_MIN_SCORE", 0.4),
+                                     cache_path=app.config.get("FAQ_INDEX_PATH", app.data_path("faq.idx")))
+    else:
+        logger.info("فایل سوالات متداول %s وجود ندارد", path)
+
+    @app.menu.button("❓ سوالات متداول")
+    @app.menu.command("faq", "سوالات متداول")
+    def show_faq(message):
+        try:
+            if app.faq is None or not len(app.faq):
+                app.send_message(message.chat.id, "هنوز سوال متداولی ثبت نشده است.")
+                return
+            app.send_message(message.chat.id, "سوال خود را بنویسید تا در سوالات متداول جستجو شود:")
+            bot.register_next_step_handler(message, answer_question)
+        except Exception as e:
+            app.handle_error(e, message, handler="show_faq")
+
+    @app.step
+    @metrics.instrument
+    def answer_question(message):
+        try:
+            if not message.text:
+                app.send_message(message.chat.id, "لطفاً سوال خود را به صورت متن بنویسید:")
+                bot.register_next_step_handler(message, answer_question)
+                return
+            match = app.faq.best(message.text)
+            if match is None:
+                app.send_message(message.chat.id, "جوابی در سوالات متداول پیدا نشد. می‌توانید سوال خود را از "
+                                                  "بخش اساتید یا پشتیبانی بپرسید.")
+            else:
+                app.send_message(message.chat.id, format_answer(match), parse_mode=None)
+        except Exception as e:
+            app.handle_error(e, message, handler="answer_question")
@@ -0,0 +1,26 @@
+"""بازی ساده حدس عدد"""
+import metrics
+
+
+def setup(app):
+    bot = app.bot
+
+    @app.menu.button("🎮 بازی")
+    @app.menu.command("game", "شروع یک بازی ساده")
+    def start_game(message):
+        try:
+            app.send_message(message.chat.id, "به بازی خوش آمدید! عددی بین 1 تا 10 حدس بزنید.")
+            bot.register_next_step_handler(message, guess_number)
+        except Exception as e:
+            app.handle_error(e, message, handler="start_game")
+
+    @app.step
+    @metrics.instrument
+    def guess_number(message):
+        try:
+            if message.text == "5":
+                app.send_message(message.chat.id, "آفرین! درست حدس زدید.")
+            else:
+                app.send_message(message.chat.id, "متاسفانه اشتباه حدس زدید. دوباره تلاش کنید.")
+        except Exception as e:
+            app.handle_error(e, message, handler="guess_number")
@@ -0,0 +1,58 @@
+"""پیش‌نمایش فرم برای خود کاربر و ارسال مستقیم به کانال بعد از تأیید او (بدون بررسی ادمین)"""
+from telebot import apihelper
+from telebot.types import InlineKeyboardMarkup, InlineKeyboardButton
+import logging
+from media import send_post
+from plugins.professors import split_professors
+
+REQUIRES = ("professors",)
+
+logger = logging.getLogger(__name__)
+
+
+def setup(app):
+    user_data = app.forms
+
+    # ارسال پیام برای تأیید (بدون استفاده از Markdown)
+    def submit_form(message, course, professors, question, final_message, media=()):
+        if media:
+            send_post(app.outbox, message.chat.id, None, app.files.resolve(media))
+        markup = InlineKeyboardMarkup()
+        markup.add(
+            InlineKeyboardButton("✅ تایید", callback_data="confirm"),
+            InlineKeyboardButton("❌ لغو", callback_data="cancel")
+        )
+        app.send_message(message.chat.id, "پیام شما به این شکل خواهد بود:\n\n" + final_message,
+                         reply_markup=markup, parse_mode=None)
+
+    app.submit_form = submit_form
+
+    # هر پیش‌نمایش فقط یک بار تأیید یا لغو می‌شود (دوبار زدن دکمه پست تکراری نمی‌سازد)
+    @app.callback("confirm", "cancel", key=lambda call, parts: ("preview", call.message.chat.id, call.message.message_id))
+    def handle_preview_callback(call, parts):
+        chat_id = call.message.chat.id
+        try:
+            # بررسی وجود اطلاعات کاربر
+            form = user_data.get(chat_id)
+            if form is None or form.final_message is None:
+                app.send_message(chat_id, "⛔ مشکلی در پردازش پیام شما پیش آمد. لطفاً دوباره تلاش کنید.")
+                return
+            # حذف دکمه‌ها از پیش‌نمایش تا دوباره زده نشوند
+            app.bot.edit_message_reply_markup(chat_id, call.message.message_id, reply_markup=None)
+            if parts[0] == "confirm":
+                # ارسال پیام به کانال (بدون استفاده از Markdown)
+                send_post(app.outbox, app.channel_id, form.final_message, app.files.resolve(form.media))
+                course = form.course.replace(' ', '_')
+                professors = split_professors(form.professor)
+                app.emit("approved", course, professors)
+                app.emit("published", course, professors, form.question)
+                app.send_message(chat_id, "✅ پیام شما با موفقیت به کانال ارسال شد!")
+            else:
+                app.send_message(chat_id, "❌ ارسال پیام لغو شد.")
+            app.main_menu(chat_id)
+
+            # پاک کردن اطلاعات کاربر
+            user_data.pop(chat_id)
+        except apihelper.ApiTelegramException as e:
+            logger.error("❌ Telegram API Error: %s", e)
+            app.send_message(chat_id, "⛔ مشکلی در ارتباط با Telegram API پیش آمد.")
@@ -0,0 +1,215 @@
+"""فرم سوال درباره اساتید (درس -> استاد -> سوال) با پیشنهاد خودکار نام درس و استاد و پیوست عکس/فایل"""
+from telebot.types import ReplyKeyboardMarkup, KeyboardButton, ReplyKeyboardRemove
+from telebot.types import InlineQueryResultArticle, InputTextMessageContent
+from telebot.types import InlineKeyboardMarkup, InlineKeyboardButton
+from collections import OrderedDict
+import metrics
+from autocomplete import CatalogIndex
+from form_store import FormState
+from media import AlbumCollector, FileCache, extract_attachment
+
+
+# جدا کردن اسامی اساتید با خط جدید
+def split_professors(professor):
+    return professor.replace("،", "\n").replace("/", "\n").replace(",", "\n")
+
+
+# کیبورد پیشنهاد نام‌ها در مراحل فرم
+def suggestion_keyboard(names):
+    if not names:
+        return None
+    markup = ReplyKeyboardMarkup(resize_keyboard=True, one_time_keyboard=True, row_width=2)
+    markup.add(*[KeyboardButton(name) for name in names])
+    return markup
+
+
+def setup(app):
+    bot = app.bot
+    user_data = app.forms
+
+    # فهرست درس‌ها و اساتید پست‌های تأیید شده برای پیشنهاد خودکار
+    catalog = app.catalog = CatalogIndex()
+    app.on("approved", catalog.add_post)
+
+    # file_id پیوست‌ها (و در صورت تنظیم MEDIA_DIR، نسخه محلی فایل‌ها)
+    files = app.files = FileCache(app.config.get("MEDIA_DB_PATH", app.data_path("media.db")), app.token,
+                                  app.config.get("MEDIA_DIR") or None)
+    # پیام‌های آلبوم جدا جدا می‌رسند؛ بعد از ALBUM_DELAY ثانیه سکوت، فرم با همه پیوست‌ها کامل می‌شود
+    albums = AlbumCollector(lambda messages: finish_form(messages[0], messages),
+                            app.config.get_float("ALBUM_DELAY", 1.0))
+    # سوال‌هایی که جوابشان در سوالات متداول پیشنهاد شده و منتظر تصمیم کاربر هستند (چت -> پیام)
+    suggested = OrderedDict()
+    max_suggested = app.config.get_int("FAQ_PENDING_MAX", 10000)
+
+    @app.menu.button("👨‍🏫 اساتید")
+    @app.menu.command("professors", "لیست اساتید")
+    def show_professors(message):
+        app.send_message(message.chat.id, "شما گزینه 'اساتید' را انتخاب کردید.")
+        start_ask_about_professors(message)
+
+    # پیشنهاد درس و استاد در حالت اینلاین (@bot نام درس)
+    @bot.inline_handler(func=lambda query: True)
+    @metrics.instrument
+    def inline_suggestions(query):
+        try:
+            names = catalog.courses.suggest(query.query, limit=10) + catalog.professors.suggest(query.query, limit=10)
+            results = [
+                InlineQueryResultArticle(str(i), name, InputTextMessageContent(name))
+                for i, name in enumerate(dict.fromkeys(names))
+            ]
+            bot.answer_inline_query(query.id, results, cache_time=60)
+        except Exception as e:
+            app.handle_error(e, handler="inline_suggestions")
+
+    # بقیه عکس‌ها و فایل‌های آلبومی که اولین پیام آن به مرحله سوال رسیده است
+    @bot.message_handler(content_types=["photo", "document"], func=lambda message: message.media_group_id)
+    def album_part(message):
+        albums.add(message)
+
+    # پیام غیر متنی در مراحل درس و استاد؛ همان مرحله دوباره منتظر می‌ماند
+    def require_text(message, step):
+        if message.text:
+            return False
+        app.send_message(message.chat.id, "لطفاً پاسخ را به صورت متن بنویسید:")
+        bot.register_next_step_handler(message, step)
+        return True
+
+    # فرم کاربر در مراحل بعدی؛ اگر منقضی شده باشد (FORM_TTL یا سقف FORM_MAX_ENTRIES) به کاربر گفته می‌شود
+    # و فرم از اول شروع می‌شود. خروجی None یعنی هندلر مرحله نباید ادامه دهد.
+    def current_form(message):
+        form = user_data.get(message.chat.id)
+        if form is None:
+            app.send_message(message.chat.id, "⌛ فرم شما منقضی شده است، لطفاً دوباره از اول شروع کنید.")
+            start_ask_about_professors(message)
+        return form
+
+    # شروع پر کردن فرم
+    def start_ask_about_professors(message):
+        try:
+            user_data.save(message.chat.id, FormState())
+            app.emit("form_step", "started", message.chat.id, None, None)
+            app.send_message(message.chat.id, "لطفاً نام درس را وارد کنید:",
+                             reply_markup=suggestion_keyboard(catalog.courses.suggest("")))
+            bot.register_next_step_handler(message, get_course)
+        except Exception as e:
+            app.handle_error(e, message, handler="start_ask_about_professors")
+
+    @app.step
+    @metrics.instrument
+    def get_course(message):
+        try:
+            if require_text(message, get_course):
+                return
+            form = current_form(message)
+            if form is None:
+                return
+            form.course = catalog.courses.canonical(message.text)
+            user_data.save(message.chat.id, form)
+            app.emit("form_step", "course", message.chat.id, form.course, None)
+            app.send_message(message.chat.id, "اسم استاد را وارد کنید:",
+                             reply_markup=suggestion_keyboard(catalog.professors_for(form.course)))
+            bot.register_next_step_handler(message, get_professor)
+        except Exception as e:
+            app.handle_error(e, message, handler="get_course")
+
+    @app.step
+    @metrics.instrument
+    def get_professor(message):
+        try:
+            if require_text(message, get_professor):
+                return
+            form = current_form(message)
+            if form is None:
+                return
+            form.professor = catalog.professors.canonical(message.text)
+            user_data.save(message.chat.id, form)
+            app.emit("form_step", "professor", message.chat.id, form.course, form.professor)
+            app.send_message(message.chat.id, "سوال خود را بنویسید:", reply_markup=ReplyKeyboardRemove())
+            bot.register_next_step_handler(message, get_question)
+        except Exception as e:
+            app.handle_error(e, message, handler="get_professor")
+
+    @app.step
+    @metrics.instrument
+    def get_question(message):
+        try:
+            if current_form(message) is None:
+                return
+            if message.media_group_id:
+                albums.start(message)
+            elif message.text or extract_attachment(message):
+                if not suggest_answer(message):
+                    finish_form(message, [message])
+            else:
+                app.send_message(message.chat.id, "لطفاً سوال خود را به صورت متن، عکس یا فایل بفرستید:")
+                bot.register_next_step_handler(message, get_question)
+        except Exception as e:
+            app.handle_error(e, message, handler="get_question")
+
+    # اگر سوال قبلاً در سوالات متداول جواب داده شده، قبل از ارسال فرم جواب به کاربر پیشنهاد می‌شود
+    def suggest_answer(message):
+        text = message.text or message.caption
+        match = app.faq.best(text) if app.faq is not None and text else None
+        if match is None:
+            return False
+        suggested[message.chat.id] = message
+        suggested.move_to_end(message.chat.id)
+        if len(suggested) > max_suggested:
+            suggested.popitem(last=False)
+        markup = InlineKeyboardMarkup()
+        markup.row(
+            InlineKeyboardButton("✅ جوابم را گرفتم", callback_data="faqform_done"),
+            InlineKeyboardButton("📨 سوالم ارسال شود", callback_data="faqform_send")
+        )
+        app.send_message(message.chat.id, "💡 این سوال قبلاً در سوالات متداول جواب داده شده است:\n\n"
+                         f"❔ {match.entry.question}\n\n💬 {match.entry.answer}", reply_markup=markup, parse_mode=None)
+        return True
+
+    @app.callback("faqform", key=lambda call, parts: ("faqform", call.message.chat.id, call.message.message_id))
+    def handle_suggestion_callback(call, parts):
+        chat_id = call.message.chat.id
+        bot.edit_message_reply_markup(chat_id, call.message.message_id, reply_markup=None)
+        message = suggested.pop(chat_id, None)
+        form = user_data.get(chat_id)
+        if message is None or form is None:
+            app.send_message(chat_id, "⛔ این فرم دیگر در دسترس نیست. لطفاً دوباره تلاش کنید.")
+        elif parts[1] == "send":
+            finish_form(message, [message])
+        else:
+            user_data.pop(chat_id)
+            app.emit("form_step", "answered", chat_id, form.course, form.professor)
+            app.main_menu(chat_id)
+
+    # ساخت متن نهایی از سوال (متن یا کپشن) و پیوست‌های پیام‌ها
+    def finish_form(message, messages):
+        try:
+            form = current_form(message)
+            if form is None:
+                return
+            form.question = next((m.text or m.caption for m in messages if m.text or m.caption), "")
+            attachments = (extract_attachment(m) for m in messages)
+            form.media = list({item.unique_id: item for item in attachments if item}.values())
+            files.remember(form.media)
+            course = form.course
+            professor = form.professor
+            question = form.question
+
+            professors_list = split_professors(professor)
+            hashtag = course.replace(' ', '_')
+
+            # ساخت متن نهایی با فرمت مورد نظر
+            final_message = (
+                f"درس: #{hashtag}\n\n"
+                f"🚬استاد: {professors_list}\n\n"
+                f"❔سوال: {question}\n\n"
+                f"⚡️ به ما بپیوندید ↙️\n\n"
+                f"@dars_ba_ki_br_darm"
+            )
+            form.final_message = final_message
+            user_data.save(message.chat.id, form)
+            app.emit("form_step", "submitted", message.chat.id, course, professor)
+
+            # تأیید ادمین یا پیش‌نمایش برای خود کاربر، بسته به پلاگین فعال
+            app.submit_form(message, hashtag, professors_list, question, final_message, form.media)
+        except Exception as e:
+            app.handle_error(e, message, handler="finish_form")
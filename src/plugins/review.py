@@ -0,0 +1,233 @@
+"""
+تأیید فرم‌ها توسط ادمین: محدودیت ارسال و تشخیص تکراری، صف بررسی، صفحه‌بندی، تأیید/رد گروهی
+و انتشار زمان‌بندی شده یا خلاصه هر درس
+"""
+import math
+import threading
+import time
+from telebot.types import InlineKeyboardMarkup, InlineKeyboardButton
+import metrics
+from autocomplete import normalize
+from dedupe import DuplicateIndex, RateLimiter
+from media import send_post
+from moderation import ModerationQueue
+from publisher import PublishScheduler, parse_quiet_hours
+
+REQUIRES = ("professors",)
+
+
+def setup(app):
+    app.require_admin("review")
+    bot = app.bot
+    page_size = app.config.get_int("REVIEW_PAGE_SIZE", 5)  # تعداد فرم‌ها در هر صفحه بررسی ادمین
+    digest_interval = app.config.get_int("DIGEST_INTERVAL", 0)  # فاصله انتشار خلاصه هر درس (ثانیه)، 0 یعنی انتشار فوری
+
+    # صف فرم‌های در انتظار تأیید ادمین
+    moderation = app.moderation = ModerationQueue(app.config.get("MODERATION_DB_PATH", app.data_path("moderation.db")))
+    for course, professors in moderation.approved_posts():
+        app.emit("approved", course, professors)
+    metrics.add_gauge("bot_moderation_pending", "Forms waiting for admin review", moderation.count_pending)
+
+    # مرحله قبل از صف بررسی: محدودیت تعداد فرم هر کاربر و تشخیص سوال‌های تقریباً یکسان همان درس و استاد.
+    # در حالت sharded فرم‌های هر کاربر همیشه به یک کارگر می‌رسند، پس محدودیت در حافظه همان کارگر کافی است؛
+    # تاریخچه آن از دیتابیس خوانده می‌شود تا ری‌استارت آن را صفر نکند
+    limiter = RateLimiter(app.config.get_int("FORM_RATE_LIMIT", 3), app.config.get_int("FORM_RATE_WINDOW", 600))
+    for chat_id, created_at in moderation.submitted_since(time.time() - limiter.window):
+        limiter.record(chat_id, created_at)
+    duplicates = DuplicateIndex(app.config.get_int("DEDUPE_CAPACITY", 100000),
+                                app.config.get_float("DEDUPE_THRESHOLD", 0.7))
+    last_indexed = 0  # آیدی آخرین فرم ایندکس شده
+    for last_indexed, course, professors, question in moderation.recent(duplicates.capacity):
+        duplicates.add(last_indexed, (normalize(course), normalize(professors)), question)
+    index_lock = threading.Lock()
+
+    # اضافه کردن فرم‌های جدید دیتابیس به ایندکس تکراری‌ها، از جمله فرم‌هایی که کارگرهای دیگر حالت sharded
+    # (با همان MODERATION_DB_PATH) ثبت کرده‌اند
+    def index_new_forms():
+        nonlocal last_indexed
+        with index_lock:
+            for last_indexed, course, professors, question in moderation.added_after(last_indexed):
+                duplicates.add(last_indexed, (normalize(course), normalize(professors)), question)
+    # flag: فرم تکراری با علامت به ادمین می‌رسد، merge: فرم تکراری یک فرم در انتظار یا تأیید شده کنار گذاشته می‌شود
+    merge_duplicates = app.config.get("DUPLICATE_ACTION", "flag") == "merge"
+
+    # قرار دادن فرم در صف بررسی ادمین
+    def submit_form(message, course, professors, question, final_message, media=()):
+        chat_id = message.chat.id
+        wait = limiter.retry_after(chat_id)
+        if wait:
+            metrics.forms_filtered.inc("rate_limited")
+            app.forms.pop(chat_id)
+            app.send_message(chat_id, f"⏳ تعداد فرم‌های شما زیاد است. لطفاً {math.ceil(wait / 60)} دقیقه دیگر "
+                                      f"دوباره تلاش کنید.", reply_markup=app.menu.markup())
+            return
+        limiter.record(chat_id)
+
+        scope = (normalize(course), normalize(professors))
+        index_new_forms()
+        duplicate = duplicates.find(scope, question)
+        duplicate_of = duplicate[0] if duplicate else None
+        if duplicate_of and merge_duplicates and moderation.status(duplicate_of) in ("pending", "approved"):
+            metrics.forms_filtered.inc("merged")
+            app.forms.pop(chat_id)
+            app.send_message(chat_id, "🔁 سوال مشابهی درباره همین درس و استاد قبلاً ارسال شده است.",
+                             reply_markup=app.menu.markup())
+            return
+        if duplicate_of:
+            metrics.forms_filtered.inc("flagged")
+
+        form_id = moderation.add(chat_id, course, professors, question, final_message, media, duplicate_of)
+        index_new_forms()
+        if media:
+            send_post(app.outbox, app.admin_chat_id, f"📎 پیوست‌های فرم {form_id}", app.files.resolve(media))
+        app.forms.pop(chat_id)
+        app.send_message(chat_id, "فرم شما به ادمین ارسال شد. منتظر تأیید باشید.",
+                         reply_markup=app.menu.markup())
+
+        # اطلاع به ادمین فقط برای اولین فرم صف و هر صفحه کامل، نه برای تک‌تک فرم‌ها؛ اطلاعیه خود صفحه اول بررسی
+        # با دکمه‌هاست تا ادمین بدون درخواست /review (و یک پیام اضافه) تصمیم بگیرد
+        pending = moderation.count_pending()
+        if pending == 1 or pending % page_size == 0:
+            text, markup = review_page(0)
+            app.send_message(app.admin_chat_id, text, reply_markup=markup)
+
+    app.submit_form = submit_form
+
+    # دستور مخصوص ادمین (در راهنما نمایش داده نمی‌شود)
+    @app.menu.command("review")
+    def review(message):
+        if not app.is_admin(message.chat.id):
+            return
+        text, markup = review_page(0)
+        app.send_message(message.chat.id, text, reply_markup=markup)
+
+    # ساخت صفحه بررسی فرم‌ها برای ادمین
+    def review_page(offset):
+        forms = moderation.page(offset, page_size)
+        if not forms and offset > 0:
+            offset = max(0, offset - page_size)
+            forms = moderation.page(offset, page_size)
+        if not forms:
+            return "✅ فرمی در صف بررسی نیست.", None
+
+        total = moderation.count_pending()
+        lines = [f"📋 فرم‌های در انتظار بررسی ({offset + 1} تا {offset + len(forms)} از {total}):"]
+        markup = InlineKeyboardMarkup()
+        for form in forms:
+            notes = f"\n📎 {len(form.media)} پیوست" if form.media else ""
+            if form.duplicate_of:
+                notes += f"\n⚠️ مشابه فرم {form.duplicate_of}"
+            lines.append(f"🔹 فرم {form.id}\nدرس: #{form.course}\nاستاد: {form.professors}\nسوال: {form.question[:300]}"
+                         f"{notes}")
+            markup.row(
+                InlineKeyboardButton(f"✅ {form.id}", callback_data=f"confirm_{form.id}_{offset}"),
+                InlineKeyboardButton(f"❌ {form.id}", callback_data=f"reject_{form.id}_{offset}")
+            )
+        first_id, last_id = forms[0].id, forms[-1].id
+        markup.row(
+            InlineKeyboardButton("✅ تایید همه", callback_data=f"approveall_{first_id}_{last_id}_{offset}"),
+            InlineKeyboardButton("❌ رد همه", callback_data=f"rejectall_{first_id}_{last_id}_{offset}")
+        )
+        navigation = []
+        if offset > 0:
+            navigation.append(InlineKeyboardButton("▶️ قبلی", callback_data=f"page_{max(0, offset - page_size)}"))
+        if offset + len(forms) < total:
+            navigation.append(InlineKeyboardButton("بعدی ◀️", callback_data=f"page_{offset + page_size}"))
+        if navigation:
+            markup.row(*navigation)
+        return "\n\n".join(lines), markup
+
+    # انتشار یک فرم تأیید شده در کانال (توسط زمان‌بند)؛ on_sent بعد از ارسال موفق فرم را منتشر شده ثبت می‌کند
+    # و on_failed فرم را برای انتشار دوباره آزاد می‌کند
+    def publish(form, on_sent, on_failed):
+        def sent(result):
+            on_sent(result)
+            app.emit("published", form.course, form.professors, form.question)
+
+        send_post(app.outbox, app.channel_id, form.final_message, app.files.resolve(form.media), on_sent=sent,
+                  on_failed=on_failed)
+
+    # بدون DIGEST_INTERVAL، فرم‌های تأیید شده با سقف POSTS_PER_MINUTE پست در دقیقه
+    # و خارج از ساعت سکوت QUIET_HOURS (مثلاً 23:30-07:00) منتشر می‌شوند
+    scheduler = PublishScheduler(moderation, publish, app.config.get_float("POSTS_PER_MINUTE", 20),
+                                 parse_quiet_hours(app.config.get("QUIET_HOURS", "")))
+
+    # اطلاع به کاربران و بیدار کردن زمان‌بند انتشار
+    def publish_decision(forms, status):
+        for form in forms:
+            app.emit("reviewed", form, status)
+            if status == "approved":
+                app.emit("approved", form.course, form.professors)
+                app.send_message(form.chat_id, "✅ فرم شما تأیید شد و به نوبت در کانال منتشر می‌شود.")
+            else:
+                app.send_message(form.chat_id, "❌ فرم شما رد شد.")
+        if status == "approved" and not digest_interval:
+            scheduler.notify()
+
+    # بعد از ارسال موفق یک پست، فرم‌های آن منتشر شده ثبت می‌شوند
+    def digest_sent(forms, mark_posted):
+        def sent(result):
+            mark_posted([form.id for form in forms])
+            for form in forms:
+                app.emit("published", form.course, form.professors, form.question)
+        return sent
+
+    # انتشار خلاصه فرم‌های تأیید شده یک درس در یک پست (فرم‌های دارای پیوست جداگانه منتشر می‌شوند)
+    def post_digest(course, forms, mark_posted):
+        for form in forms:
+            if form.media:
+                send_post(app.outbox, app.channel_id, form.final_message, app.files.resolve(form.media),
+                          on_sent=digest_sent([form], mark_posted))
+        forms = [form for form in forms if not form.media]
+        if not forms:
+            return
+        footer = "⚡️ به ما بپیوندید ↙️\n\n@dars_ba_ki_br_darm"
+        header = f"درس: #{course}\n\n"
+        body, batch = header, []
+        for form in forms:
+            item = f"🚬استاد: {form.professors}\n❔سوال: {form.question}\n\n➖➖➖\n\n"
+            if len(body) + len(item) + len(footer) > 4096 and batch:
+                app.send_message(app.channel_id, body + footer, digest_sent(batch, mark_posted), parse_mode=None)
+                body, batch = header, []
+            body += item
+            batch.append(form)
+        app.send_message(app.channel_id, body + footer, digest_sent(batch, mark_posted), parse_mode=None)
+
+    # فرم یا بازه فرم‌هایی که دکمه روی آن‌ها عمل می‌کند، تا دو ادمین همزمان روی یک فرم تصمیم نگیرند
+    def review_key(call, parts):
+        if parts[0] in ("confirm", "reject"):
+            return "form", int(parts[1])
+        if parts[0] in ("approveall", "rejectall"):
+            return "forms", int(parts[1]), int(parts[2])
+        return None
+
+    # مدیریت دکمه‌های اینلاین صفحه بررسی (تأیید/رد تکی، گروهی و صفحه‌بندی)
+    @app.callback("confirm", "reject", "approveall", "rejectall", "page", key=review_key)
+    def handle_review_callback(call, parts):
+        action = parts[0]
+        if action in ("confirm", "reject"):
+            form_id, offset = int(parts[1]), int(parts[2])
+            status = "approved" if action == "confirm" else "rejected"
+            publish_decision(moderation.decide(form_id, form_id, status), status)
+        elif action in ("approveall", "rejectall"):
+            first_id, last_id, offset = int(parts[1]), int(parts[2]), int(parts[3])
+            status = "approved" if action == "approveall" else "rejected"
+            publish_decision(moderation.decide(first_id, last_id, status), status)
+        else:
+            offset = int(parts[1])
+
+        # به‌روزرسانی همان پیام بررسی به جای ارسال پیام جدید
+        text, markup = review_page(offset)
+        bot.edit_message_text(text, call.message.chat.id, call.message.message_id, reply_markup=markup)
+
+    # انتشار فقط در پروسه اصلی (نه در کارگرهای حالت sharded)؛ زمان‌بند فرم‌های تأیید شده کارگرها را از دیتابیس می‌خواند
+    @app.job
+    def start_publishing():
+        if app.shard_index is not None:
+            return
+        # فرم‌هایی که قبل از توقف قبلی برداشته شدند ولی ارسالشان تأیید نشد دوباره منتشر می‌شوند
+        moderation.release_unsent()
+        if digest_interval:
+            moderation.start_digest(digest_interval, post_digest)
+        else:
+            scheduler.start()
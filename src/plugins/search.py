@@ -0,0 +1,48 @@
+"""آرشیو قابل جستجوی پست‌های منتشر شده و دستور /search"""
+from telebot import util
+from telebot.types import InlineKeyboardMarkup, InlineKeyboardButton
+from archive import Archive
+
+
+def setup(app):
+    page_size = app.config.get_int("SEARCH_PAGE_SIZE", 5)  # تعداد نتایج در هر صفحه جستجو
+
+    # آرشیو قابل جستجوی پست‌های منتشر شده
+    archive = app.archive = Archive(app.config.get("ARCHIVE_DB_PATH", app.data_path("archive.db")))
+    app.on("published", archive.add)
+
+    # ساخت صفحه نتایج جستجو در آرشیو
+    def search_page(query, offset):
+        total, posts = archive.search(query, offset, page_size)
+        if not posts:
+            return f"🔎 نتایج جستجو برای: {query}\n\nنتیجه‌ای پیدا نشد.", None
+
+        lines = [f"🔎 نتایج جستجو برای: {query}", f"({offset + 1} تا {offset + len(posts)} از {total})"]
+        for post in posts:
+            lines.append(f"🔹 درس: #{post.course}\nاستاد: {post.professors}\nسوال: {post.question[:300]}")
+        navigation = []
+        if offset > 0:
+            navigation.append(InlineKeyboardButton("▶️ قبلی", callback_data=f"search_{max(0, offset - page_size)}"))
+        if offset + len(posts) < total:
+            navigation.append(InlineKeyboardButton("بعدی ◀️", callback_data=f"search_{offset + page_size}"))
+        markup = None
+        if navigation:
+            markup = InlineKeyboardMarkup()
+            markup.row(*navigation)
+        return "\n\n".join(lines), markup
+
+    @app.menu.command("search", "جستجو در سوالات منتشر شده")
+    def search(message):
+        query = util.extract_arguments(message.text).strip()
+        if not query:
+            app.send_message(message.chat.id, "عبارت جستجو را بعد از دستور بنویسید، مثلاً:\n/search ریاضی عمومی")
+            return
+        text, markup = search_page(query, 0)
+        app.send_message(message.chat.id, text, reply_markup=markup)
+
+    @app.callback("search")
+    def handle_search_callback(call, parts):
+        # عبارت جستجو از خط اول همان پیام نتایج خوانده می‌شود
+        query = call.message.text.split("\n")[0].split(":", 1)[1].strip()
+        text, markup = search_page(query, int(parts[1]))
+        app.bot.edit_message_text(text, call.message.chat.id, call.message.message_id, reply_markup=markup)
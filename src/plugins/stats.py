@@ -0,0 +1,60 @@
+"""ثبت رویدادهای فرم و بررسی ادمین و دستور /stats برای ادمین"""
+import time
+from telebot import util
+from analytics import EventLog, percentile
+
+
+def setup(app):
+    app.require_admin("stats")
+
+    # هر پروسه (اصلی یا کارگر sharded) در بخش جداگانه خودش می‌نویسد
+    segment = "main" if app.shard_index is None else f"shard-{app.shard_index}"
+    events = app.events = EventLog(app.config.get("ANALYTICS_DIR", app.data_path("analytics")), segment)
+
+    app.on("form_step", lambda step, chat_id, course, professor: events.record(step, chat_id, course, professor))
+    app.on("reviewed", lambda form, status: events.record(
+        status, form.chat_id, form.course, form.professors, time.time() - form.created_at))
+    app.on("published", lambda course, professors, question: events.record("published", 0, course, professors))
+
+    @app.job
+    def start_events():
+        events.start()
+
+    # دستور مخصوص ادمین: /stats یا /stats 7 (آمار 7 روز اخیر)
+    @app.menu.command("stats")
+    def stats(message):
+        if not app.is_admin(message.chat.id):
+            return
+        try:
+            days = util.extract_arguments(message.text).strip()
+            since = time.time() - float(days) * 86400 if days else 0.0
+            events.flush()
+            app.send_message(message.chat.id, format_stats(events.summary(since), days), parse_mode=None)
+        except ValueError:
+            app.send_message(message.chat.id, "تعداد روز را به عدد بنویسید، مثلاً:\n/stats 7")
+        except Exception as e:
+            app.handle_error(e, message, handler="stats")
+
+
+def format_stats(stats, days):
+    funnel = stats.funnel
+    started = funnel["started"] or 1
+    lines = [f"📊 آمار {days} روز اخیر" if days else "📊 آمار کل", f"👥 کاربران: {stats.users}", "", "🔻 قیف فرم:"]
+    for step, title in (("started", "شروع فرم"), ("course", "نام درس"), ("professor", "نام استاد"),
+                        ("submitted", "ارسال سوال")):
+        lines.append(f"{title}: {funnel[step]} ({funnel[step] * 100 // started}٪)")
+    if funnel["answered"]:
+        lines.append(f"جواب از سوالات متداول: {funnel['answered']}")
+    lines.append(f"رها شده: {max(0, funnel['started'] - funnel['submitted'] - funnel['answered'])}")
+
+    reviewed = funnel["approved"] + funnel["rejected"]
+    lines += ["", f"✅ تأیید: {funnel['approved']}   ❌ رد: {funnel['rejected']}   📢 منتشر شده: {funnel['published']}"]
+    if reviewed:
+        lines.append(f"نسبت تأیید: {funnel['approved'] * 100 // reviewed}٪")
+        lines.append(f"⏱ زمان تا بررسی: میانه {percentile(stats.review_times, 50) / 60:.0f} دقیقه، "
+                     f"صدک 90: {percentile(stats.review_times, 90) / 60:.0f} دقیقه")
+
+    for title, items in (("📚 درس‌های پرسوال:", stats.top_courses), ("👨‍🏫 اساتید پرسوال:", stats.top_professors)):
+        if items:
+            lines += ["", title] + [f"{i}. {name}: {count}" for i, (name, count) in enumerate(items, 1)]
+    return "\n".join(lines)
@@ -0,0 +1,117 @@
+"""تیکت‌های پشتیبانی: ارسال پیام کاربران به ادمین و رساندن جواب (reply) ادمین به کاربر"""
+import time
+from telebot.types import InlineKeyboardMarkup, InlineKeyboardButton
+import metrics
+from send_queue import MAX_MESSAGE_LENGTH
+from tickets import TicketStore
+
+
+def ticket_markup(ticket_id):
+    markup = InlineKeyboardMarkup()
+    markup.row(
+        InlineKeyboardButton("📜 تاریخچه", callback_data=f"ticket_history_{ticket_id}"),
+        InlineKeyboardButton("✔️ بستن", callback_data=f"ticket_close_{ticket_id}")
+    )
+    return markup
+
+
+# کوتاه کردن انتهای متن تا با suffix در یک پیام جا شود (عنوان تیکت در ابتدای متن حفظ می‌شود)
+def clip(text, suffix=""):
+    if len(text) + len(suffix) > MAX_MESSAGE_LENGTH:
+        text = text[:MAX_MESSAGE_LENGTH - len(suffix) - 1] + "…"
+    return text + suffix
+
+
+def setup(app):
+    app.require_admin("support")
+    bot = app.bot
+    page_size = app.config.get_int("TICKETS_PAGE_SIZE", 10)  # تعداد تیکت‌ها در فهرست /tickets
+
+    tickets = app.tickets = TicketStore(app.config.get("TICKETS_DB_PATH", app.data_path("tickets.db")))
+    metrics.add_gauge("bot_support_open_tickets", "Open support tickets", tickets.count_open)
+
+    # ارسال پیام درباره یک تیکت به ادمین و ثبت message_id آن برای مسیر جواب‌ها
+    def send_to_admin(ticket_id, text):
+        app.send_message(app.admin_chat_id, text, on_sent=lambda sent: tickets.add_route(sent.message_id, ticket_id),
+                         reply_markup=ticket_markup(ticket_id), parse_mode=None)
+
+    @app.menu.button("📞 پشتیبانی")
+    @app.menu.command("support", "ارتباط با پشتیبانی")
+    def start_support(message):
+        try:
+            app.send_message(message.chat.id, "برای ارتباط با پشتیبانی، پیام خود را ارسال کنید.")
+            bot.register_next_step_handler(message, forward_to_support)
+        except Exception as e:
+            app.handle_error(e, message, handler="start_support")
+
+    @app.step
+    @metrics.instrument
+    def forward_to_support(message):
+        try:
+            if not message.text:
+                app.send_message(message.chat.id, "لطفاً پیام خود را به صورت متن بنویسید:")
+                bot.register_next_step_handler(message, forward_to_support)
+                return
+            ticket_id, count = tickets.add_message(message.chat.id, message.text)
+            title = f"🎫 تیکت #{ticket_id}" + (f" (پیام {count})" if count > 1 else " (جدید)")
+            send_to_admin(ticket_id, f"{title} از کاربر {message.chat.id}:\n{message.text}\n\n"
+                                     f"↩️ برای جواب، روی همین پیام reply کنید.")
+            app.send_message(message.chat.id, f"پیام شما به پشتیبانی ارسال شد. (تیکت #{ticket_id})")
+        except Exception as e:
+            app.handle_error(e, message, handler="forward_to_support")
+
+    # جواب ادمین به یکی از پیام‌های تیکت
+    @app.reply
+    def route_reply(message):
+        if not app.is_admin(message.chat.id):
+            return False
+        ticket_id = tickets.route(message.reply_to_message.message_id)
+        if ticket_id is None:
+            return False
+        chat_id = tickets.add_reply(ticket_id, message.text)
+        if chat_id is None:
+            app.send_message(message.chat.id, f"⛔ تیکت #{ticket_id} بسته شده است و جواب ارسال نشد.")
+            return True
+        app.send_message(chat_id, f"📩 پاسخ پشتیبانی (تیکت #{ticket_id}):\n{message.text}", parse_mode=None)
+        app.send_message(message.chat.id, f"✅ جواب برای تیکت #{ticket_id} ارسال شد.")
+        return True
+
+    # دستور مخصوص ادمین: فهرست تیکت‌های باز
+    @app.menu.command("tickets")
+    def list_tickets(message):
+        if not app.is_admin(message.chat.id):
+            return
+        rows = tickets.open_tickets(0, page_size)
+        if not rows:
+            app.send_message(message.chat.id, "✅ تیکت بازی وجود ندارد.")
+            return
+        lines = [f"🎫 تیکت‌های باز ({len(rows)} از {tickets.count_open()}):"]
+        markup = InlineKeyboardMarkup()
+        for ticket_id, chat_id, updated_at in rows:
+            minutes = int((time.time() - updated_at) // 60)
+            lines.append(f"#{ticket_id} - کاربر {chat_id} - آخرین پیام {minutes} دقیقه پیش")
+            markup.add(InlineKeyboardButton(f"📜 #{ticket_id}", callback_data=f"ticket_history_{ticket_id}"))
+        app.send_message(message.chat.id, "\n".join(lines), reply_markup=markup)
+
+    @app.callback("ticket", key=lambda call, parts: ("ticket", int(parts[2])) if parts[1] == "close" else None)
+    def handle_ticket_callback(call, parts):
+        if not app.is_admin(call.message.chat.id):
+            return
+        action, ticket_id = parts[1], int(parts[2])
+        if action == "close":
+            chat_id = tickets.close(ticket_id)
+            if chat_id is not None:
+                app.send_message(chat_id, f"✅ تیکت پشتیبانی #{ticket_id} بسته شد.")
+            # همان پیام ادمین به‌روز می‌شود (بدون دکمه‌ها) به جای ارسال پیام جدید
+            bot.edit_message_text(clip(call.message.text, f"\n\n✔️ تیکت #{ticket_id} بسته شد."),
+                                  call.message.chat.id, call.message.message_id, reply_markup=None)
+        else:
+            ticket = tickets.get(ticket_id)
+            if ticket is None:
+                return
+            status = "باز" if ticket.status == "open" else "بسته"
+            lines = [f"📜 تیکت #{ticket.id} - کاربر {ticket.chat_id} - {status}"]
+            for item in ticket.messages:
+                sender = "👤" if item.sender == "user" else "🛟"
+                lines.append(f"{sender} {time.strftime('%m/%d %H:%M', time.localtime(item.created_at))}: {item.text}")
+            send_to_admin(ticket.id, clip("\n".join(lines), "\n\n↩️ برای جواب، روی همین پیام reply کنید."))
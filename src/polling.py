@@ -0,0 +1,224 @@
+import logging
+import os
+import random
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from telebot import apihelper, types
+
+logger = logging.getLogger(__name__)
+
+
+class Backoff:
+    """تأخیر نمایی با jitter کامل بین تلاش‌های ناموفق (تا سقف maximum ثانیه)"""
+
+    def __init__(self, base=1.0, maximum=60.0, factor=2.0):
+        self.base = base
+        self.maximum = maximum
+        self.factor = factor
+        self.attempts = 0
+
+    def next_delay(self):
+        delay = min(self.maximum, self.base * self.factor ** self.attempts)
+        self.attempts += 1
+        return random.uniform(0, delay)
+
+    def reset(self):
+        self.attempts = 0
+
+
+class CircuitBreaker:
+    """
+    بعد از threshold خطای پشت سر هم، مدار باز می‌شود و تا cooldown ثانیه درخواستی ارسال نمی‌شود.
+    بعد از آن یک درخواست آزمایشی فرستاده می‌شود؛ موفقیت مدار را می‌بندد و خطا دوباره بازش می‌کند.
+    """
+
+    def __init__(self, threshold=5, cooldown=30.0):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+
+    @property
+    def is_open(self):
+        return self.opened_at is not None
+
+    # زمان باقی‌مانده تا درخواست آزمایشی بعدی (0 یعنی ارسال آزاد است)
+    def wait_time(self):
+        if self.opened_at is None:
+            return 0.0
+        return max(0.0, self.opened_at + self.cooldown - time.monotonic())
+
+    def record_success(self):
+        if self.opened_at is not None:
+            logger.info("✅ اتصال به تلگرام برقرار شد، مدار بسته شد")
+        self.failures = 0
+        self.opened_at = None
+
+    def record_failure(self):
+        self.failures += 1
+        if self.opened_at is not None or self.failures >= self.threshold:
+            if self.opened_at is None:
+                logger.error("⛔ %s خطای پشت سر هم، توقف درخواست‌ها به مدت %s ثانیه", self.failures, self.cooldown)
+            self.opened_at = time.monotonic()
+
+
+class OffsetCheckpoint:
+    """ذخیره آخرین offset پردازش شده در فایل (با جایگزینی اتمی) تا بعد از ری‌استارت آپدیت‌ها تکرار نشوند"""
+
+    def __init__(self, path="offset.txt"):
+        self.path = path
+
+    def load(self):
+        try:
+            with open(self.path, "r") as file:
+                return int(file.read().strip() or 0) or None
+        except FileNotFoundError:
+            return None
+        except ValueError:
+            logger.error("❌ فایل offset خراب است: %s", self.path)
+            return None
+
+    def save(self, offset):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(prefix=".offset-", dir=directory)
+        try:
+            with os.fdopen(fd, "w") as file:
+                file.write(str(offset))
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+
+class PollingEngine:
+    """
+    دریافت آپدیت‌ها با long polling و پردازش آن‌ها با handle(updates) (لیست آپدیت‌های خام JSON).
+    خطاهای شبکه با backoff نمایی و circuit breaker مدیریت می‌شوند، 429 با retry_after تلگرام،
+    و offset بعد از پردازش هر دسته در checkpoint ذخیره می‌شود تا ری‌استارت آپدیت‌ها را دوباره پردازش نکند
+    (handle باید تا پایان پردازش دسته صبر کند).
+    settle(timeout) قبل از ذخیره offset صدا زده می‌شود تا نتیجه دسته (مرحله کاربران، پیام‌های صف ارسال)
+    ماندگار شود؛ اگر False برگرداند offset این دسته ذخیره نمی‌شود و با دسته بعدی ذخیره خواهد شد.
+    """
+
+    def __init__(self, token, handle, checkpoint=None, poll_timeout=25, limit=100,
+                 backoff=None, breaker=None, allowed_updates=None, settle=None, settle_timeout=10.0):
+        self.token = token
+        self.handle = handle
+        self.checkpoint = checkpoint
+        self.settle = settle
+        self.settle_timeout = settle_timeout
+        self.poll_timeout = poll_timeout  # مدت انتظار هر درخواست getUpdates در سرور تلگرام (ثانیه)
+        self.limit = limit
+        self.backoff = backoff or Backoff()
+        self.breaker = breaker or CircuitBreaker()
+        self.allowed_updates = allowed_updates
+        self.offset = checkpoint.load() if checkpoint else None
+        self.running = False
+
+    def _sleep(self, seconds):
+        end = time.monotonic() + seconds
+        while self.running and time.monotonic() < end:
+            time.sleep(min(0.5, end - time.monotonic()))
+
+    def fetch(self):
+        # timeout داده نمی‌شود تا connect timeout کوتاه بماند؛ read timeout از long_polling_timeout محاسبه می‌شود
+        return apihelper.get_updates(self.token, offset=self.offset, limit=self.limit,
+                                     allowed_updates=self.allowed_updates, long_polling_timeout=self.poll_timeout)
+
+    def poll_once(self):
+        wait = self.breaker.wait_time()
+        if wait:
+            self._sleep(wait)
+            return
+        try:
+            updates = self.fetch()
+        except apihelper.ApiTelegramException as e:
+            self.breaker.record_failure()
+            retry_after = (e.result_json or {}).get("parameters", {}).get("retry_after")
+            delay = retry_after if e.error_code == 429 and retry_after else self.backoff.next_delay()
+            logger.error("❌ خطای تلگرام در دریافت آپدیت‌ها: %s (تلاش دوباره بعد از %.1f ثانیه)", e, delay)
+            self._sleep(delay)
+            return
+        except Exception as e:
+            self.breaker.record_failure()
+            delay = self.backoff.next_delay()
+            logger.error("❌ خطا در دریافت آپدیت‌ها: %s (تلاش دوباره بعد از %.1f ثانیه)", e, delay)
+            self._sleep(delay)
+            return
+        self.breaker.record_success()
+        self.backoff.reset()
+        if not updates:
+            return
+        try:
+            self.handle(updates)
+        finally:
+            # handle بعد از پایان هندلرها برمی‌گردد، پس offset فقط برای آپدیت‌های پردازش شده ذخیره می‌شود؛
+            # حتی اگر پردازش دسته خطا داشته باشد، آپدیت‌ها دوباره پردازش نمی‌شوند
+            self.offset = updates[-1]["update_id"] + 1
+            if self.checkpoint:
+                self.save_checkpoint()
+
+    def save_checkpoint(self):
+        if self.settle and not self.settle(self.settle_timeout):
+            logger.warning("⚠️ نتیجه دسته آپدیت‌ها تا %s ثانیه ماندگار نشد، offset بعداً ذخیره می‌شود",
+                           self.settle_timeout)
+            return
+        self.checkpoint.save(self.offset)
+
+    def run(self):
+        self.running = True
+        while self.running:
+            try:
+                self.poll_once()
+            except Exception as e:
+                logger.error("❌ خطا در پردازش آپدیت‌ها: %s", e)
+
+    def stop(self):
+        self.running = False
+
+
+# آیدی چت آپدیت خام (JSON)، برای حفظ ترتیب پیام‌های هر چت
+def raw_chat_id(update):
+    for key in ("message", "edited_message", "channel_post"):
+        if key in update:
+            return update[key]["chat"]["id"]
+    if "callback_query" in update:
+        query = update["callback_query"]
+        if "message" in query:
+            return query["message"]["chat"]["id"]
+        return query["from"]["id"]
+    for key in ("inline_query", "chosen_inline_result"):
+        if key in update:
+            return update[key]["from"]["id"]
+    return 0
+
+
+# پردازش دسته آپدیت‌های خام با هندلرهای ثبت شده روی بات (بات باید threaded=False ساخته شده باشد).
+# آپدیت‌های چت‌های مختلف در workers ترد موازی و آپدیت‌های هر چت به ترتیب اجرا می‌شوند و handle تا پایان
+# همه هندلرهای دسته صبر می‌کند، تا offset فقط بعد از پردازش واقعی آپدیت‌ها ذخیره شود.
+def bot_handler(bot, workers=8):
+    executor = ThreadPoolExecutor(workers, thread_name_prefix="handler") if workers > 1 else None
+
+    def process(updates):
+        # آپدیت‌ها تک‌تک پردازش می‌شوند: telebot هنگام پیدا کردن next step handler پیام را در حین
+        # پیمایش از لیست حذف می‌کند و اگر چند پیام یک دسته مرحله داشته باشند، بعضی از مراحل جا می‌مانند
+        for update in updates:
+            try:
+                bot.process_new_updates([types.Update.de_json(update)])
+            except Exception as e:
+                logger.error("❌ خطا در پردازش آپدیت %s: %s", update.get("update_id"), e)
+
+    def handle(updates):
+        chats = {}
+        for update in updates:
+            chats.setdefault(raw_chat_id(update), []).append(update)
+        if executor is None or len(chats) == 1:
+            process(updates)
+            return
+        for future in [executor.submit(process, chat_updates) for chat_updates in chats.values()]:
+            future.result()
+
+    return handle
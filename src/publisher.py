@@ -0,0 +1,157 @@
+import datetime
+import heapq
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+# تبدیل "23:30-07:00" یا "23-7" به (دقیقه شروع، دقیقه پایان) در روز؛ رشته خالی یعنی بدون ساعت سکوت
+def parse_quiet_hours(value):
+    if not value:
+        return None
+
+    def minutes(part):
+        hour, _, minute = part.strip().partition(":")
+        return (int(hour) * 60 + int(minute or 0)) % (24 * 60)
+
+    start, end = value.split("-")
+    return minutes(start), minutes(end)
+
+
+class PublishScheduler:
+    """
+    انتشار زمان‌بندی شده فرم‌های تأیید شده در کانال.
+    صف انتشار همان فرم‌های approved و منتشر نشده در ModerationQueue است و بعد از ری‌استارت از دست نمی‌رود.
+    حداکثر posts_per_minute پست در دقیقه منتشر می‌شود، در ساعت سکوت (به وقت محلی) چیزی ارسال نمی‌شود
+    و هر بار فرمی از درسی انتخاب می‌شود که زودتر از بقیه پست داشته است تا یک درس کانال را پر نکند.
+    در حافظه برای هر درس یک heap از فرم‌ها و یک heap از درس‌ها بر اساس (زمان آخرین پست، قدیمی‌ترین فرم)
+    نگه داشته می‌شود و در هر قدم فقط فرم‌های تازه تأیید شده از دیتابیس خوانده می‌شوند.
+    هر فرم قبل از ارسال در دیتابیس claim می‌شود، پس حتی با چند پروسه دو بار منتشر نمی‌شود،
+    و فقط بعد از ارسال موفق منتشر شده ثبت می‌شود؛ اگر ارسال رها شود، فرم آزاد می‌شود و بعد از بقیه فرم‌های
+    همان درس دوباره منتشر می‌شود.
+    clock برای تست با ساعت شبیه‌سازی شده قابل تعویض است.
+    """
+
+    def __init__(self, moderation, publish, posts_per_minute=20, quiet_hours=None, poll_interval=5.0,
+                 clock=time.time):
+        self.moderation = moderation
+        # publish(form, on_sent, on_failed) ارسال فرم در کانال؛ on_sent(result) بعد از ارسال موفق
+        # و on_failed(error) اگر ارسال ناموفق ماند
+        self.publish = publish
+        self.interval = 60.0 / posts_per_minute
+        self.quiet_hours = quiet_hours
+        self.poll_interval = poll_interval  # فاصله بررسی صف وقتی فرمی برای انتشار نیست (ثانیه)
+        self.clock = clock
+        self.last_posted = dict(moderation.last_posted())  # درس -> زمان آخرین پست
+        self.next_slot = max(self.last_posted.values(), default=0.0) + self.interval
+        self._forms = {}  # درس -> heap از ((تعداد ارسال ناموفق، آیدی)، فرم)
+        self._courses = []  # heap از (زمان آخرین پست، کلید اولین فرم، درس)
+        self._failures = {}  # آیدی فرم -> تعداد ارسال ناموفق؛ فرم ناموفق بعد از بقیه فرم‌های درس منتشر می‌شود
+        self._queued = set()  # آیدی فرم‌های داخل صف
+        self._since = None  # شماره آخرین تصمیم خوانده شده از ModerationQueue
+        self._wake = threading.Event()
+        self._thread = None
+
+    # زمان باقی‌مانده تا پایان ساعت سکوت (0 یعنی الان ساعت سکوت نیست)
+    def quiet_wait(self, now):
+        if not self.quiet_hours:
+            return 0.0
+        start, end = self.quiet_hours
+        local = datetime.datetime.fromtimestamp(now)
+        minute = local.hour * 60 + local.minute
+        if start <= end:
+            quiet = start <= minute < end
+        else:  # ساعت سکوت از نیمه شب می‌گذرد
+            quiet = minute >= start or minute < end
+        if not quiet:
+            return 0.0
+        midnight = local.replace(hour=0, minute=0, second=0, microsecond=0)
+        end_time = midnight + datetime.timedelta(minutes=end)
+        if end_time <= local:
+            end_time += datetime.timedelta(days=1)
+        return (end_time - local).total_seconds()
+
+    # کلید فعلی درس در heap درس‌ها
+    def _course_key(self, course):
+        return self.last_posted.get(course, 0.0), self._forms[course][0][0], course
+
+    # اضافه کردن فرم‌های تازه تأیید شده به صف
+    def refresh(self):
+        forms, self._since = self.moderation.approved_since(self._since)
+        for form in forms:
+            if form.id in self._queued:
+                continue
+            self._queued.add(form.id)
+            queue = self._forms.setdefault(form.course, [])
+            key = self._failures.get(form.id, 0), form.id
+            heapq.heappush(queue, (key, form))
+            # کلید قبلی درس (اگر بود) دیگر معتبر نیست و هنگام برداشتن کنار گذاشته می‌شود
+            if queue[0][0] == key:
+                heapq.heappush(self._courses, self._course_key(form.course))
+
+    # فرم بعدی: از درسی که قدیمی‌ترین پست را دارد، قدیمی‌ترین فرم
+    def next_form(self):
+        while self._courses:
+            key = heapq.heappop(self._courses)
+            course = key[2]
+            if course not in self._forms or key != self._course_key(course):
+                continue  # کلید قدیمی درس
+            queue = self._forms[course]
+            _, form = heapq.heappop(queue)
+            self._queued.discard(form.id)
+            if not queue:
+                del self._forms[course]
+            return form
+        return None
+
+    # یک قدم زمان‌بندی؛ خروجی مدت انتظار تا قدم بعدی (ثانیه)
+    def run_once(self):
+        now = self.clock()
+        wait = max(self.quiet_wait(now), self.next_slot - now)
+        if wait > 0:
+            return wait
+        self.refresh()
+        form = self.next_form()
+        if form is None:
+            return self.poll_interval
+        if self.moderation.claim(form.id):
+            self.last_posted[form.course] = now
+            self.next_slot = now + self.interval
+            self.publish(form, lambda result: self.sent(form, now), lambda error: self.release(form))
+        if form.course in self._forms:
+            heapq.heappush(self._courses, self._course_key(form.course))
+        return 0.0
+
+    # ثبت ارسال موفق فرم (از ترد ارسال)
+    def sent(self, form, now):
+        self.moderation.mark_posted([form.id], now)
+        self._failures.pop(form.id, None)
+
+    # فرمی که ارسالش ناموفق بود در قدم بعدی (از ترد زمان‌بند) دوباره از دیتابیس خوانده می‌شود
+    def release(self, form):
+        if self.moderation.release(form.id):
+            self._failures[form.id] = self._failures.get(form.id, 0) + 1
+            logger.warning("⚠️ انتشار فرم %s ناموفق بود، دوباره در صف انتشار قرار گرفت", form.id)
+            self.notify()
+
+    # بیدار کردن زمان‌بند بعد از تأیید فرم جدید
+    def notify(self):
+        self._wake.set()
+
+    def start(self):
+        def loop():
+            while True:
+                try:
+                    wait = self.run_once()
+                except Exception as e:
+                    logger.error("❌ خطا در انتشار پست‌ها: %s", e)
+                    wait = self.poll_interval
+                if wait > 0:
+                    self._wake.wait(wait)
+                    self._wake.clear()
+
+        if self._thread is None:
+            self._thread = threading.Thread(target=loop, name="publisher", daemon=True)
+            self._thread.start()
@@ -0,0 +1,241 @@
+"""
+صف ارسال پیام‌ها با محدودیت نرخ سراسری، هر چت و هر گروه/کانال.
+بنچمارک: bench/bench_send_queue.py
+"""
+import heapq
+import logging
+import queue
+import random
+import threading
+import time
+from collections import deque
+from requests.exceptions import ConnectionError as NetworkError
+from telebot import apihelper
+
+logger = logging.getLogger(__name__)
+
+MAX_MESSAGE_LENGTH = 4096  # حداکثر طول پیام تلگرام
+
+
+class TokenBucket:
+    """محدودکننده نرخ ساده: rate توکن در ثانیه و حداکثر capacity توکن ذخیره"""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    # زمان انتظار تا آزاد شدن یک توکن (بدون مصرف آن)
+    def wait_time(self):
+        with self._lock:
+            self._refill()
+            return 0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    # مصرف یک توکن؛ اگر توکن نبود زمان انتظار برگردانده می‌شود
+    def try_acquire(self):
+        with self._lock:
+            self._refill()
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0
+            return (1 - self.tokens) / self.rate
+
+    def is_full(self):
+        with self._lock:
+            self._refill()
+            return self.tokens >= self.capacity
+
+
+def is_group_chat(chat_id):
+    # آیدی گروه‌ها و کانال‌ها منفی است یا با @ شروع می‌شود
+    return chat_id.startswith("-") or chat_id.startswith("@")
+
+
+class SendQueue:
+    """
+    صف ارسال پیام‌ها با محدودیت نرخ سراسری و محدودیت هر چت/کانال.
+    هندلرها فقط پیام را در صف می‌گذارند و ترد‌های ارسال آن را به تلگرام می‌فرستند.
+    پیام‌های هر چت به ترتیب ارسال می‌شوند و در صورت خطای 429 بعد از retry_after دوباره تلاش می‌شود.
+    اگر اتصال به تلگرام قطع باشد، ارسال تا max_retries بار با تأخیر نمایی تکرار می‌شود.
+    پیام‌های ساده‌ای که برای چت‌های coalesce_chats در صف مانده‌اند در یک پیام ادغام می‌شوند.
+    on_sent(result) بعد از ارسال موفق با پیام ارسال شده صدا زده می‌شود (مثلاً برای ذخیره message_id)
+    و on_failed(error) وقتی پیام بعد از همه تلاش‌ها ارسال نشد و رها شد.
+    با wait_replies می‌توان تا ارسال پیام‌های در صف چت‌های خصوصی (جواب‌ها و سوال‌های مراحل فرم) صبر کرد.
+    """
+
+    # سقف هر چت خصوصی فقط جلوی سیل پیام به یک کاربر را می‌گیرد؛ جواب‌های عادی (چند پیام پشت سر هم) معطل نمی‌شوند
+    # و اگر تلگرام باز هم 429 بدهد، ارسال بعد از retry_after تکرار می‌شود
+    def __init__(self, bot, workers=4, global_rate=30, chat_rate=5, chat_burst=10,
+                 group_rate=20 / 60, group_burst=3, coalesce_chats=(), max_retries=6):
+        self.bot = bot
+        self.max_retries = max_retries
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self.group_rate = group_rate
+        self.group_burst = group_burst
+        self.coalesce_chats = {str(chat_id) for chat_id in coalesce_chats}
+        self.global_bucket = TokenBucket(global_rate, global_rate)
+        self.buckets = {}  # محدودکننده نرخ هر چت
+        self.pending = {}  # پیام‌های در انتظار هر چت
+        self.in_flight = {}  # پیامی که برای هر چت در حال ارسال است
+        self.stats = {"sent": 0, "coalesced": 0, "flood_errors": 0, "failed": 0, "retried": 0}
+        self._ready = queue.Queue()  # چت‌هایی که آماده ارسال هستند
+        self._delayed = []  # چت‌هایی که باید کمی صبر کنند (heap بر اساس زمان)
+        self._lock = threading.Lock()
+        self._seq = 0  # شماره آخرین پیام وارد شده به صف
+        self._open_replies = set()  # شماره پیام‌های چت‌های خصوصی که هنوز ارسال (یا رها) نشده‌اند
+        self._replies_done = threading.Condition(self._lock)
+        self._delayed_cond = threading.Condition()
+        threading.Thread(target=self._delay_loop, name="send-delay", daemon=True).start()
+        for i in range(workers):
+            threading.Thread(target=self._worker, name=f"send-{i}", daemon=True).start()
+
+    def send_message(self, chat_id, text, on_sent=None, on_failed=None, **kwargs):
+        self.send("send_message", chat_id, text, on_sent, on_failed, **kwargs)
+
+    # قرار دادن هر متد ارسال بات (send_photo، send_media_group و ...) در صف؛ payload آرگومان دوم متد است
+    def send(self, method, chat_id, payload, on_sent=None, on_failed=None, **kwargs):
+        key = str(chat_id)
+        with self._lock:
+            self._seq += 1
+            message = [chat_id, payload, kwargs, 0, method, on_sent, self._seq, on_failed]
+            messages = self.pending.get(key)
+            if messages is None:
+                self.pending[key] = deque([message])
+                self._open(key, message)
+                self._ready.put(key)
+                return
+            tail = messages[-1]
+            if (key in self.coalesce_chats and method == tail[4] == "send_message" and not kwargs and not tail[2]
+                    and on_sent is None and tail[5] is None and on_failed is None and tail[7] is None
+                    and tail is not self.in_flight.get(key)
+                    and len(tail[1]) + len(payload) + 2 <= MAX_MESSAGE_LENGTH):
+                tail[1] += "\n\n" + payload  # با ارسال tail که زودتر در صف بوده، این پیام هم ارسال می‌شود
+                self.stats["coalesced"] += 1
+            else:
+                messages.append(message)
+                self._open(key, message)
+
+    def _open(self, key, message):
+        if not is_group_chat(key):
+            self._open_replies.add(message[6])
+
+    # صبر تا ارسال (یا رها شدن بعد از خطا) همه پیام‌های چت‌های خصوصی که تا این لحظه در صف گذاشته شده‌اند؛
+    # خروجی False اگر تا timeout ثانیه تمام نشدند
+    def wait_replies(self, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._replies_done:
+            mark = self._seq
+            while self._open_replies and min(self._open_replies) <= mark:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._replies_done.wait(remaining)
+            return True
+
+    # شمارنده‌ها از چند ترد ارسال به‌روز می‌شوند
+    def _count(self, name):
+        with self._lock:
+            self.stats[name] += 1
+
+    def _bucket(self, key):
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            if is_group_chat(key):
+                bucket = TokenBucket(self.group_rate, self.group_burst)
+            else:
+                bucket = TokenBucket(self.chat_rate, self.chat_burst)
+            self.buckets[key] = bucket
+        return bucket
+
+    def _schedule(self, key, delay):
+        with self._delayed_cond:
+            heapq.heappush(self._delayed, (time.monotonic() + delay, key))
+            self._delayed_cond.notify()
+
+    def _delay_loop(self):
+        with self._delayed_cond:
+            while True:
+                if not self._delayed:
+                    self._delayed_cond.wait()
+                    continue
+                ready_at, key = self._delayed[0]
+                now = time.monotonic()
+                if ready_at > now:
+                    self._delayed_cond.wait(ready_at - now)
+                    continue
+                heapq.heappop(self._delayed)
+                self._ready.put(key)
+
+    def _worker(self):
+        while True:
+            key = self._ready.get()
+            with self._lock:
+                bucket = self._bucket(key)
+            wait = bucket.wait_time() or self.global_bucket.try_acquire()
+            if wait:
+                self._schedule(key, wait)
+                continue
+            bucket.try_acquire()
+            with self._lock:
+                message = self.pending[key][0]
+                self.in_flight[key] = message
+            chat_id, payload, kwargs, attempts, method, on_sent, _, on_failed = message
+            retry_after = 0
+            error = None
+            try:
+                result = getattr(self.bot, method)(chat_id, payload, **kwargs)
+                self._count("sent")
+                if on_sent:
+                    on_sent(result)
+            except apihelper.ApiTelegramException as e:
+                if e.error_code == 429:
+                    self._count("flood_errors")
+                    retry_after = e.result_json.get("parameters", {}).get("retry_after", 1)
+                    logger.warning("⏳ محدودیت ارسال برای %s، تلاش مجدد بعد از %s ثانیه", key, retry_after)
+                else:
+                    self._count("failed")
+                    logger.error("❌ خطا در ارسال پیام به %s: %s", key, e)
+                    error = e
+            except NetworkError as e:
+                # پیام به تلگرام نرسیده است؛ با تأخیر نمایی (با jitter) دوباره ارسال می‌شود
+                if attempts < self.max_retries:
+                    message[3] += 1
+                    self._count("retried")
+                    retry_after = random.uniform(0.5, 1) * min(60, 2 ** attempts)
+                    logger.warning("🔌 خطای شبکه در ارسال پیام به %s، تلاش مجدد بعد از %.1f ثانیه", key, retry_after)
+                else:
+                    self._count("failed")
+                    logger.error("❌ خطا در ارسال پیام به %s: %s", key, e)
+                    error = e
+            except Exception as e:
+                self._count("failed")
+                logger.error("❌ خطا در ارسال پیام به %s: %s", key, e)
+                error = e
+            if error is not None and on_failed:
+                try:
+                    on_failed(error)
+                except Exception as e:
+                    logger.error("❌ خطا در on_failed پیام %s: %s", key, e)
+            with self._lock:
+                self.in_flight.pop(key, None)
+                messages = self.pending[key]
+                if not retry_after:
+                    self._open_replies.discard(messages.popleft()[6])
+                    self._replies_done.notify_all()
+                if not messages:
+                    del self.pending[key]
+                    if bucket.is_full():
+                        self.buckets.pop(key, None)
+                    continue
+            if retry_after:
+                self._schedule(key, retry_after)
+            else:
+                self._ready.put(key)
@@ -0,0 +1,119 @@
+import logging
+import multiprocessing
+import queue
+import threading
+from multiprocessing.connection import wait
+from telebot import types
+from polling import PollingEngine, raw_chat_id
+
+logger = logging.getLogger(__name__)
+
+
+class Supervisor:
+    """
+    دریافت آپدیت‌ها در یک پروسه و پخش آن‌ها بین چند پروسه کارگر بر اساس آیدی چت،
+    تا پیام‌های هر چت همیشه به ترتیب و در یک پروسه پردازش شوند.
+    کارگرها آیدی آپدیت‌های پردازش شده را در صف acks برمی‌گردانند و offset فقط تا اولین آپدیت تأیید نشده
+    ذخیره می‌شود، پس آپدیت‌هایی که هنوز در صف کارگرها هستند با ری‌استارت سرپرست دوباره پردازش می‌شوند.
+    یک ترد جداگانه کارگرها را زیر نظر دارد؛ کارگری که از کار بیفتد با صف تازه دوباره اجرا می‌شود
+    و آپدیت‌های تأیید نشده‌اش دوباره در صف آن قرار می‌گیرند.
+    target(index, workers, updates, acks) تابع اجرای کارگر است و باید در سطح ماژول تعریف شده باشد
+    (یا functools.partial روی چنین تابعی).
+    بنچمارک مقیاس‌پذیری: python bench/bench_runners.py --modes sharded --workers 1,2,4,8
+    """
+
+    def __init__(self, token, target, workers=4, poll_timeout=25, checkpoint=None):
+        self.token = token
+        self.target = target
+        self.workers = workers
+        self.checkpoint = checkpoint
+        # offset در checkpoint را خود سرپرست بعد از تأیید کارگرها ذخیره می‌کند، نه PollingEngine
+        self.engine = PollingEngine(token, self.dispatch, poll_timeout=poll_timeout)
+        self.engine.offset = self.saved_offset = checkpoint.load() if checkpoint else None
+        # spawn: هر کارگر ماژول را از نو بارگذاری می‌کند و بات و وضعیت مخصوص خود را می‌سازد
+        self.context = multiprocessing.get_context("spawn")
+        self.queues = [self.context.Queue() for _ in range(workers)]
+        self.acks = self.context.Queue()
+        self.processes = [None] * workers
+        self.pending = {}  # update_id -> آپدیت خام، به ترتیب ارسال به کارگرها
+        self.next_offset = self.saved_offset
+        self._lock = threading.Lock()
+
+    def _start_worker(self, index):
+        process = self.context.Process(
+            target=self.target, args=(index, self.workers, self.queues[index], self.acks),
+            name=f"shard-{index}", daemon=True,
+        )
+        process.start()
+        self.processes[index] = process
+
+    # آپدیت‌های مانده در صف کارگر مرده (یا برداشته شده و تأیید نشده) در صف تازه دوباره قرار می‌گیرند
+    def _restart_worker(self, index):
+        with self._lock:
+            self.queues[index] = self.context.Queue()
+            for update_id, update in self.pending.items():
+                if raw_chat_id(update) % self.workers == index:
+                    self.queues[index].put(update)
+            self._start_worker(index)
+
+    def _monitor_workers(self):
+        while True:
+            sentinels = {process.sentinel: index for index, process in enumerate(self.processes)}
+            for sentinel in wait(list(sentinels)):
+                index = sentinels[sentinel]
+                logger.error("❌ کارگر %s متوقف شد (کد خروج %s)، اجرای مجدد...",
+                             index, self.processes[index].exitcode)
+                self._restart_worker(index)
+
+    def _collect_acks(self):
+        while True:
+            self.acknowledge(self.acks.get())
+
+    def acknowledge(self, update_ids):
+        with self._lock:
+            for update_id in update_ids:
+                self.pending.pop(update_id, None)
+            offset = next(iter(self.pending), self.next_offset)
+            if self.checkpoint and offset is not None and offset != self.saved_offset:
+                self.checkpoint.save(offset)
+                self.saved_offset = offset
+
+    def run(self):
+        for index in range(self.workers):
+            self._start_worker(index)
+        threading.Thread(target=self._monitor_workers, name="shard-monitor", daemon=True).start()
+        threading.Thread(target=self._collect_acks, name="shard-acks", daemon=True).start()
+        logger.info("🤖 Bot is running (%s workers)...", self.workers)
+        self.engine.run()
+
+    def dispatch(self, updates):
+        with self._lock:
+            for update in updates:
+                self.pending[update["update_id"]] = update
+                self.queues[raw_chat_id(update) % self.workers].put(update)
+            self.next_offset = updates[-1]["update_id"] + 1
+
+
+# حلقه پردازش آپدیت‌ها در هر کارگر: آیدی آپدیت‌ها بعد از پردازش و settle (ماندگار شدن جواب‌ها و مراحل)
+# در صف acks فرستاده می‌شود؛ اگر settle موفق نشود، با دسته بعدی یا بعد از یک ثانیه دوباره امتحان می‌شود
+def process_updates(bot, updates, acks, settle=None, settle_timeout=10.0, batch_size=100):
+    done = []
+    while True:
+        try:
+            batch = [updates.get(timeout=1.0 if done else None)]
+        except queue.Empty:
+            batch = []
+        while batch and len(batch) < batch_size:
+            try:
+                batch.append(updates.get_nowait())
+            except queue.Empty:
+                break
+        for update in batch:
+            try:
+                bot.process_new_updates([types.Update.de_json(update)])
+            except Exception as e:
+                logger.error("❌ خطا در پردازش آپدیت %s: %s", update.get("update_id"), e)
+            done.append(update["update_id"])
+        if done and (settle is None or settle(settle_timeout)):
+            acks.put(done)
+            done = []
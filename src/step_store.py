@@ -0,0 +1,78 @@
+import atexit
+import sqlite3
+import threading
+import time
+from telebot import Handler
+from telebot.handler_backends import HandlerBackend
+
+
+class SqliteStepBackend(HandlerBackend):
+    """
+    نگهداری مرحله فعلی هر چت (next step handler) در SQLite تا بعد از ری‌استارت بات
+    کاربر از همان مرحله ادامه دهد. مراحل در حافظه نگه داشته می‌شوند و تغییرات
+    هر flush_interval ثانیه یک‌جا در دیتابیس نوشته می‌شوند؛ با flush_interval صفر فقط با صدا زدن flush
+    (مثلاً قبل از ذخیره offset هر دسته آپدیت) و هنگام خروج.
+    """
+
+    def __init__(self, path="steps.db", steps=(), flush_interval=1.0):
+        super().__init__()
+        self.steps = {func.__name__: func for func in steps}  # نام مرحله -> تابع
+        self.flush_interval = flush_interval
+        self._dirty = set()  # چت‌هایی که مرحله‌شان هنوز ذخیره نشده
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS steps (chat_id INTEGER PRIMARY KEY, step TEXT NOT NULL, updated_at REAL NOT NULL)"
+        )
+        self._load()
+        if flush_interval > 0:
+            threading.Thread(target=self._flush_loop, name="step-flush", daemon=True).start()
+        atexit.register(self.flush)
+
+    def _load(self):
+        for chat_id, step in self._db.execute("SELECT chat_id, step FROM steps"):
+            if step in self.steps:
+                self.handlers[chat_id] = [Handler(self.steps[step])]
+
+    def register_handler(self, handler_group_id, handler):
+        with self._lock:
+            self.handlers.setdefault(handler_group_id, []).append(handler)
+            self._dirty.add(handler_group_id)
+
+    def clear_handlers(self, handler_group_id):
+        with self._lock:
+            if self.handlers.pop(handler_group_id, None) is not None:
+                self._dirty.add(handler_group_id)
+
+    def get_handlers(self, handler_group_id):
+        with self._lock:
+            handlers = self.handlers.pop(handler_group_id, None)
+            if handlers is not None:
+                self._dirty.add(handler_group_id)
+            return handlers
+
+    # نوشتن تغییرات جمع شده در یک تراکنش
+    def flush(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            dirty, self._dirty = self._dirty, set()
+            now = time.time()
+            upserts, deletes = [], []
+            for chat_id in dirty:
+                handlers = self.handlers.get(chat_id)
+                if handlers and handlers[-1].callback.__name__ in self.steps:
+                    upserts.append((chat_id, handlers[-1].callback.__name__, now))
+                else:
+                    deletes.append((chat_id,))
+            self._db.execute("BEGIN")
+            self._db.executemany("INSERT OR REPLACE INTO steps VALUES (?, ?, ?)", upserts)
+            self._db.executemany("DELETE FROM steps WHERE chat_id = ?", deletes)
+            self._db.execute("COMMIT")
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(self.flush_interval)
+            self.flush()
@@ -0,0 +1,149 @@
+"""
+تیکت‌های پشتیبانی: تاریخچه پیام‌های هر تیکت و جدول مسیر پاسخ‌ها (message_id پیام ادمین -> تیکت).
+بنچمارک: bench/bench_tickets.py
+"""
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+Ticket = namedtuple("Ticket", "id chat_id status created_at updated_at messages")
+TicketMessage = namedtuple("TicketMessage", "sender text created_at")
+
+
+class TicketStore:
+    """
+    تیکت‌های پشتیبانی در SQLite. هر کاربر حداکثر یک تیکت باز دارد و پیام‌های بعدی او به همان تیکت اضافه می‌شوند.
+    برای هر پیامی که درباره یک تیکت به ادمین ارسال می‌شود، message_id آن ثبت می‌شود تا جواب (reply) ادمین
+    با یک جستجوی کلید اصلی (و در اکثر موارد از حافظه) به کاربر درست برسد، حتی بعد از ری‌استارت.
+    """
+
+    def __init__(self, path="tickets.db", cache_size=200000):
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS tickets ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, chat_id INTEGER NOT NULL, status TEXT NOT NULL DEFAULT 'open', "
+            "created_at REAL NOT NULL, updated_at REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS tickets_chat ON tickets (chat_id, status)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS tickets_status ON tickets (status, updated_at)")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS ticket_messages ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, ticket_id INTEGER NOT NULL, sender TEXT NOT NULL, "
+            "text TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS ticket_messages_ticket ON ticket_messages (ticket_id, id)")
+        # message_id کلید اصلی (rowid) است، پس پیدا کردن تیکت یک جستجوی مستقیم در B-tree است
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS routes (message_id INTEGER PRIMARY KEY, ticket_id INTEGER NOT NULL)"
+        )
+        self.cache_size = cache_size
+        self._routes = OrderedDict()  # message_id -> ticket_id (آخرین مسیرهای استفاده شده)
+
+    # اضافه کردن پیام کاربر به تیکت باز او یا باز کردن تیکت جدید؛ خروجی (آیدی تیکت، تعداد پیام‌ها)
+    def add_message(self, chat_id, text):
+        now = time.time()
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            row = self._db.execute(
+                "SELECT id FROM tickets WHERE chat_id = ? AND status = 'open' ORDER BY id DESC LIMIT 1", (chat_id,)
+            ).fetchone()
+            if row:
+                ticket_id = row[0]
+                self._db.execute("UPDATE tickets SET updated_at = ? WHERE id = ?", (now, ticket_id))
+            else:
+                ticket_id = self._db.execute(
+                    "INSERT INTO tickets (chat_id, created_at, updated_at) VALUES (?, ?, ?)", (chat_id, now, now)
+                ).lastrowid
+            self._db.execute(
+                "INSERT INTO ticket_messages (ticket_id, sender, text, created_at) VALUES (?, 'user', ?, ?)",
+                (ticket_id, text, now),
+            )
+            count = self._db.execute(
+                "SELECT COUNT(*) FROM ticket_messages WHERE ticket_id = ?", (ticket_id,)
+            ).fetchone()[0]
+            self._db.execute("COMMIT")
+        return ticket_id, count
+
+    # ثبت جواب ادمین؛ خروجی آیدی چت کاربر، یا None اگر تیکت وجود ندارد یا بسته شده است
+    def add_reply(self, ticket_id, text):
+        now = time.time()
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            row = self._db.execute(
+                "SELECT chat_id FROM tickets WHERE id = ? AND status = 'open'", (ticket_id,)
+            ).fetchone()
+            if row:
+                self._db.execute(
+                    "INSERT INTO ticket_messages (ticket_id, sender, text, created_at) VALUES (?, 'admin', ?, ?)",
+                    (ticket_id, text, now),
+                )
+                self._db.execute("UPDATE tickets SET updated_at = ? WHERE id = ?", (now, ticket_id))
+            self._db.execute("COMMIT")
+        return row[0] if row else None
+
+    # بستن تیکت؛ None یعنی تیکت وجود ندارد یا قبلاً بسته شده است
+    def close(self, ticket_id):
+        with self._lock:
+            cursor = self._db.execute(
+                "UPDATE tickets SET status = 'closed', updated_at = ? WHERE id = ? AND status = 'open'",
+                (time.time(), ticket_id),
+            )
+            if cursor.rowcount != 1:
+                return None
+            return self._db.execute("SELECT chat_id FROM tickets WHERE id = ?", (ticket_id,)).fetchone()[0]
+
+    def add_route(self, message_id, ticket_id):
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO routes (message_id, ticket_id) VALUES (?, ?)",
+                             (message_id, ticket_id))
+            self._remember(message_id, ticket_id)
+
+    # تیکت مربوط به پیام ادمین (None یعنی پیام درباره تیکتی نیست)
+    def route(self, message_id):
+        with self._lock:
+            ticket_id = self._routes.get(message_id)
+            if ticket_id is not None:
+                self._routes.move_to_end(message_id)
+                return ticket_id
+            row = self._db.execute("SELECT ticket_id FROM routes WHERE message_id = ?", (message_id,)).fetchone()
+            if row is None:
+                return None
+            self._remember(message_id, row[0])
+            return row[0]
+
+    def _remember(self, message_id, ticket_id):
+        self._routes[message_id] = ticket_id
+        if len(self._routes) > self.cache_size:
+            self._routes.popitem(last=False)
+
+    # تیکت با آخرین پیام‌های آن
+    def get(self, ticket_id, history=10):
+        with self._lock:
+            row = self._db.execute(
+                "SELECT id, chat_id, status, created_at, updated_at FROM tickets WHERE id = ?", (ticket_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            messages = self._db.execute(
+                "SELECT sender, text, created_at FROM ticket_messages WHERE ticket_id = ? ORDER BY id DESC LIMIT ?",
+                (ticket_id, history),
+            ).fetchall()
+        return Ticket(*row, [TicketMessage(*message) for message in reversed(messages)])
+
+    def count_open(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM tickets WHERE status = 'open'").fetchone()[0]
+
+    # تیکت‌های باز، از آخرین پیام به قدیمی‌ترین: (آیدی، آیدی چت، زمان آخرین پیام)
+    def open_tickets(self, offset, limit):
+        with self._lock:
+            return self._db.execute(
+                "SELECT id, chat_id, updated_at FROM tickets WHERE status = 'open' "
+                "ORDER BY updated_at DESC LIMIT ? OFFSET ?",
+                (limit, offset),
+            ).fetchall()
+
@@ -0,0 +1,52 @@
+import logging
+import requests
+from requests.adapters import HTTPAdapter
+from telebot import apihelper
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+
+class HttpTransport:
+    """
+    یک Session مشترک requests با pool اتصال‌های keep-alive برای همه درخواست‌های Bot API در پروسه
+    (همه تردها و در میزبانی چند بات، همه بات‌ها). به جای Session جدا برای هر ترد در apihelper،
+    حداکثر pool_size اتصال باز به سرور تلگرام نگه داشته و دوباره استفاده می‌شوند (اتصال‌های اضافه بعد از
+    استفاده بسته می‌شوند، پس long polling چند بات درخواست‌های ارسال را منتظر نمی‌گذارد).
+    فقط خطاهای اتصال (قبل از رسیدن درخواست به سرور) تا retries بار تکرار می‌شوند تا پیامی دو بار ارسال نشود.
+    """
+
+    def __init__(self, pool_size=32, retries=2, backoff=0.2):
+        self.pool_size = pool_size
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=4, pool_maxsize=pool_size,
+            max_retries=Retry(total=retries, connect=retries, read=0, status=0, other=0,
+                              backoff_factor=backoff, raise_on_status=False),
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def request(self, method, url, params=None, files=None, timeout=None, proxies=None):
+        return self.session.request(method, url, params=params, files=files, timeout=timeout, proxies=proxies)
+
+    def close(self):
+        self.session.close()
+
+
+_transport = None
+
+
+# نصب transport مشترک روی apihelper (یک بار در هر پروسه)
+def install_transport(config):
+    global _transport
+    if _transport is None:
+        _transport = HttpTransport(
+            pool_size=config.get_int("HTTP_POOL_SIZE", 32),  # حداکثر اتصال‌های همزمان به Bot API
+            retries=config.get_int("HTTP_RETRIES", 2),  # تکرار درخواست در خطای اتصال
+        )
+        apihelper.CONNECT_TIMEOUT = config.get_float("HTTP_CONNECT_TIMEOUT", 15)
+        apihelper.READ_TIMEOUT = config.get_float("HTTP_READ_TIMEOUT", 30)
+        apihelper.CUSTOM_REQUEST_SENDER = _transport.request
+        logger.debug("HTTP transport: pool_size=%s", _transport.pool_size)
+    return _transport
@@ -0,0 +1,250 @@
+"""
+فهرست کاربران بات و ارسال پیام همگانی (broadcast) به همه آن‌ها.
+بنچمارک: bench/bench_broadcast.py
+"""
+import logging
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from telebot import apihelper
+
+logger = logging.getLogger(__name__)
+
+Broadcast = namedtuple("Broadcast", "id text status cursor total sent blocked failed message_id created_at")
+
+_COLUMNS = "id, text, status, cursor, total, sent, blocked, failed, message_id, created_at"
+
+
+class UserRegistry:
+    """
+    فهرست چت‌های خصوصی که با بات کار کرده‌اند (SQLite، مرتب بر اساس chat_id) و پیام‌های همگانی.
+    هر چت فقط بار اول در هر پروسه در دیتابیس نوشته می‌شود؛ بعد از آن فقط یک جستجو در مجموعه seen است.
+    کاربرانی که بات را بلاک کرده‌اند علامت می‌خورند و تا پیام بعدی‌شان پیام همگانی دریافت نمی‌کنند.
+    وضعیت هر پیام همگانی (آخرین chat_id ارسال شده و شمارنده‌ها) ذخیره می‌شود تا بعد از ری‌استارت ادامه پیدا کند.
+    """
+
+    def __init__(self, path="users.db", cache_size=100000):
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS users ("
+            "chat_id INTEGER PRIMARY KEY, joined_at REAL NOT NULL, blocked INTEGER NOT NULL DEFAULT 0)"
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS broadcasts ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, text TEXT NOT NULL, status TEXT NOT NULL DEFAULT 'draft', "
+            "cursor INTEGER NOT NULL DEFAULT 0, total INTEGER NOT NULL DEFAULT 0, sent INTEGER NOT NULL DEFAULT 0, "
+            "blocked INTEGER NOT NULL DEFAULT 0, failed INTEGER NOT NULL DEFAULT 0, message_id INTEGER, "
+            "created_at REAL NOT NULL)"
+        )
+        self.cache_size = cache_size
+        self._seen = set()  # چت‌هایی که در این پروسه ثبت شده‌اند
+
+    # ثبت چت (یا برگرداندن کاربری که قبلاً بات را بلاک کرده بود)
+    def touch(self, chat_id):
+        if chat_id in self._seen:
+            return
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO users (chat_id, joined_at) VALUES (?, ?) "
+                "ON CONFLICT (chat_id) DO UPDATE SET blocked = 0 WHERE blocked = 1",
+                (chat_id, time.time()),
+            )
+            if len(self._seen) >= self.cache_size:
+                self._seen.clear()
+            self._seen.add(chat_id)
+
+    def mark_blocked(self, chat_ids):
+        with self._lock:
+            self._db.executemany("UPDATE users SET blocked = 1 WHERE chat_id = ?", ((chat_id,) for chat_id in chat_ids))
+            self._seen.difference_update(chat_ids)
+
+    def count(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM users WHERE blocked = 0").fetchone()[0]
+
+    # کاربران فعال بعد از after به ترتیب chat_id (صفحه‌بندی با کلید، بدون نگه داشتن همه کاربران در حافظه)
+    def page(self, after, limit):
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT chat_id FROM users WHERE chat_id > ? AND blocked = 0 ORDER BY chat_id LIMIT ?",
+                (after, limit),
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    # ---- پیام‌های همگانی ----
+
+    def create_broadcast(self, text):
+        with self._lock:
+            return self._db.execute(
+                "INSERT INTO broadcasts (text, created_at) VALUES (?, ?)", (text, time.time())
+            ).lastrowid
+
+    def get_broadcast(self, broadcast_id):
+        with self._lock:
+            row = self._db.execute(f"SELECT {_COLUMNS} FROM broadcasts WHERE id = ?", (broadcast_id,)).fetchone()
+        return Broadcast(*row) if row else None
+
+    # تغییر وضعیت فقط از وضعیت‌های مشخص (مثلاً draft -> running)؛ خروجی True اگر تغییر انجام شد
+    def set_status(self, broadcast_id, status, expected):
+        with self._lock:
+            cursor = self._db.execute(
+                f"UPDATE broadcasts SET status = ? WHERE id = ? AND status IN ({', '.join('?' * len(expected))})",
+                (status, broadcast_id, *expected),
+            )
+            return cursor.rowcount == 1
+
+    def start_broadcast(self, broadcast_id):
+        total = self.count()
+        with self._lock:
+            cursor = self._db.execute(
+                "UPDATE broadcasts SET status = 'running', total = ? WHERE id = ? AND status = 'draft'",
+                (total, broadcast_id),
+            )
+            return cursor.rowcount == 1
+
+    def set_message_id(self, broadcast_id, message_id):
+        with self._lock:
+            self._db.execute("UPDATE broadcasts SET message_id = ? WHERE id = ?", (message_id, broadcast_id))
+
+    # ثبت پیشرفت یک دسته؛ خروجی وضعیت فعلی (اگر ادمین متوقف کرده باشد cancelled)
+    def checkpoint(self, broadcast_id, cursor, sent, blocked, failed):
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            self._db.execute(
+                "UPDATE broadcasts SET cursor = ?, sent = sent + ?, blocked = blocked + ?, failed = failed + ? "
+                "WHERE id = ?",
+                (cursor, sent, blocked, failed, broadcast_id),
+            )
+            row = self._db.execute(f"SELECT {_COLUMNS} FROM broadcasts WHERE id = ?", (broadcast_id,)).fetchone()
+            self._db.execute("COMMIT")
+        return Broadcast(*row)
+
+    def running(self):
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT {_COLUMNS} FROM broadcasts WHERE status = 'running' ORDER BY id"
+            ).fetchall()
+        return [Broadcast(*row) for row in rows]
+
+
+class Broadcaster:
+    """
+    ارسال پیام‌های همگانی در حال اجرا در یک ترد پس‌زمینه، یکی پس از دیگری.
+    کاربران دسته‌به‌دسته (batch_size) از دیتابیس خوانده و با حداکثر rate پیام در ثانیه ارسال می‌شوند.
+    limiter (مثلاً محدودکننده سراسری صف ارسال) مشترک با بقیه پیام‌های بات است تا سقف کل تلگرام رعایت شود.
+    بعد از هر دسته پیشرفت ذخیره می‌شود، پس با ری‌استارت حداکثر یک دسته دوباره ارسال می‌شود.
+    کاربرانی که بات را بلاک کرده‌اند یا حسابشان حذف شده از فهرست کنار گذاشته می‌شوند.
+    on_progress(broadcast) هر progress_interval ثانیه و در پایان صدا زده می‌شود.
+    پیام‌های همگانی که در پروسه دیگری (مثلاً کارگرهای sharded) شروع شده‌اند هر poll_interval ثانیه پیدا می‌شوند.
+    clock و sleep برای تست با ساعت شبیه‌سازی شده قابل تعویض هستند.
+    """
+
+    def __init__(self, users, send, rate=25, workers=8, batch_size=200, limiter=None, on_progress=None,
+                 progress_interval=30.0, poll_interval=5.0, clock=time.monotonic, sleep=time.sleep):
+        self.users = users
+        self.send = send  # send(chat_id, text)
+        self.interval = 1.0 / rate
+        self.batch_size = batch_size
+        self.limiter = limiter  # limiter() زمان انتظار تا مجاز شدن ارسال بعدی (0 یعنی مجاز است)
+        self.on_progress = on_progress
+        self.progress_interval = progress_interval
+        self.poll_interval = poll_interval
+        self.clock = clock
+        self.sleep = sleep
+        self._executor = ThreadPoolExecutor(workers, thread_name_prefix="broadcast") if workers > 1 else None
+        self._next_slot = 0.0
+        self._wake = threading.Event()
+        self._thread = None
+
+    # صبر تا نوبت ارسال بعدی
+    def _pace(self):
+        while True:
+            wait = self._next_slot - self.clock()
+            if wait <= 0 and self.limiter is not None:
+                wait = self.limiter()
+            if wait <= 0:
+                break
+            self.sleep(wait)
+        self._next_slot = max(self._next_slot + self.interval, self.clock())
+
+    # ارسال به یک کاربر؛ خروجی sent، blocked یا failed
+    def _deliver(self, chat_id, text, attempts=3):
+        for _ in range(attempts):
+            try:
+                self.send(chat_id, text)
+                return "sent"
+            except apihelper.ApiTelegramException as e:
+                if e.error_code == 429:
+                    # همه ارسال‌ها عقب می‌افتند، نه فقط همین کاربر؛ ارسال دوباره خودش یک نوبت می‌گیرد
+                    retry_after = e.result_json.get("parameters", {}).get("retry_after", 1)
+                    self._next_slot = max(self._next_slot, self.clock() + retry_after + self.interval)
+                    self.sleep(retry_after)
+                    continue
+                if e.error_code == 403 or "chat not found" in e.description:
+                    return "blocked"
+                logger.error("❌ خطا در ارسال پیام همگانی به %s: %s", chat_id, e)
+                return "failed"
+            except Exception as e:
+                logger.error("❌ خطا در ارسال پیام همگانی به %s: %s", chat_id, e)
+                return "failed"
+        return "failed"
+
+    def run_broadcast(self, broadcast):
+        reported_at = self.clock()
+        cursor = broadcast.cursor
+        while broadcast.status == "running":
+            chat_ids = self.users.page(cursor, self.batch_size)
+            if not chat_ids:
+                break
+            results = []
+            for chat_id in chat_ids:
+                self._pace()
+                if self._executor is None:
+                    results.append(self._deliver(chat_id, broadcast.text))
+                else:
+                    results.append(self._executor.submit(self._deliver, chat_id, broadcast.text))
+            results = [result if isinstance(result, str) else result.result() for result in results]
+            blocked = [chat_id for chat_id, result in zip(chat_ids, results) if result == "blocked"]
+            if blocked:
+                self.users.mark_blocked(blocked)
+            cursor = chat_ids[-1]
+            broadcast = self.users.checkpoint(broadcast.id, cursor, results.count("sent"), len(blocked),
+                                              results.count("failed"))
+            if self.on_progress and self.clock() - reported_at >= self.progress_interval:
+                reported_at = self.clock()
+                self.on_progress(broadcast)
+        if broadcast.status == "running":
+            self.users.set_status(broadcast.id, "done", ("running",))
+            broadcast = broadcast._replace(status="done")
+        if self.on_progress:
+            self.on_progress(broadcast)
+        return broadcast
+
+    # ادامه همه پیام‌های همگانی در حال اجرا (از جمله آن‌هایی که قبل از ری‌استارت نیمه‌کاره ماندند)
+    def run_once(self):
+        for broadcast in self.users.running():
+            self.run_broadcast(broadcast)
+
+    # بیدار کردن ترد بعد از شروع پیام همگانی جدید
+    def notify(self):
+        self._wake.set()
+
+    def start(self):
+        def loop():
+            while True:
+                self._wake.clear()
+                try:
+                    self.run_once()
+                except Exception as e:
+                    logger.error("❌ خطا در ارسال پیام همگانی: %s", e)
+                self._wake.wait(self.poll_interval)
+
+        if self._thread is None:
+            self._thread = threading.Thread(target=loop, name="broadcaster", daemon=True)
+            self._thread.start()
+
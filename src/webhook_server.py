@@ -0,0 +1,99 @@
+import hmac
+import json
+import logging
+import queue
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from polling import bot_handler
+
+logger = logging.getLogger(__name__)
+
+
+class WebhookServer:
+    """
+    سرور HTTP داخلی برای دریافت آپدیت‌ها از طریق وبهوک.
+    درخواست بلافاصله با 200 جواب داده می‌شود و پردازش آپدیت در ترد جداگانه انجام می‌شود.
+    آپدیت‌های رسیده دسته‌ای به همان اجراکننده حالت polling (bot_handler) داده می‌شوند: آپدیت‌های هر چت
+    به ترتیب و چت‌های مختلف در workers ترد موازی (بات باید threaded=False ساخته شده باشد).
+    بدنه بزرگ‌تر از max_body بایت بدون خواندن با 413 رد می‌شود.
+    بنچمارک تأخیر: bench/bench_webhook.py
+    """
+
+    def __init__(self, bot, url, secret, host="0.0.0.0", port=8443, path="/webhook", workers=4,
+                 max_body=1 << 20, batch_size=100):
+        self.bot = bot
+        self.url = url
+        self.secret = secret
+        self.path = path
+        self.max_body = max_body
+        self.batch_size = batch_size
+        self.handle = bot_handler(bot, workers)
+        self.updates = queue.Queue()  # صف آپدیت‌های دریافت شده (بدنه خام JSON)
+        self.httpd = ThreadingHTTPServer((host, port), self._make_handler())
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                if self.path != server.path:
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+                token = self.headers.get("X-Telegram-Bot-Api-Secret-Token", "")
+                if not hmac.compare_digest(token, server.secret):
+                    self.send_response(403)
+                    self.end_headers()
+                    return
+                try:
+                    length = int(self.headers.get("Content-Length", 0))
+                except ValueError:
+                    length = -1
+                if length < 0 or length > server.max_body:
+                    self.send_response(413 if length > server.max_body else 400)
+                    self.end_headers()
+                    self.close_connection = True
+                    return
+                body = self.rfile.read(length)
+                self.send_response(200)
+                self.end_headers()
+                server.updates.put(body)
+
+            def log_message(self, format, *args):
+                pass  # جلوگیری از چاپ هر درخواست در کنسول
+
+        return Handler
+
+    # آپدیت‌هایی که تا پایان دسته قبلی رسیده‌اند با هم پردازش می‌شوند
+    def _process_updates(self):
+        while True:
+            bodies = [self.updates.get()]
+            while len(bodies) < self.batch_size:
+                try:
+                    bodies.append(self.updates.get_nowait())
+                except queue.Empty:
+                    break
+            updates = []
+            for body in bodies:
+                try:
+                    updates.append(json.loads(body))
+                except ValueError as e:
+                    logger.error("❌ بدنه نامعتبر آپدیت وبهوک: %s", e)
+            try:
+                if updates:
+                    self.handle(updates)
+            except Exception as e:
+                logger.error("❌ خطا در پردازش آپدیت‌های وبهوک: %s", e)
+
+    def start(self):
+        threading.Thread(target=self._process_updates, name="webhook-worker", daemon=True).start()
+
+    def run(self):
+        self.bot.remove_webhook()
+        self.bot.set_webhook(url=self.url + self.path, secret_token=self.secret)
+        self.start()
+        logger.info("🤖 Bot is running (webhook on port %s)...", self.httpd.server_address[1])
+        try:
+            self.httpd.serve_forever()
+        finally:
+            self.httpd.server_close()
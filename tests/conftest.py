@@ -0,0 +1,85 @@
+import os
+import sys
+import pytest
+
+# ماژول‌های بات مستقیم از پوشه src وارد می‌شوند (مثل اجرای python app.py)
+SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+if SRC not in sys.path:
+    sys.path.insert(0, SRC)
+
+from app import build_app  # noqa: E402
+from config import Config  # noqa: E402
+from fake_api import FakeBotApi  # noqa: E402
+from polling import OffsetCheckpoint, PollingEngine, bot_handler  # noqa: E402
+
+TOKEN = "1:fake"
+CHANNEL_ID = -1001
+ADMIN_CHAT_ID = 999
+USER = 100
+
+
+class SimulatedClock:
+    """ساعت شبیه‌سازی شده برای کلاس‌هایی که clock و sleep قابل تعویض دارند"""
+
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += max(0.0, seconds)
+
+
+@pytest.fixture
+def clock():
+    return SimulatedClock()
+
+
+@pytest.fixture
+def api():
+    api = FakeBotApi().start()
+    yield api
+    api.stop()
+
+
+# تنظیمات بات روی شبیه‌ساز Bot API با پوشه داده موقت (مقادیر اضافه بر متغیرهای محیطی اولویت دارند)
+@pytest.fixture
+def make_config(api, tmp_path):
+    def make(**values):
+        config = Config()
+        config.values.update({
+            "TOKEN": TOKEN, "CHANNEL_ID": str(CHANNEL_ID), "ADMIN_CHAT_ID": str(ADMIN_CHAT_ID),
+            "TELEGRAM_API_URL": api.url, "DATA_DIR": str(tmp_path), "LOG_FILE": str(tmp_path / "bot.log"),
+            "LOG_LEVEL": "WARNING", "PLUGINS": "professors,review",
+        })
+        config.values.update(values)
+        return config
+
+    return make
+
+
+def replies(api, chat_id):
+    """متن پیام‌هایی که بات تا این لحظه به chat_id فرستاده است"""
+    return [params.get("text", "") for _, method, params in list(api.sent)
+            if method == "sendMessage" and params.get("chat_id") == str(chat_id)]
+
+
+class Bot:
+    """یک پروسه بات: ساخت app و موتور polling با همان تنظیمات و فایل offset"""
+
+    def __init__(self, api, config):
+        self.api = api
+        self.app = build_app(config)
+        self.engine = PollingEngine(self.app.token, bot_handler(self.app.bot), poll_timeout=0,
+                                    checkpoint=OffsetCheckpoint(self.app.data_path("offset.txt")),
+                                    settle=self.app.settle, settle_timeout=5)
+
+    # ارسال پیام کاربر و پردازش آن؛ خروجی آخرین جواب بات
+    def say(self, text, chat_id=USER):
+        self.api.push_message(chat_id, text)
+        self.poll()
+        return replies(self.api, chat_id)[-1]
+
+    def poll(self):
+        self.engine.poll_once()
@@ -0,0 +1,35 @@
+import os
+from analytics import EventLog
+
+
+def test_names_with_newlines_keep_their_codes_after_restart(tmp_path):
+    directory = str(tmp_path / "analytics")
+    course = "مدار\nالکتریکی"
+    events = EventLog(directory)
+    events.record("submitted", 1, course, "استاد\\n")
+    events.flush()
+
+    # بعد از ری‌استارت همان نام‌ها همان کدها را دارند و نام جدید کد هیچ نام قبلی را نمی‌گیرد
+    events = EventLog(directory)
+    events.record("submitted", 2, course, "استاد\\n")
+    events.record("submitted", 3, "فیزیک ۱", "استاد دیگر")
+    events.flush()
+
+    stats = events.summary()
+    assert dict(stats.top_courses) == {course: 2, "فیزیک ۱": 1}
+    assert dict(stats.top_professors) == {"استاد\\n": 2, "استاد دیگر": 1}
+
+
+def test_partial_name_line_is_dropped(tmp_path):
+    directory = str(tmp_path / "analytics")
+    events = EventLog(directory)
+    events.record("submitted", 1, "ریاضی", "استاد")
+    events.flush()
+    # قطع برنامه در حین نوشتن نام جدید، قبل از نوشتن ستون‌ها
+    with open(os.path.join(directory, "main", "strings.txt"), "a", encoding="utf-8") as file:
+        file.write("فیز")
+
+    events = EventLog(directory)
+    events.record("submitted", 2, "شیمی", "استاد")
+    events.flush()
+    assert dict(events.summary().top_courses) == {"ریاضی": 1, "شیمی": 1}
@@ -0,0 +1,18 @@
+from archive import Archive
+
+
+def test_search_ranks_small_result_sets_and_shows_newest_first_for_large_ones(tmp_path):
+    archive = Archive(str(tmp_path / "archive.db"), rank_limit=3)
+    archive.add("ریاضی عمومی", "استاد الف", "سوال درباره امتحان")
+    archive.add("فیزيك", "استاد ب", "امتحان امتحان امتحان فیزیک")
+    archive.add("شیمی", "استاد ج", "منابع امتحان")
+
+    total, posts = archive.search("فیزیک")
+    assert total == 1 and posts[0].course == "فیزيك"
+    # سه نتیجه: مرتب بر اساس ارتباط (پستی که کلمه در آن بیشتر تکرار شده اول)
+    total, posts = archive.search("امتحان")
+    assert total == 3 and posts[0].id == 2
+
+    archive.add("آمار", "استاد د", "امتحان")
+    total, posts = archive.search("امتحان", offset=1, limit=2)
+    assert total == 4 and [post.id for post in posts] == [3, 2]
@@ -0,0 +1,34 @@
+import random
+from autocomplete import NameIndex
+
+
+def test_empty_prefix_suggests_most_used_names():
+    index = NameIndex()
+    rng = random.Random(3)
+    for _ in range(3000):
+        index.add(f"درس {rng.randint(1, 200)}", rng.randint(1, 5))
+        top = [index._counts[index._top[i]] for i in range(min(8, len(index._top)))]
+        # ترتیب نام‌های هم‌تعداد مهم نیست، فقط تعدادها
+        assert top == [count for _, count in index._counts.most_common(8)]
+    assert index.suggest("", limit=3) == [index._display(key) for key in index._top[:3]]
+    assert len(index.suggest("", limit=50)) == 50
+
+
+def test_words_of_a_name_match_in_any_order():
+    index = NameIndex()
+    for name in ["ریاضی عمومی ۱", "معادلات دیفرانسیل", "دکتر احمدی"]:
+        index.add(name)
+    assert index.suggest("احم") == ["دکتر احمدی"]
+    assert index.suggest("دیفرانسیل معا") == ["معادلات دیفرانسیل"]
+    assert index.suggest("عمومی ریاضی") == ["ریاضی عمومی ۱"]
+
+
+def test_small_typos_are_suggested_when_no_prefix_matches():
+    index = NameIndex()
+    for name, count in [("ریاضی عمومی ۱", 5), ("ریاضی عمومی ۲", 3), ("معادلات دیفرانسیل", 1), ("دکتر احمدی", 1)]:
+        index.add(name, count)
+    assert index.suggest("ریضی") == ["ریاضی عمومی ۱", "ریاضی عمومی ۲"]  # حرف جا افتاده
+    assert index.suggest("معدلات دیفرانسل") == ["معادلات دیفرانسیل"]  # غلط در هر دو کلمه
+    assert index.suggest("احمدو") == ["دکتر احمدی"]  # حرف اشتباه در کلمه دوم
+    assert index.suggest("فیزیک") == []
+    assert index.suggest("رز") == []  # کلمه‌های خیلی کوتاه با غلط تایپی مقایسه نمی‌شوند
@@ -0,0 +1,92 @@
+from collections import Counter
+import pytest
+from telebot import apihelper
+from users import Broadcaster, UserRegistry
+
+USERS = 1000
+BATCH = 50
+
+
+class Crash(BaseException):
+    """توقف ناگهانی پروسه در میانه ارسال"""
+
+
+def api_error(code, description):
+    return apihelper.ApiTelegramException("sendMessage", None, {
+        "error_code": code, "description": description, "parameters": {"retry_after": 2}})
+
+
+def registry(tmp_path, users=USERS):
+    registry = UserRegistry(str(tmp_path / "users.db"))
+    for chat_id in range(1, users + 1):
+        registry.touch(chat_id)
+    return registry
+
+
+def broadcaster(users, send, clock, **options):
+    return Broadcaster(users, send, rate=25, workers=1, batch_size=BATCH, clock=clock, sleep=clock.sleep, **options)
+
+
+def test_broadcast_resumes_after_crash(tmp_path, clock):
+    users = registry(tmp_path)
+    broadcast_id = users.create_broadcast("اطلاعیه")
+    users.start_broadcast(broadcast_id)
+    received = Counter()
+
+    def crashing_send(chat_id, text):
+        if sum(received.values()) == 430:
+            raise Crash()
+        received[chat_id] += 1
+
+    with pytest.raises(Crash):
+        broadcaster(users, crashing_send, clock).run_once()
+    assert users.get_broadcast(broadcast_id).cursor == 400
+
+    # پروسه جدید با همان دیتابیس از آخرین دسته ذخیره شده ادامه می‌دهد
+    users = UserRegistry(str(tmp_path / "users.db"))
+    broadcaster(users, lambda chat_id, text: received.update([chat_id]), clock).run_once()
+
+    broadcast = users.get_broadcast(broadcast_id)
+    assert (broadcast.status, broadcast.sent, broadcast.failed) == ("done", USERS, 0)
+    assert set(received) == set(range(1, USERS + 1))
+    # فقط کاربران دسته نیمه‌کاره دوباره پیام گرفتند
+    assert sum(received.values()) - USERS == 30
+    assert all(received[chat_id] == 2 for chat_id in range(401, 431))
+
+
+def test_blocked_users_and_flood_wait(tmp_path, clock):
+    users = registry(tmp_path, 100)
+    broadcast_id = users.create_broadcast("اطلاعیه")
+    users.start_broadcast(broadcast_id)
+    flooded, sent_at = [], {}
+
+    def send(chat_id, text):
+        sent_at[chat_id] = clock()
+        if chat_id % 10 == 0:
+            raise api_error(403, "Forbidden: bot was blocked by the user")
+        if chat_id == 5 and not flooded:
+            flooded.append(clock())
+            raise api_error(429, "Too Many Requests")
+
+    broadcast = broadcaster(users, send, clock).run_broadcast(users.get_broadcast(broadcast_id))
+    assert (broadcast.status, broadcast.sent, broadcast.blocked, broadcast.failed) == ("done", 90, 10, 0)
+    assert users.count() == 90
+    # بعد از 429 همه ارسال‌ها retry_after ثانیه عقب می‌افتند و بعد با 25 پیام در ثانیه ادامه پیدا می‌کنند
+    assert sent_at[5] - flooded[0] == pytest.approx(2)
+    assert sent_at[6] - sent_at[5] == pytest.approx(1 / 25)
+
+
+def test_cancelled_broadcast_stops_after_current_batch(tmp_path, clock):
+    users = registry(tmp_path)
+    broadcast_id = users.create_broadcast("اطلاعیه")
+    users.start_broadcast(broadcast_id)
+    received = []
+
+    def send(chat_id, text):
+        received.append(chat_id)
+        if len(received) == 120:
+            users.set_status(broadcast_id, "cancelled", ("running",))
+
+    broadcaster(users, send, clock).run_once()
+    assert len(received) == 3 * BATCH
+    assert users.get_broadcast(broadcast_id).status == "cancelled"
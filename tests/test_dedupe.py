@@ -0,0 +1,29 @@
+from conftest import USER, Bot
+
+OTHER_USER = 101
+
+
+def submit(bot, chat_id, question):
+    bot.say("/start", chat_id)
+    bot.say("👨‍🏫 اساتید", chat_id)
+    bot.say("ریاضی ۱", chat_id)
+    bot.say("دکتر احمدی", chat_id)
+    return bot.say(question, chat_id)
+
+
+# دو کارگر حالت sharded با دیتابیس بررسی مشترک: سوال تکراری فرمی که کارگر دیگر ثبت کرده هم پیدا می‌شود
+def test_duplicates_are_found_across_shards(api, make_config, tmp_path):
+    shared = {"MODERATION_DB_PATH": str(tmp_path / "moderation.db"), "DUPLICATE_ACTION": "merge"}
+    first = Bot(api, make_config(**shared))
+    second = Bot(api, make_config(DATA_DIR=str(tmp_path / "shard-1"), **shared))
+
+    assert submit(first, USER, "امتحان میان‌ترم سخت است؟").startswith("فرم شما به ادمین")
+    second.engine.offset = first.engine.offset
+    assert submit(second, OTHER_USER, "امتحان میان ترم سخت است").startswith("🔁 سوال مشابهی")
+    assert second.app.moderation.count_pending() == 1
+
+
+def test_rate_limit_survives_restart(api, make_config):
+    config = make_config(FORM_RATE_LIMIT="1")
+    assert submit(Bot(api, config), USER, "امتحان میان‌ترم دارد؟").startswith("فرم شما به ادمین")
+    assert submit(Bot(api, config), USER, "پروژه دارد؟").startswith("⏳ تعداد فرم‌های شما زیاد است")
@@ -0,0 +1,16 @@
+import metrics
+from conftest import Bot
+
+
+def test_handler_error_is_counted_under_its_handler(api, make_config):
+    bot = Bot(api, make_config())
+    bot.say("/start")
+    bot.say("👨‍🏫 اساتید")
+
+    def broken_save(chat_id, form):
+        raise RuntimeError("disk full")
+
+    bot.app.forms.save = broken_save
+    before = metrics.handler_errors.values.get("get_course", 0)
+    assert bot.say("ریاضی ۱").startswith("⛔")
+    assert metrics.handler_errors.values["get_course"] == before + 1
@@ -0,0 +1,32 @@
+import pytest
+from conftest import Bot, replies
+from form_store import FormState, FormStore, MemoryFormStore
+
+FIRST, SECOND = 100, 101
+
+
+def test_form_store_interface_is_abstract():
+    with pytest.raises(TypeError):
+        FormStore(ttl=60)
+
+
+def test_memory_store_evicts_oldest_form():
+    store = MemoryFormStore(ttl=60, max_entries=1)
+    store.save(FIRST, FormState(course="ریاضی"))
+    store.save(SECOND, FormState(course="فیزیک"))
+    assert store.get(FIRST) is None and store.get(SECOND).course == "فیزیک"
+
+
+# فرمی که در میانه مراحل حذف شده (سقف FORM_MAX_ENTRIES) دوباره از اول شروع می‌شود، بدون خطا
+def test_evicted_form_restarts_instead_of_failing(api, make_config):
+    bot = Bot(api, make_config(FORM_MAX_ENTRIES="1"))
+    for chat_id in (FIRST, SECOND):
+        bot.say("/start", chat_id)
+        assert bot.say("👨‍🏫 اساتید", chat_id).startswith("لطفاً نام درس")
+
+    bot.say("ریاضی ۱", FIRST)
+    expired, restarted = replies(api, FIRST)[-2:]
+    assert expired.startswith("⌛ فرم شما منقضی شده") and restarted.startswith("لطفاً نام درس")
+    assert bot.say("ریاضی ۱", FIRST).startswith("اسم استاد")
+    assert bot.say("دکتر احمدی", FIRST).startswith("سوال خود را")
+
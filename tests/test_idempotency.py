@@ -0,0 +1,131 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from telebot import types
+from app import build_app
+from conftest import ADMIN_CHAT_ID, CHANNEL_ID, USER, Bot, replies
+from idempotency import KeyedLocks, Ledger
+
+THREADS = 16
+OTHER_USER = 101
+
+
+def run_together(func, count=THREADS):
+    barrier = threading.Barrier(count)
+
+    def run(index):
+        barrier.wait()
+        return func(index)
+
+    with ThreadPoolExecutor(count) as executor:
+        return list(executor.map(run, range(count)))
+
+
+def test_ledger_adds_each_key_once_across_threads():
+    ledger = Ledger()
+    added = run_together(lambda index: sum(ledger.add(key) for key in range(1000)))
+    assert sum(added) == 1000
+    assert len(ledger) == 1000
+
+
+def test_ledger_ttl_and_capacity(clock):
+    ledger = Ledger(ttl=10, capacity=3, clock=clock)
+    for key in "abcd":
+        assert ledger.add(key)
+    assert "a" not in ledger and "d" in ledger
+    assert not ledger.add("d")
+    clock.sleep(10)
+    assert "d" not in ledger
+    assert ledger.add("d")
+
+
+def test_keyed_locks_admit_one_holder_per_key():
+    locks = KeyedLocks()
+    inside = {"a": 0, "b": 0}
+    overlaps = []
+    guard = threading.Lock()
+
+    def hold(index):
+        key = "ab"[index % 2]
+        with locks.hold(key) as acquired:
+            if not acquired:
+                return False
+            with guard:
+                inside[key] += 1
+                overlaps.append(inside[key])
+            time.sleep(0.05)
+            with guard:
+                inside[key] -= 1
+            return True
+
+    acquired = run_together(hold)
+    assert max(overlaps) == 1
+    # هر کلید حداقل یک بار گرفته شده و قفل‌های بی‌استفاده حذف شده‌اند
+    assert 2 <= sum(acquired) < THREADS
+    assert len(locks) == 0
+
+
+# دوبار زدن یک دکمه (آیدی callback جدا) و آپدیت تکراری (همان آیدی) همزمان در چند ترد
+def test_parallel_duplicate_callbacks_run_once(api, make_config):
+    app = build_app(make_config())
+    runs = []
+
+    @app.callback("vote", key=lambda call, parts: ("vote", int(parts[1])))
+    def vote(call, parts):
+        runs.append(call.data)
+        time.sleep(0.05)
+
+    for index in range(THREADS):
+        data = "vote_2" if index // 2 % 4 == 0 else "vote_1"
+        api.push_callback(USER, 10, data, callback_id=f"press-{index // 2}")
+    updates = [types.Update.de_json(update) for update in api.get_updates()]
+
+    run_together(lambda index: app.bot.process_new_updates([updates[index]]))
+    assert sorted(runs) == ["vote_1", "vote_2"]
+
+
+def submit(bot, chat_id, question):
+    bot.say("/start", chat_id)
+    bot.say("👨‍🏫 اساتید", chat_id)
+    bot.say("ریاضی ۱", chat_id)
+    bot.say("دکتر احمدی", chat_id)
+    assert bot.say(question, chat_id).startswith("فرم شما به ادمین")
+
+
+# دکمه‌های واقعی صفحه بررسی: یک تأیید دو بار زده شده، آپدیت تکراری همان دکمه و تأیید همه که همزمان
+# اجرا می‌شوند؛ هر فرم فقط یک تصمیم، یک پیام به کاربر و یک پست در کانال دارد
+def test_duplicate_review_callbacks_publish_each_form_once(api, make_config):
+    bot = Bot(api, make_config(POSTS_PER_MINUTE="600"))
+    submit(bot, USER, "امتحان میان‌ترم دارد؟")
+    submit(bot, OTHER_USER, "حضور و غیاب سخت است؟")
+    first, second = [form.id for form in bot.app.moderation.page(0, 5)]
+
+    presses = [(f"confirm_{first}_0", "press-1"), (f"confirm_{first}_0", "press-2"),
+               (f"confirm_{first}_0", "press-2"), (f"approveall_{first}_{second}_0", "press-3")]
+    for data, callback_id in presses * (THREADS // len(presses)):
+        api.push_callback(ADMIN_CHAT_ID, 10, data, callback_id=callback_id)
+    updates = [types.Update.de_json(update) for update in api.get_updates()]
+    run_together(lambda index: bot.app.bot.process_new_updates([updates[index]]))
+
+    assert bot.app.moderation.count_pending() == 0
+    assert [form.id for form in bot.app.moderation.approved_since()[0]] == [first, second]
+    bot.app.start_background_jobs()
+    assert wait_for(lambda: len(channel_posts(api)) >= 2)
+    time.sleep(0.3)
+    assert sorted(text.count("امتحان میان‌ترم") for text in channel_posts(api)) == [0, 1]
+    for chat_id in (USER, OTHER_USER):
+        assert sum(text.startswith("✅ فرم شما تأیید شد") for text in replies(api, chat_id)) == 1
+
+
+def channel_posts(api):
+    return [params["text"] for _, method, params in list(api.sent)
+            if method == "sendMessage" and params.get("chat_id") == str(CHANNEL_ID)]
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return False
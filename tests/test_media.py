@@ -0,0 +1,15 @@
+from media import Attachment, FileCache
+
+
+def test_resolve_uses_latest_file_id(tmp_path):
+    files = FileCache(str(tmp_path / "media.db"))
+    files.remember([Attachment("photo", "old-id", "exam-1")])
+    files.remember([Attachment("photo", "new-id", "exam-1")])
+
+    resolved = files.resolve([Attachment("photo", "old-id", "exam-1"), Attachment("document", "doc-id", "notes")])
+    assert resolved == [Attachment("photo", "new-id", "exam-1"), Attachment("document", "doc-id", "notes")]
+
+
+def test_cache_survives_restart(tmp_path):
+    FileCache(str(tmp_path / "media.db")).remember([Attachment("photo", "id-1", "exam-1")])
+    assert FileCache(str(tmp_path / "media.db")).get("exam-1") == ("photo", "id-1", None)
@@ -0,0 +1,261 @@
+import asyncio
+import threading
+import time
+import pytest
+from requests.exceptions import ConnectionError as NetworkError
+from telebot import apihelper, asyncio_helper
+from telebot.apihelper import ApiException
+from async_runner import AsyncRunner
+from polling import Backoff, CircuitBreaker, OffsetCheckpoint, PollingEngine, bot_handler
+from conftest import TOKEN
+
+
+def message_update(update_id, chat_id, text="سلام"):
+    return {"update_id": update_id, "message": {
+        "message_id": update_id, "date": 0, "text": text,
+        "from": {"id": chat_id, "is_bot": False, "first_name": "user"}, "chat": {"id": chat_id, "type": "private"},
+    }}
+
+
+class SlowBot:
+    """بات ساختگی که هر آپدیت را با تأخیر پردازش و ترتیب پردازش را ثبت می‌کند"""
+
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.processed = []
+        self.threads = set()
+        self._lock = threading.Lock()
+
+    def process_new_updates(self, updates):
+        time.sleep(self.delay)
+        with self._lock:
+            self.threads.add(threading.current_thread().name)
+            self.processed += [(update.message.chat.id, update.update_id) for update in updates]
+
+
+class RecordingCheckpoint(OffsetCheckpoint):
+    """checkpoint که وضعیت پردازش را در لحظه ذخیره offset ثبت می‌کند"""
+
+    def __init__(self, path, bot):
+        super().__init__(path)
+        self.bot = bot
+        self.saves = []
+
+    def save(self, offset):
+        self.saves.append((offset, len(self.bot.processed)))
+        super().save(offset)
+
+
+def engine_for(updates, handle, checkpoint=None, **kwargs):
+    engine = PollingEngine(TOKEN, handle, checkpoint=checkpoint, poll_timeout=0, **kwargs)
+    batches = [updates]
+    engine.fetch = lambda: batches.pop(0) if batches else []
+    return engine
+
+
+def test_offset_is_saved_after_all_handlers_finish(tmp_path):
+    bot = SlowBot()
+    checkpoint = RecordingCheckpoint(str(tmp_path / "offset.txt"), bot)
+    updates = [message_update(10 + i, chat_id=i % 4) for i in range(12)]
+    engine = engine_for(updates, bot_handler(bot, workers=4), checkpoint)
+
+    engine.poll_once()
+
+    assert checkpoint.saves == [(22, 12)]
+    assert OffsetCheckpoint(checkpoint.path).load() == 22
+
+
+def test_batch_keeps_chat_order_and_runs_chats_in_parallel(tmp_path):
+    bot = SlowBot()
+    updates = [message_update(1 + i, chat_id=i % 4) for i in range(12)]
+    engine = engine_for(updates, bot_handler(bot, workers=4))
+
+    started = time.monotonic()
+    engine.poll_once()
+
+    for chat_id in range(4):
+        assert [update_id for chat, update_id in bot.processed if chat == chat_id] == list(range(1 + chat_id, 13, 4))
+    assert len(bot.threads) > 1
+    assert time.monotonic() - started < 12 * bot.delay
+
+
+def test_offset_is_not_saved_until_batch_settles(tmp_path):
+    bot = SlowBot(delay=0)
+    checkpoint = OffsetCheckpoint(str(tmp_path / "offset.txt"))
+    settled = []
+    engine = engine_for([message_update(5, 1)], bot_handler(bot), checkpoint,
+                        settle=lambda timeout: bool(settled))
+
+    engine.poll_once()
+    assert engine.offset == 6
+    assert checkpoint.load() is None
+
+    settled.append(True)
+    engine.fetch = lambda: [message_update(6, 1)]
+    engine.poll_once()
+    assert checkpoint.load() == 7
+
+
+def test_failing_handler_does_not_block_the_offset(tmp_path):
+    class BrokenBot:
+        def process_new_updates(self, updates):
+            raise RuntimeError("handler failed")
+
+    checkpoint = OffsetCheckpoint(str(tmp_path / "offset.txt"))
+    engine = engine_for([message_update(1, 1), message_update(2, 2)], bot_handler(BrokenBot()), checkpoint)
+    engine.poll_once()
+    assert checkpoint.load() == 3
+
+
+def test_restart_resumes_from_saved_offset(tmp_path):
+    path = str(tmp_path / "offset.txt")
+    OffsetCheckpoint(path).save(42)
+    assert PollingEngine(TOKEN, None, checkpoint=OffsetCheckpoint(path)).offset == 42
+
+
+def test_network_errors_back_off_and_open_the_breaker():
+    engine = PollingEngine(TOKEN, None, backoff=Backoff(base=1, maximum=8),
+                           breaker=CircuitBreaker(threshold=3, cooldown=30))
+    delays = []
+    engine._sleep = delays.append
+
+    def fetch():
+        raise NetworkError("connection refused")
+
+    engine.fetch = fetch
+    for _ in range(3):
+        engine.poll_once()
+    assert engine.breaker.is_open
+    assert all(0 <= delay <= maximum for delay, maximum in zip(delays, (1, 2, 4)))
+
+    engine.poll_once()  # مدار باز است: درخواستی فرستاده نمی‌شود و تا پایان cooldown صبر می‌شود
+    assert engine.backoff.attempts == 3
+    assert 29 < delays[-1] <= 30
+
+
+def test_flood_error_waits_for_retry_after():
+    engine = PollingEngine(TOKEN, None)
+    delays = []
+    engine._sleep = delays.append
+
+    def fetch():
+        raise apihelper.ApiTelegramException("getUpdates", None, {
+            "error_code": 429, "description": "Too Many Requests", "parameters": {"retry_after": 7}})
+
+    engine.fetch = fetch
+    engine.poll_once()
+    assert delays == [7]
+
+
+def test_updates_sent_during_partition_arrive_once(api, tmp_path, monkeypatch):
+    monkeypatch.setattr(apihelper, "API_URL", api.url + "/bot{0}/{1}")
+    bot = SlowBot(delay=0)
+    checkpoint = OffsetCheckpoint(str(tmp_path / "offset.txt"))
+    engine = PollingEngine(TOKEN, bot_handler(bot), checkpoint=checkpoint, poll_timeout=0,
+                           backoff=Backoff(base=0.05, maximum=0.2), breaker=CircuitBreaker(threshold=100))
+    engine.running = True
+    first = api.push_message(1, "قبل از قطعی")
+    engine.poll_once()
+
+    api.partition(0.5)
+    during = [api.push_message(chat_id, "در حین قطعی") for chat_id in (1, 2, 3)]
+    deadline = time.monotonic() + 10
+    while len(bot.processed) < 4 and time.monotonic() < deadline:
+        engine.poll_once()
+
+    assert engine.breaker.failures == 0
+    assert sorted(update_id for _, update_id in bot.processed) == [first] + during
+    assert checkpoint.load() == during[-1] + 1
+
+
+def test_async_runner_saves_offset_after_handlers(api, tmp_path, monkeypatch):
+    monkeypatch.setattr(asyncio_helper, "API_URL", api.url + "/bot{0}/{1}")
+    bot = SlowBot()
+    checkpoint = RecordingCheckpoint(str(tmp_path / "offset.txt"), bot)
+    runner = AsyncRunner(bot, TOKEN, workers=4, poll_timeout=0, checkpoint=checkpoint)
+    updates = [api.push_message(i % 3, f"پیام {i}") for i in range(9)]
+
+    async def run():
+        task = asyncio.ensure_future(runner.poll())
+        while not checkpoint.saves or checkpoint.saves[-1][0] != updates[-1] + 1:
+            await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        await runner.async_bot.close_session()
+
+    asyncio.run(asyncio.wait_for(run(), 10))
+    # هر offset ذخیره شده فقط آپدیت‌های تمام شده را رد می‌کند
+    assert all(offset - updates[0] <= processed for offset, processed in checkpoint.saves)
+    assert checkpoint.saves[-1] == (updates[-1] + 1, 9)
+
+
+class ChatDelayBot(SlowBot):
+    """SlowBot که آپدیت‌های یک چت را خیلی کندتر پردازش می‌کند"""
+
+    def __init__(self, slow_chat, slow_delay, delay=0.01):
+        super().__init__(delay)
+        self.slow_chat = slow_chat
+        self.slow_delay = slow_delay
+
+    def process_new_updates(self, updates):
+        if updates[0].message.chat.id == self.slow_chat:
+            time.sleep(self.slow_delay)
+        super().process_new_updates(updates)
+
+
+def test_async_runner_saves_offset_up_to_a_slow_handler(api, tmp_path, monkeypatch):
+    monkeypatch.setattr(asyncio_helper, "API_URL", api.url + "/bot{0}/{1}")
+    bot = ChatDelayBot(slow_chat=5, slow_delay=1.0)
+    checkpoint = RecordingCheckpoint(str(tmp_path / "offset.txt"), bot)
+    runner = AsyncRunner(bot, TOKEN, workers=4, poll_timeout=0, checkpoint=checkpoint)
+    first = [api.push_message(chat_id, "سلام") for chat_id in (1, 2)]
+    slow = api.push_message(5, "کند")
+    later = []
+
+    async def wait_for(condition):
+        while not condition():
+            await asyncio.sleep(0.01)
+
+    async def run():
+        task = asyncio.ensure_future(runner.poll())
+        # آپدیت‌های قبل از هندلر کند ذخیره می‌شوند و آپدیت‌های بعدی منتظر آن نمی‌مانند
+        await wait_for(lambda: checkpoint.saves and checkpoint.saves[-1][0] == slow)
+        later.append(api.push_message(1, "بعدی"))
+        await wait_for(lambda: (1, later[0]) in bot.processed)
+        assert (5, slow) not in bot.processed
+        assert checkpoint.load() == slow
+        await wait_for(lambda: checkpoint.saves[-1][0] == later[0] + 1)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        await runner.async_bot.close_session()
+
+    asyncio.run(asyncio.wait_for(run(), 10))
+    assert sorted(update_id for _, update_id in bot.processed) == first + [slow] + later
+
+
+# telebot خطای لغو در حین خواندن جواب getUpdates را به ApiException تبدیل می‌کند
+def test_async_runner_stops_when_cancelled_during_fetch():
+    runner = AsyncRunner(SlowBot(), TOKEN, poll_timeout=0)
+    converted = []
+
+    async def get_updates(**kwargs):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            if converted:
+                raise
+            converted.append(True)
+            raise ApiException("invalid JSON response", "getUpdates", None)
+
+    runner.async_bot.get_updates = get_updates
+
+    async def run():
+        task = asyncio.ensure_future(runner.poll())
+        await asyncio.sleep(0.05)
+        task.cancel()
+        await asyncio.wait([task], timeout=2)
+        assert converted and task.cancelled()
+
+    asyncio.run(run())
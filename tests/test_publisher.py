@@ -0,0 +1,117 @@
+import datetime
+from moderation import ModerationQueue
+from publisher import PublishScheduler, parse_quiet_hours
+
+
+def approve(moderation, course, count=1):
+    ids = [moderation.add(1, course, "استاد", f"سوال {i}", f"متن {course} {i}") for i in range(count)]
+    moderation.decide(ids[0], ids[-1], "approved")
+    return ids
+
+
+# اجرای زمان‌بند با ساعت شبیه‌سازی شده تا وقتی فرمی نماند؛ خروجی (زمان، آیدی) پست‌ها
+def drain(scheduler, clock, posted):
+    while True:
+        wait = scheduler.run_once()
+        if wait == scheduler.poll_interval and scheduler.next_slot <= clock():
+            return posted
+        clock.sleep(wait)
+
+
+def test_rate_limit_and_course_fairness(tmp_path, clock):
+    moderation = ModerationQueue(str(tmp_path / "moderation.db"))
+    math_ids = approve(moderation, "ریاضی", 3)
+    physics_ids = approve(moderation, "فیزیک", 1)
+    posted = []
+
+    def publish(form, on_sent, on_failed):
+        posted.append((clock(), form.id))
+        on_sent(None)
+
+    scheduler = PublishScheduler(moderation, publish, posts_per_minute=30, clock=clock)
+    drain(scheduler, clock, posted)
+
+    # درسی که پست نداشته قبل از فرم‌های بعدی درس دیگر منتشر می‌شود
+    assert [form_id for _, form_id in posted] == [math_ids[0], physics_ids[0], math_ids[1], math_ids[2]]
+    times = [at for at, _ in posted]
+    assert all(b - a == 2.0 for a, b in zip(times, times[1:]))
+    assert moderation.unposted() == []
+
+
+def test_forms_approved_later_are_queued(tmp_path, clock):
+    moderation = ModerationQueue(str(tmp_path / "moderation.db"))
+    pending = [moderation.add(1, "ریاضی", "استاد", f"سوال {i}", f"متن {i}") for i in range(3)]
+    posted = []
+    scheduler = PublishScheduler(moderation, lambda form, on_sent, on_failed: posted.append(form.id), clock=clock)
+    assert scheduler.run_once() == scheduler.poll_interval
+
+    # تأیید خارج از ترتیب آیدی؛ قدیمی‌ترین فرم تأیید شده اول منتشر می‌شود
+    moderation.decide(pending[2], pending[2], "approved")
+    moderation.decide(pending[0], pending[0], "approved")
+    moderation.decide(pending[1], pending[1], "rejected")
+    drain(scheduler, clock, posted)
+    assert posted == [pending[0], pending[2]]
+
+
+def test_unconfirmed_send_is_published_after_restart(tmp_path, clock):
+    path = str(tmp_path / "moderation.db")
+    moderation = ModerationQueue(path)
+    sent, lost = approve(moderation, "ریاضی", 2)
+    callbacks = {}
+    scheduler = PublishScheduler(moderation, lambda form, on_sent, on_failed: callbacks.update({form.id: on_sent}), clock=clock)
+    drain(scheduler, clock, [])
+    callbacks[sent](None)  # فقط ارسال فرم اول تأیید شد و بعد بات متوقف شد
+
+    moderation = ModerationQueue(path)
+    assert moderation.release_unsent() == 1
+    posted = []
+    scheduler = PublishScheduler(moderation, lambda form, on_sent, on_failed: posted.append(form.id), clock=clock)
+    drain(scheduler, clock, posted)
+    assert posted == [lost]
+
+
+def test_claimed_form_is_not_published_twice(tmp_path, clock):
+    moderation = ModerationQueue(str(tmp_path / "moderation.db"))
+    form_id, = approve(moderation, "ریاضی")
+    posted = []
+    first = PublishScheduler(moderation, lambda form, on_sent, on_failed: posted.append(form.id), clock=clock)
+    second = PublishScheduler(moderation, lambda form, on_sent, on_failed: posted.append(form.id), clock=clock)
+    drain(first, clock, posted)
+    drain(second, clock, posted)
+    assert posted == [form_id]
+
+
+# ارسال رها شده فرم را آزاد می‌کند و فرم بعد از بقیه فرم‌های درس (بدون ری‌استارت) منتشر می‌شود
+def test_failed_send_is_published_on_a_later_attempt(tmp_path, clock):
+    moderation = ModerationQueue(str(tmp_path / "moderation.db"))
+    failing, other = approve(moderation, "ریاضی", 2)
+    attempts, posted = [], []
+
+    def publish(form, on_sent, on_failed):
+        attempts.append(form.id)
+        if attempts.count(form.id) == 1 and form.id == failing:
+            on_failed(RuntimeError("Bad Request"))
+        else:
+            posted.append(form.id)
+            on_sent(None)
+
+    scheduler = PublishScheduler(moderation, publish, posts_per_minute=30, clock=clock)
+    drain(scheduler, clock, posted)
+    assert attempts == [failing, other, failing]
+    assert posted == [other, failing]
+    assert moderation.unposted() == [] and moderation.release_unsent() == 0
+
+
+def test_quiet_hours(tmp_path, clock):
+    moderation = ModerationQueue(str(tmp_path / "moderation.db"))
+    approve(moderation, "ریاضی")
+    posted = []
+    scheduler = PublishScheduler(moderation, lambda form, on_sent, on_failed: posted.append(form.id),
+                                 quiet_hours=parse_quiet_hours("23:30-07:00"), clock=clock)
+    clock.now = datetime.datetime(2024, 1, 1, 23, 45).timestamp()
+
+    assert scheduler.run_once() == 7 * 3600 + 15 * 60
+    assert posted == []
+    clock.now = datetime.datetime(2024, 1, 2, 7, 0).timestamp()
+    scheduler.run_once()
+    assert len(posted) == 1
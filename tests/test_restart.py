@@ -0,0 +1,56 @@
+"""کشتن بات در میانه فرم و اجرای دوباره آن روی همان پوشه داده؛ کاربر باید از همان مرحله ادامه دهد"""
+import pytest
+from app import build_app
+from conftest import USER, Bot, replies
+
+
+def start_form(bot):
+    bot.say("/start")
+    assert bot.say("👨‍🏫 اساتید").startswith("لطفاً نام درس")
+
+
+def test_user_continues_form_after_restart(api, make_config):
+    config = make_config(STEP_STORE="sqlite", FORM_STORE="sqlite")
+    bot = Bot(api, config)
+    start_form(bot)
+    assert bot.say("ریاضی ۱").startswith("اسم استاد")
+
+    restarted = Bot(api, config)  # پروسه قبلی بدون خروج عادی کنار گذاشته می‌شود
+    assert restarted.say("دکتر احمدی").startswith("سوال خود را")
+    assert restarted.say("امتحان میان‌ترم دارد؟").startswith("فرم شما به ادمین")
+    form = restarted.app.moderation.page(0, 5)[0]
+    assert (form.chat_id, form.professors, form.question) == (USER, "دکتر احمدی", "امتحان میان‌ترم دارد؟")
+
+
+def test_update_is_processed_again_when_bot_dies_before_settling(api, make_config):
+    config = make_config(STEP_STORE="sqlite", FORM_STORE="sqlite")
+    bot = Bot(api, config)
+    start_form(bot)
+    # بات قبل از ماندگار شدن نتیجه آپدیت (ارسال سوال بعدی و نوشتن مرحله) از کار می‌افتد
+    bot.engine.settle = lambda timeout: False
+    course_update = api.push_message(USER, "ریاضی ۱")
+    bot.poll()
+
+    restarted = Bot(api, config)
+    restarted.poll()
+    assert api.deliveries[course_update] == 2
+    assert replies(api, USER)[-1].startswith("اسم استاد")
+    assert restarted.say("دکتر احمدی").startswith("سوال خود را")
+
+
+
+# فقط STEP_STORE=sqlite: فرم‌ها هم به صورت پیش‌فرض در SQLite ذخیره می‌شوند
+def test_default_form_store_follows_step_store(api, make_config):
+    config = make_config(STEP_STORE="sqlite")
+    bot = Bot(api, config)
+    start_form(bot)
+    assert bot.say("ریاضی ۱").startswith("اسم استاد")
+
+    restarted = Bot(api, config)
+    assert restarted.say("دکتر احمدی").startswith("سوال خود را")
+    assert restarted.say("امتحان میان‌ترم دارد؟").startswith("فرم شما به ادمین")
+
+
+def test_steps_in_sqlite_with_forms_in_memory_are_rejected(make_config):
+    with pytest.raises(ValueError):
+        build_app(make_config(STEP_STORE="sqlite", FORM_STORE="memory"))
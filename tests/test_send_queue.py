@@ -0,0 +1,91 @@
+import threading
+import time
+from telebot.apihelper import ApiTelegramException
+from send_queue import SendQueue
+
+
+class BlockingBot:
+    """بات ساختگی که ارسال پیام را تا باز شدن gate نگه می‌دارد"""
+
+    def __init__(self):
+        self.gate = threading.Event()
+        self.sent = []
+
+    def send_message(self, chat_id, text, **kwargs):
+        self.gate.wait(5)
+        self.sent.append((chat_id, text))
+        return text
+
+
+def test_wait_replies_waits_for_private_chats():
+    bot = BlockingBot()
+    outbox = SendQueue(bot, workers=2)
+    outbox.send_message(1, "سوال بعدی")
+    assert not outbox.wait_replies(0.2)
+
+    bot.gate.set()
+    assert outbox.wait_replies(5)
+    assert bot.sent == [(1, "سوال بعدی")]
+
+
+def test_wait_replies_ignores_channel_posts():
+    bot = BlockingBot()
+    outbox = SendQueue(bot, workers=1)
+    outbox.send_message(-1001, "پست کانال")
+    assert outbox.wait_replies(0.2)
+    bot.gate.set()
+
+
+def test_wait_replies_covers_coalesced_messages():
+    bot = BlockingBot()
+    outbox = SendQueue(bot, workers=1, coalesce_chats=[999])
+    outbox.send_message(999, "اعلان اول")
+    outbox.send_message(999, "اعلان دوم")
+    outbox.send_message(999, "اعلان سوم")
+    bot.gate.set()
+
+    assert outbox.wait_replies(5)
+    assert "".join(text for _, text in bot.sent).count("اعلان") == 3
+
+
+class RejectingBot:
+    def send_message(self, chat_id, text, **kwargs):
+        raise ApiTelegramException("sendMessage", None, {"error_code": 400, "description": "Bad Request"})
+
+
+def test_abandoned_message_calls_on_failed():
+    outbox = SendQueue(RejectingBot(), workers=1)
+    failed, sent = threading.Event(), []
+    outbox.send_message(-1001, "پست کانال", on_sent=sent.append, on_failed=lambda error: failed.set())
+    assert failed.wait(5)
+    assert sent == [] and outbox.stats["failed"] == 1
+
+
+class CountingBot:
+    def __init__(self):
+        self.sent = []
+
+    def send_message(self, chat_id, text, **kwargs):
+        self.sent.append((chat_id, text))
+        return text
+
+
+def test_counters_are_exact_with_many_workers():
+    bot = CountingBot()
+    outbox = SendQueue(bot, workers=8, global_rate=10000)
+    for chat_id in range(1, 201):
+        for i in range(3):
+            outbox.send_message(chat_id, f"پیام {i}")
+    assert outbox.wait_replies(10)
+    assert outbox.stats["sent"] == len(bot.sent) == 600
+
+
+def test_interactive_replies_are_not_throttled():
+    bot = CountingBot()
+    outbox = SendQueue(bot, workers=2)
+    started = time.monotonic()
+    for i in range(5):
+        outbox.send_message(1, f"پیام {i}")
+    assert outbox.wait_replies(5)
+    assert time.monotonic() - started < 0.5
+    assert [text for _, text in bot.sent] == [f"پیام {i}" for i in range(5)]
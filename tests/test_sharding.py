@@ -0,0 +1,60 @@
+import queue
+import threading
+from polling import OffsetCheckpoint
+from sharding import Supervisor, process_updates
+from conftest import TOKEN
+from test_polling import SlowBot, message_update
+
+
+def worker(index, workers, updates, acks):
+    pass
+
+
+def supervisor(tmp_path, workers=2):
+    return Supervisor(TOKEN, worker, workers=workers, checkpoint=OffsetCheckpoint(str(tmp_path / "offset.txt")))
+
+
+def drain(updates):
+    result = []
+    while True:
+        try:
+            result.append(updates.get(timeout=0.5)["update_id"])
+        except queue.Empty:
+            return result
+
+
+# offset فقط تا اولین آپدیت تأیید نشده جلو می‌رود، حتی اگر آپدیت‌های بعدی زودتر تأیید شوند
+def test_offset_waits_for_worker_acknowledgements(tmp_path):
+    shards = supervisor(tmp_path)
+    shards.dispatch([message_update(1, 10), message_update(2, 11), message_update(3, 10)])
+    shards.acknowledge([2])
+    assert shards.checkpoint.load() == 1
+    shards.acknowledge([1])
+    assert shards.checkpoint.load() == 3
+    shards.acknowledge([3])
+    assert shards.checkpoint.load() == 4
+    assert Supervisor(TOKEN, worker, checkpoint=shards.checkpoint).engine.offset == 4
+
+
+def test_restarted_worker_gets_unacknowledged_updates(tmp_path, monkeypatch):
+    shards = supervisor(tmp_path)
+    monkeypatch.setattr(shards, "_start_worker", lambda index: None)
+    shards.dispatch([message_update(1, 10), message_update(2, 11), message_update(3, 10), message_update(4, 10)])
+    shards.acknowledge([1])
+    shards._restart_worker(0)
+    assert drain(shards.queues[0]) == [3, 4]
+    assert drain(shards.queues[1]) == [2]
+
+
+def test_worker_acknowledges_only_settled_updates():
+    updates, acks, bot = queue.Queue(), queue.Queue(), SlowBot(delay=0)
+    settled = iter([False, True])
+    for update_id in (1, 2):
+        updates.put(message_update(update_id, 10))
+    process = threading.Thread(
+        target=process_updates, args=(bot, updates, acks), kwargs={"settle": lambda timeout: next(settled, True)},
+        daemon=True,
+    )
+    process.start()
+    assert acks.get(timeout=5) == [1, 2]
+    assert bot.processed == [(10, 1), (10, 2)]
@@ -0,0 +1,62 @@
+from telebot import Handler
+from step_store import SqliteStepBackend
+
+
+def get_course(message):
+    pass
+
+
+def get_professor(message):
+    pass
+
+
+def backend(tmp_path, flush_interval=0):
+    return SqliteStepBackend(str(tmp_path / "steps.db"), steps=[get_course, get_professor],
+                             flush_interval=flush_interval)
+
+
+def test_flushed_step_is_loaded_after_restart(tmp_path):
+    steps = backend(tmp_path)
+    steps.register_handler(1, Handler(get_course))
+    steps.register_handler(2, Handler(get_professor))
+    steps.flush()
+
+    restarted = backend(tmp_path)
+    assert [handler.callback for handler in restarted.get_handlers(1)] == [get_course]
+    assert [handler.callback for handler in restarted.get_handlers(2)] == [get_professor]
+
+
+def test_step_is_not_written_before_flush(tmp_path):
+    steps = backend(tmp_path)
+    steps.register_handler(1, Handler(get_course))
+
+    assert backend(tmp_path).get_handlers(1) is None
+
+
+def test_consumed_step_is_deleted(tmp_path):
+    steps = backend(tmp_path)
+    steps.register_handler(1, Handler(get_course))
+    steps.flush()
+    assert steps.get_handlers(1)
+    steps.flush()
+
+    assert backend(tmp_path).get_handlers(1) is None
+
+
+def test_last_registered_step_wins(tmp_path):
+    steps = backend(tmp_path)
+    steps.register_handler(1, Handler(get_course))
+    steps.flush()
+    steps.get_handlers(1)
+    steps.register_handler(1, Handler(get_professor))
+    steps.flush()
+
+    assert [handler.callback for handler in backend(tmp_path).get_handlers(1)] == [get_professor]
+
+
+def test_unregistered_step_is_not_stored(tmp_path):
+    steps = backend(tmp_path)
+    steps.register_handler(1, Handler(lambda message: None))
+    steps.flush()
+
+    assert backend(tmp_path).get_handlers(1) is None
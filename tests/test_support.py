@@ -0,0 +1,21 @@
+from plugins.support import clip
+from send_queue import MAX_MESSAGE_LENGTH
+from tickets import TicketStore
+
+
+def test_reply_to_closed_ticket_is_not_delivered(tmp_path):
+    tickets = TicketStore(str(tmp_path / "tickets.db"))
+    ticket_id, _ = tickets.add_message(100, "سلام")
+    assert tickets.add_reply(ticket_id, "جواب اول") == 100
+    tickets.close(ticket_id)
+
+    assert tickets.add_reply(ticket_id, "جواب دیر") is None
+    assert [item.text for item in tickets.get(ticket_id).messages] == ["سلام", "جواب اول"]
+
+
+def test_clip_keeps_header_and_suffix():
+    text = clip("📜 تیکت #7\n" + "پیام " * 2000, "\n\n↩️ reply")
+    assert len(text) == MAX_MESSAGE_LENGTH
+    assert text.startswith("📜 تیکت #7\n")
+    assert text.endswith("…\n\n↩️ reply")
+    assert clip("کوتاه", "!") == "کوتاه!"
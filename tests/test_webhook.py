@@ -0,0 +1,62 @@
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+import pytest
+from webhook_server import WebhookServer
+from test_polling import SlowBot, message_update
+
+SECRET = "test-secret"
+
+
+@pytest.fixture
+def serve():
+    servers = []
+
+    def start(bot, **options):
+        server = WebhookServer(bot, "https://example.invalid", SECRET, host="127.0.0.1", port=0, **options)
+        server.start()
+        threading.Thread(target=server.httpd.serve_forever, daemon=True).start()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.httpd.shutdown()
+        server.httpd.server_close()
+
+
+def post(server, body, secret=SECRET):
+    request = urllib.request.Request(
+        f"http://127.0.0.1:{server.httpd.server_address[1]}/webhook", body, method="POST",
+        headers={"Content-Type": "application/json", "X-Telegram-Bot-Api-Secret-Token": secret})
+    try:
+        with urllib.request.urlopen(request) as response:
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+
+
+# آپدیت‌هایی که همزمان از تلگرام می‌رسند مثل polling اجرا می‌شوند: هر چت به ترتیب، چت‌ها موازی
+def test_updates_keep_chat_order_and_run_chats_in_parallel(serve):
+    bot = SlowBot(delay=0.02)
+    server = serve(bot, workers=4)
+    updates = [message_update(update_id, 1 + update_id % 4) for update_id in range(1, 41)]
+    for update in updates:
+        assert post(server, json.dumps(update).encode("utf-8")) == 200
+    deadline = time.monotonic() + 5
+    while len(bot.processed) < len(updates) and time.monotonic() < deadline:
+        time.sleep(0.05)
+    for chat_id in range(1, 5):
+        chat = [update_id for processed_chat, update_id in bot.processed if processed_chat == chat_id]
+        assert chat == sorted(chat) and len(chat) == 10
+    assert len(bot.threads) > 1
+
+
+def test_oversized_and_unauthorized_bodies_are_rejected(serve):
+    bot = SlowBot(delay=0)
+    server = serve(bot, max_body=1024)
+    assert post(server, b"{" + b" " * 2048 + b"}") == 413
+    assert post(server, json.dumps(message_update(1, 1)).encode("utf-8"), secret="wrong") == 403
+    assert server.updates.empty() and bot.processed == []